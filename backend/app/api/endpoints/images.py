@@ -0,0 +1,83 @@
+"""
+생성 이미지 제공 엔드포인트
+- ETag / Last-Modified 조건부 요청 (304)
+- Range 요청 (FileResponse 기본 지원)
+- ?w=&format= 으로 썸네일 / WebP / AVIF 변형 제공
+"""
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+
+from backend.app.core.image_variants import get_variant_manager
+from image_cache import ImageCache
+
+router = APIRouter()
+
+# 캐시 키(sha256) 이름 파일은 내용이 바뀌지 않으므로 immutable
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _is_content_addressed(path: Path) -> bool:
+    stem = path.stem.split("_w")[0]
+    return len(stem) == 64 and all(c in "0123456789abcdef" for c in stem)
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """If-None-Match / If-Modified-Since 검사"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    
+    return False
+
+
+@router.get("/images/{filename}")
+async def get_image(
+    filename: str,
+    request: Request,
+    w: Optional[int] = Query(default=None, ge=1, le=4096, description="썸네일 너비 (px)"),
+    format: Optional[str] = Query(default=None, description="png | jpeg | webp | avif")
+):
+    """생성된 이미지 파일 반환 (설정의 image_cache.dir 폴더)"""
+    variant_manager = get_variant_manager()
+    image_path = variant_manager.image_dir / Path(filename).name
+    
+    if not image_path.is_file():
+        raise HTTPException(status_code=404, detail="이미지 없음")
+    
+    fmt = (format or image_path.suffix.lstrip(".")).lower()
+    media_type = None
+    
+    if w or format:
+        if not variant_manager.is_supported(fmt):
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 포맷: {fmt}")
+        image_path = await variant_manager.get_variant(image_path, w, fmt)
+        media_type = variant_manager.media_type(fmt)
+    
+    # LRU 접근 시각 갱신 (mtime은 유지)
+    ImageCache.touch(image_path)
+    
+    stat = image_path.stat()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if _is_content_addressed(image_path) else DEFAULT_CACHE_CONTROL
+    }
+    
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    
+    return FileResponse(image_path, media_type=media_type, headers=headers, stat_result=stat)
@@ -1,8 +1,13 @@
 """
 RAG API 엔드포인트
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
 from backend.app.core.system import get_assistant_system
+from backend.app.core.single_flight import SingleFlight
+from backend.app.core.cache import get_cache, cache_metrics
+from backend.app.core.uploads import get_upload_indexer
+from backend.app.config import settings
 from backend.app.models.request import RAGRequest
 from backend.app.models.response import RAGResponse, ErrorResponse
 
@@ -11,24 +16,91 @@ router = APIRouter()
 # 시스템 초기화
 # assistant_system = ReadingAssistantSystem()
 
+# 같은 구절/질문 동시 요청 → LangGraph 실행 1회로 합침
+ask_flight = SingleFlight()
+
+# 답변 캐시 (워커 간 공유는 CACHE_BACKEND=sqlite/redis)
+answer_cache = get_cache("answer", ttl=settings.ANSWER_CACHE_TTL)
+
+async def _wait_for_disconnect(request: Request, interval: float = 0.5):
+    """클라이언트 연결이 끊길 때까지 대기"""
+    while not await request.is_disconnected():
+        await asyncio.sleep(interval)
+
 @router.post("/ask", response_model=RAGResponse)
-async def ask_question(req: RAGRequest):
+async def ask_question(req: RAGRequest, request: Request):
     """독서 도우미에게 질문하기"""
     print("router !!! rag/ask")
     try:
         assistant_system = get_assistant_system()
-        answer = await assistant_system.ask(
-            selected_passage=req.selected_passage,
-            user_question=req.user_question,
-            k=req.k
-        )
+        key_parts = [req.selected_passage, req.user_question, req.k]
+        
+        # 업로드 PDF: 색인 완료면 업로드 컬렉션 검색, 색인 중이면 보고 있는 페이지 주변 텍스트
+        context = None
+        if req.upload_id:
+            context = await get_upload_indexer().context(
+                req.upload_id, req.selected_passage, req.user_question, req.k, req.page
+            )
+            if context is None:
+                raise HTTPException(status_code=404, detail="업로드를 찾을 수 없습니다")
+            key_parts += [req.upload_id, context["mode"], context["pages"] if context["mode"] == "nearby_pages" else None]
+        context_fields = {
+            "context_mode": context["mode"] if context else None,
+            "context_pages": context["pages"] if context else None
+        }
+        key = SingleFlight.make_key(*key_parts)
+        
+        cached = await answer_cache.get(key)
+        if cached is not None:
+            print("router !!! rag/ask 답변 캐시 hit")
+            return RAGResponse(answer=cached, **context_fields)
+        
+        work = asyncio.create_task(ask_flight.do(
+            key,
+            lambda: assistant_system.ask(
+                selected_passage=req.selected_passage,
+                user_question=req.user_question,
+                k=req.k,
+                context=context
+            )
+        ))
+        disconnect = asyncio.create_task(_wait_for_disconnect(request))
+        
+        try:
+            await asyncio.wait({work, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # 연결 끊김/핸들러 취소 시 이 요청만 대기에서 빠짐 (다른 대기 요청이 있으면 실행은 계속)
+            disconnect.cancel()
+            disconnected = not work.done()
+            if disconnected:
+                # cancel() 은 취소 요청만 하므로 실제로 끝날 때까지 기다린 뒤 판단
+                work.cancel()
+                await asyncio.gather(work, return_exceptions=True)
+        
+        if disconnected:
+            print("router !!! rag/ask 클라이언트 연결 끊김")
+            raise HTTPException(status_code=499, detail="client disconnected")
+        
+        answer = work.result()
+        await answer_cache.set(key, answer)
         
         return RAGResponse(
             answer=answer,
             book_title=None,  # 필요시 state에서 가져오기
             book_author=None,
-            rag_score=None
+            rag_score=None,
+            **context_fields
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/metrics")
+async def ask_metrics():
+    """/ask 요청 합치기 / 캐시 통계"""
+    return {
+        "single_flight": ask_flight.metrics(),
+        "cache": {"backend": settings.CACHE_BACKEND, **cache_metrics()}
+    }
\ No newline at end of file
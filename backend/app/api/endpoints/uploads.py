@@ -0,0 +1,65 @@
+"""
+업로드 PDF 색인 엔드포인트
+- POST /uploads/{sha256}?name= : PDF 바이트(본문 그대로, application/pdf) 저장 + 백그라운드 색인 시작
+  (이미 색인됐거나 진행 중이면 다시 하지 않고 상태만 반환)
+- GET /uploads/{sha256} : 색인 진행 상태 (쪽 단위 진행도, 단계별 쪽/초)
+"""
+import hashlib
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from backend.app.config import settings
+from backend.app.core.uploads import UploadIndexer, get_upload_indexer
+
+router = APIRouter()
+
+
+def _check_upload_id(upload_id: str):
+    if not UploadIndexer.is_upload_id(upload_id):
+        raise HTTPException(status_code=400, detail="upload_id 는 PDF 내용의 sha256 (소문자 16진수 64자) 입니다")
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """본문 읽기 (Content-Length 또는 읽은 크기가 max_bytes 를 넘으면 그 자리에서 413)"""
+    too_large = HTTPException(status_code=413, detail=f"PDF 는 {settings.UPLOAD_MAX_MB}MB 까지 업로드할 수 있습니다")
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+@router.post("/{upload_id}")
+async def upload_pdf(upload_id: str, request: Request, name: str = Query("upload.pdf")):
+    """PDF 업로드 → 색인 상태"""
+    _check_upload_id(upload_id)
+    indexer = get_upload_indexer()
+
+    # 같은 PDF 를 다시 보낸 경우 본문을 읽기 전에 응답
+    status = await indexer.status(upload_id)
+    if status is not None and status["state"] == "ready":
+        return status
+
+    data = await _read_body(request, settings.UPLOAD_MAX_MB * 1024 * 1024)
+    if hashlib.sha256(data).hexdigest() != upload_id:
+        raise HTTPException(status_code=400, detail="본문의 sha256 이 upload_id 와 다릅니다")
+
+    try:
+        return await indexer.submit(upload_id, name, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{upload_id}")
+async def upload_status(upload_id: str):
+    """색인 진행 상태"""
+    _check_upload_id(upload_id)
+    status = await get_upload_indexer().status(upload_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="업로드를 찾을 수 없습니다")
+    return status
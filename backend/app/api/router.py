@@ -2,8 +2,10 @@
 API 라우터 통합
 """
 from fastapi import APIRouter
-from backend.app.api.endpoints import rag
+from backend.app.api.endpoints import rag, images, uploads
 
 api_router = APIRouter()
 
-api_router.include_router(rag.router, prefix="/rag", tags=["RAG"])
\ No newline at end of file
+api_router.include_router(rag.router, prefix="/rag", tags=["RAG"])
+api_router.include_router(images.router, tags=["Images"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
\ No newline at end of file
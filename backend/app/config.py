@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     
     # Tavily
     TAVILY_API_KEY: str = ""
+    TAVILY_API_BASE_URL: str = ""  # 비우면 https://api.tavily.com (부하 테스트 시 가짜 서버)
     
     # RAG Settings
     COLLECTION_NAME: str = "BOOK_CHUNKS"
@@ -24,6 +25,21 @@ class Settings(BaseSettings):
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     LLM_MODEL: str = "gpt-4o"
     
+    # Cache (memory / sqlite / redis) - 워커 여러 개면 sqlite 또는 redis
+    CACHE_BACKEND: str = "memory"
+    CACHE_SQLITE_PATH: str = "cache/reading_mate_cache.sqlite3"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    ANSWER_CACHE_TTL: int = 3600
+    EMBEDDING_CACHE_TTL: int = 7 * 24 * 3600
+    METADATA_CACHE_TTL: int = 3600  # 적재 시 무효화되지만 memory 백엔드는 다른 프로세스에서 지울 수 없어 짧게
+    SESSION_TTL: int = 24 * 3600
+    
+    # 업로드 PDF 색인 (업로드마다 UPLOAD_{sha256 앞 16자} 컬렉션)
+    UPLOAD_DIR: str = "uploads"
+    UPLOAD_MAX_MB: int = 200
+    UPLOAD_COLLECTION_PREFIX: str = "UPLOAD_"
+    UPLOAD_STATUS_TTL: int = 7 * 24 * 3600
+    
     class Config:
         env_file = ".env"
 
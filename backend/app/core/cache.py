@@ -0,0 +1,317 @@
+"""
+공유 캐시 / 상태 백엔드
+- memory : 프로세스 내부 dict (워커마다 따로, 개발용)
+- sqlite : 같은 호스트의 uvicorn 워커끼리 공유 (파일 또는 /dev/shm)
+- redis  : Redis 프로토콜(RESP) 서버, 여러 호스트에서 공유
+
+캐시는 최선 노력(best-effort): 백엔드 오류가 나도 요청은 캐시 없이 계속 진행
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from backend.app.config import settings
+
+
+class CacheBackend(ABC):
+    """캐시 백엔드 인터페이스 (값은 JSON 직렬화 가능한 객체)"""
+    
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+    
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ...
+    
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+    
+    async def close(self):
+        pass
+
+
+class InProcessCacheBackend(CacheBackend):
+    """프로세스 내부 LRU + TTL 캐시"""
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        
+        self._data.move_to_end(key)
+        return json.loads(value)
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        # 다른 백엔드와 동작을 맞추기 위해 직렬화된 복사본 저장
+        expires_at = time.time() + ttl if ttl else None
+        self._data[key] = (json.dumps(value, ensure_ascii=False), expires_at)
+        self._data.move_to_end(key)
+        
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+    
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """SQLite 파일 캐시 (WAL 모드, 같은 호스트의 여러 프로세스가 공유)"""
+    
+    def __init__(self, path: str = "cache/reading_mate_cache.sqlite3", purge_every: int = 1000):
+        self.path = path
+        self.purge_every = purge_every
+        self._lock = threading.Lock()
+        self._writes = 0
+        
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+    
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _set(self, key: str, value: str, expires_at: Optional[float]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+    
+    def _delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+    
+    async def get(self, key: str) -> Optional[Any]:
+        value = await asyncio.to_thread(self._get, key)
+        return json.loads(value) if value is not None else None
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        expires_at = time.time() + ttl if ttl else None
+        await asyncio.to_thread(self._set, key, json.dumps(value, ensure_ascii=False), expires_at)
+    
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+    
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisError(RuntimeError):
+    """Redis 서버 오류 응답"""
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis 프로토콜(RESP2) 캐시 - 커넥션 풀 포함 최소 구현"""
+    
+    def __init__(self, url: str = "redis://localhost:6379/0", pool_size: int = 10, timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+    
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+        if self.password:
+            await self._execute(reader, writer, "AUTH", self.password)
+        if self.db:
+            await self._execute(reader, writer, "SELECT", str(self.db))
+        return reader, writer
+    
+    @staticmethod
+    def _encode(*args: str) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode("utf-8")
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        return b"".join(parts)
+    
+    @classmethod
+    async def _read_reply(cls, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Redis 연결 종료")
+        
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            raise RedisError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2].decode("utf-8")
+        if prefix == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [await cls._read_reply(reader) for _ in range(count)]
+        raise RedisError(f"알 수 없는 응답: {line!r}")
+    
+    async def _execute(self, reader, writer, *args: str) -> Any:
+        writer.write(self._encode(*args))
+        await writer.drain()
+        return await asyncio.wait_for(self._read_reply(reader), timeout=self.timeout)
+    
+    async def command(self, *args: str) -> Any:
+        """풀에서 커넥션을 빌려 명령 1개 실행"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                reply = await self._execute(*conn, *args)
+            except RedisError:
+                self._idle.append(conn)
+                raise
+            except BaseException:
+                # 응답 중간에 끊긴 (취소 포함) 커넥션은 응답이 섞일 수 있어 재사용하지 않음
+                conn[1].close()
+                raise
+            self._idle.append(conn)
+            return reply
+    
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.command("GET", key)
+        return json.loads(value) if value is not None else None
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        payload = json.dumps(value, ensure_ascii=False)
+        if ttl:
+            await self.command("SET", key, payload, "EX", str(int(ttl)))
+        else:
+            await self.command("SET", key, payload)
+    
+    async def delete(self, key: str):
+        await self.command("DEL", key)
+    
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+class CacheNamespace:
+    """용도별 캐시 (키 접두사 + 기본 TTL), 백엔드 오류는 캐시 miss로 처리"""
+    
+    def __init__(self, name: str, ttl: Optional[int] = None):
+        self.name = name
+        self.ttl = ttl
+        self.stats = {"hit": 0, "miss": 0, "error": 0}
+    
+    def _key(self, key: str) -> str:
+        return f"reading_mate:{self.name}:{key}"
+    
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            value = await get_cache_backend().get(self._key(key))
+        except Exception as e:
+            print(f"cache ::: {self.name} 조회 오류: {e}")
+            self.stats["error"] += 1
+            return None
+        
+        self.stats["hit" if value is not None else "miss"] += 1
+        return value
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        try:
+            await get_cache_backend().set(self._key(key), value, ttl or self.ttl)
+        except Exception as e:
+            print(f"cache ::: {self.name} 저장 오류: {e}")
+            self.stats["error"] += 1
+    
+    async def delete(self, key: str):
+        try:
+            await get_cache_backend().delete(self._key(key))
+        except Exception as e:
+            print(f"cache ::: {self.name} 삭제 오류: {e}")
+            self.stats["error"] += 1
+
+
+def create_cache_backend(kind: str = None) -> CacheBackend:
+    """설정값(CACHE_BACKEND)에 맞는 백엔드 생성"""
+    kind = (kind or settings.CACHE_BACKEND).lower()
+    
+    if kind == "memory":
+        return InProcessCacheBackend()
+    if kind == "sqlite":
+        return SQLiteCacheBackend(settings.CACHE_SQLITE_PATH)
+    if kind == "redis":
+        return RedisCacheBackend(settings.CACHE_REDIS_URL)
+    raise ValueError(f"지원하지 않는 CACHE_BACKEND: {kind}")
+
+
+_cache_backend = None
+_namespaces: Dict[str, CacheNamespace] = {}
+
+def get_cache_backend() -> CacheBackend:
+    global _cache_backend
+    if _cache_backend is None:
+        _cache_backend = create_cache_backend()
+    return _cache_backend
+
+def set_cache_backend(backend: CacheBackend):
+    """백엔드 교체 (스크립트/확인용)"""
+    global _cache_backend
+    _cache_backend = backend
+
+def get_cache(name: str, ttl: Optional[int] = None) -> CacheNamespace:
+    """용도별 캐시 (answer / embedding / metadata / session)"""
+    if name not in _namespaces:
+        _namespaces[name] = CacheNamespace(name, ttl)
+    return _namespaces[name]
+
+def cache_metrics() -> Dict[str, Dict]:
+    return {name: namespace.stats for name, namespace in _namespaces.items()}
+
+async def close_cache_backend():
+    global _cache_backend
+    if _cache_backend is not None:
+        await _cache_backend.close()
+        _cache_backend = None
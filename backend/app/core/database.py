@@ -1,6 +1,7 @@
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from backend.app.config import settings
+from backend.app.core.cache import get_cache
 from typing import Dict, Optional
 
 class DatabaseManager:
@@ -10,6 +11,7 @@ class DatabaseManager:
         self.connection_string = self._get_connection_string()
         self.async_connection_string = self._get_async_connection_string()
         self._async_engine: Optional[AsyncEngine] = None
+        self.metadata_cache = get_cache("metadata", ttl=settings.METADATA_CACHE_TTL)
 
     def _get_connection_string(self) -> str:
         """환경 변수 기반 DB 연결 문자열 생성"""
@@ -42,6 +44,10 @@ class DatabaseManager:
         """책 메타데이터 조회"""
         print("get_book_metadata !!!")
 
+        cached = await self.metadata_cache.get(str(book_id))
+        if cached is not None:
+            return cached
+
         async with self.async_engine.connect() as conn:
             print("db - 연결 성공, 쿼리 실행")
             result = await conn.execute(
@@ -57,11 +63,14 @@ class DatabaseManager:
             if not row:
                 raise ValueError(f"book_id {book_id}에 해당하는 책이 없습니다.")
             
-            return {
+            metadata = {
                 "book_title": row[0],
                 "book_author": row[1]
             }
         
+        await self.metadata_cache.set(str(book_id), metadata)
+        return metadata
+        
     async def close(self):
         """비동기 엔진 종료 (앱 종료 시 호출)"""
         if self._async_engine:
@@ -2,13 +2,15 @@ from langchain_openai import ChatOpenAI
 from langchain.agents import create_openai_tools_agent, AgentExecutor
 from langchain_tavily import TavilySearch
 from backend.app.prompts.web_prompts import WEB_SEARCH_PROMPT
+from backend.app.config import settings
 
 class WebSearchEngine:
     """웹 검색 엔진"""
     
     def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0):
         self.llm = ChatOpenAI(model=model, temperature=temperature)
-        self.tools = [TavilySearch()]
+        tavily_options = {"api_base_url": settings.TAVILY_API_BASE_URL} if settings.TAVILY_API_BASE_URL else {}
+        self.tools = [TavilySearch(**tavily_options)]
     
     async def search(
         self,
@@ -0,0 +1,149 @@
+"""
+생성 이미지 변형(썸네일/포맷) 관리
+- 요청된 너비/포맷의 변형 이미지를 프로세스 풀에서 생성
+- 디스크에 캐시하여 재요청 시 바로 반환
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image, features
+
+# 허용 너비 (임의 크기 요청으로 변형 파일이 무한히 늘어나는 것 방지)
+ALLOWED_WIDTHS = (128, 256, 384, 512, 768, 1024)
+
+FORMATS = {
+    "png": ("PNG", "image/png", {"optimize": True}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 85, "optimize": True}),
+    "webp": ("WEBP", "image/webp", {"quality": 82, "method": 4}),
+    "avif": ("AVIF", "image/avif", {"quality": 60}),
+}
+
+
+def render_variant(src_path: str, dst_path: str, width: int, fmt: str) -> str:
+    """
+    변형 이미지 생성 (프로세스 풀 워커에서 실행)
+    
+    Args:
+        src_path: 원본 이미지 경로
+        dst_path: 저장 경로
+        width: 목표 너비 (원본보다 크면 원본 크기 유지)
+        fmt: FORMATS 키
+    """
+    pil_format, _, save_options = FORMATS[fmt]
+    
+    with Image.open(src_path) as img:
+        if fmt == "jpeg" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        
+        if width < img.width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        
+        # 임시 파일에 저장 후 rename → 동시 요청이 반쯤 쓰인 파일을 읽지 않음
+        tmp_path = f"{dst_path}.{os.getpid()}.tmp"
+        img.save(tmp_path, format=pil_format, **save_options)
+    
+    os.replace(tmp_path, dst_path)
+    return dst_path
+
+
+class ImageVariantManager:
+    """변형 이미지 생성 및 디스크 캐시"""
+    
+    def __init__(self, image_dir: str = "generated_images", max_workers: int = 2):
+        self.image_dir = Path(image_dir)
+        self.variant_dir = self.image_dir / "variants"
+        self.max_workers = max_workers
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """프로세스 풀 (싱글톤)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+    
+    def shutdown(self):
+        """프로세스 풀 종료 (앱 종료 시 호출)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    @staticmethod
+    def normalize_width(width: int) -> int:
+        """요청 너비를 허용 너비 중 크거나 같은 가장 작은 값으로 올림"""
+        for allowed in ALLOWED_WIDTHS:
+            if width <= allowed:
+                return allowed
+        return ALLOWED_WIDTHS[-1]
+    
+    @staticmethod
+    def is_supported(fmt: str) -> bool:
+        if fmt not in FORMATS:
+            return False
+        if fmt == "avif":
+            return bool(features.check("avif"))
+        return True
+    
+    @staticmethod
+    def media_type(fmt: str) -> str:
+        return FORMATS[fmt][1]
+    
+    async def get_variant(self, src_path: Path, width: Optional[int], fmt: str) -> Path:
+        """
+        변형 이미지 경로 반환 (없으면 프로세스 풀에서 생성)
+        
+        Args:
+            src_path: 원본 이미지 경로
+            width: 요청 너비 (None이면 원본 크기)
+            fmt: 출력 포맷
+        """
+        width = self.normalize_width(width) if width else 0
+        suffix = f"_w{width}" if width else ""
+        dst_path = self.variant_dir / f"{src_path.stem}{suffix}.{fmt}"
+        
+        # 원본이 다시 생성된 경우(같은 이름 덮어쓰기) 변형도 새로 생성
+        if dst_path.exists() and dst_path.stat().st_mtime >= src_path.stat().st_mtime:
+            return dst_path
+        
+        key = str(dst_path)
+        task = self._inflight.get(key)
+        if task is None:
+            self.variant_dir.mkdir(parents=True, exist_ok=True)
+            loop = asyncio.get_running_loop()
+            task = loop.run_in_executor(
+                self.executor,
+                render_variant,
+                str(src_path),
+                str(dst_path),
+                width or 10**9,
+                fmt
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        await asyncio.shield(task)
+        return dst_path
+
+
+_variant_manager = None
+
+def init_variant_manager(image_dir: str) -> ImageVariantManager:
+    """설정(image_cache.dir)의 이미지 폴더로 변형 관리자 생성 (앱 시작 시 호출)"""
+    global _variant_manager
+    if _variant_manager is not None:
+        _variant_manager.shutdown()
+    _variant_manager = ImageVariantManager(image_dir)
+    return _variant_manager
+
+
+def get_variant_manager():
+    global _variant_manager
+    if _variant_manager is None:
+        _variant_manager = ImageVariantManager()
+    return _variant_manager
@@ -0,0 +1,80 @@
+"""
+동일 요청 합치기 (single-flight)
+- 같은 키로 동시에 들어온 요청은 하나의 실행 결과를 공유
+- 기다리는 요청이 모두 취소된 경우에만 실행 자체를 취소
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    """진행 중인 실행 1건"""
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """키별 진행 중 실행 관리"""
+    
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {
+            "leaders": 0,      # 실제 실행한 요청 수
+            "coalesced": 0,    # 진행 중 실행에 합류한 요청 수
+            "cancelled": 0,    # 기다리는 요청이 모두 끊겨 취소된 실행 수
+            "errors": 0
+        }
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """공백/대소문자 정규화 후 해시 키 생성"""
+        normalized = [
+            " ".join(part.split()).lower() if isinstance(part, str) else part
+            for part in parts
+        ]
+        canonical = json.dumps(normalized, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def metrics(self) -> Dict:
+        return {
+            **self.stats,
+            "in_flight": len(self._calls),
+            "waiting": sum(call.waiters for call in self._calls.values())
+        }
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        key로 진행 중인 실행이 있으면 합류, 없으면 fn()을 새로 실행
+        
+        실행은 요청과 분리된 태스크에서 돌기 때문에 먼저 온 요청(leader)이
+        끊겨도 합류한 요청들은 결과를 그대로 받음
+        """
+        call = self._calls.get(key)
+        
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                print(f"single-flight ::: 대기 요청 없음, 실행 취소 ({key[:12]})")
+                call.task.cancel()
+                self.stats["cancelled"] += 1
+    
+    def _finish(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.stats["errors"] += 1
@@ -1,4 +1,4 @@
-from typing import Annotated, TypedDict, Literal
+from typing import Annotated, Dict, Optional, TypedDict, Literal
 from langgraph.graph import StateGraph, START, END
 from backend.app.core.database import DatabaseManager
 from backend.app.core.vector_store import VectorStoreManager
@@ -41,6 +41,7 @@ class GraphState(TypedDict):
     rag_result: Annotated[str, debug_reducer]
     rag_score: float
     rag_context: Annotated[str, debug_reducer]
+    preset_context: Annotated[bool, debug_reducer]
     web_result: Annotated[str, debug_reducer]
     final_answer: Annotated[str, debug_reducer]
     retry_count: Annotated[int, debug_reducer]
@@ -85,6 +86,11 @@ class ReadingAssistantSystem:
         print(f"Plan: {plan}")
         state["plan"] = plan
 
+        if state.get("preset_context"):
+            # 업로드 PDF 등 호출 측에서 컨텍스트를 정해 준 경우 검색 생략
+            print("컨텍스트 지정됨 -> 하이브리드 검색 생략")
+            return state
+
         # 하이브리드 검색
         hybrid_result = await self.vector_store_manager.hybrid_search(
             state["selected_passage"],
@@ -264,9 +270,15 @@ class ReadingAssistantSystem:
         self,
         selected_passage: str,
         user_question: str,
-        k: int = 5
+        k: int = 5,
+        context: Optional[Dict] = None
     ) -> str:
-        """독서 도우미에게 질문하기"""
+        """
+        독서 도우미에게 질문하기
+
+        Args:
+            context: 검색 대신 쓸 컨텍스트 {text, book_title, book_author} (업로드 PDF)
+        """
         initial_state = {
             "selected_passage": selected_passage,
             "user_question": user_question,
@@ -274,8 +286,15 @@ class ReadingAssistantSystem:
             "retry_count": 0,
             "book_title": None,
             "book_author": None,
-            "final_answer": None
+            "final_answer": None,
+            "preset_context": context is not None
         }
+        if context is not None:
+            initial_state.update({
+                "rag_context": context["text"],
+                "book_title": context["book_title"],
+                "book_author": context["book_author"]
+            })
 
         print(f"selected_passage::: {selected_passage}, user_question ::: {user_question}")
         
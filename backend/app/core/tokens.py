@@ -0,0 +1,8 @@
+"""
+토큰 수 계산
+- tiktoken 인코딩을 쓸 수 있으면 정확히, 없으면(오프라인 등) UTF-8 바이트 기반 근사값
+- 구현은 chunker.py 에 하나만 두고 가져다 씀 (청크 예산과 검색 / 평가 예산이 같은 기준)
+"""
+from chunker import count_tokens, token_counter_name
+
+__all__ = ["count_tokens", "token_counter_name"]
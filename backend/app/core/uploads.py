@@ -0,0 +1,460 @@
+"""
+업로드 PDF 백그라운드 색인
+- 업로드(내용 sha256 기준) 1개 = PGVector 컬렉션 1개 (UPLOAD_{sha256 앞 16자})
+- 텍스트 추출(PyMuPDF, 페이지 묶음마다 진행도 기록) → 청크 분할(chunker, 청크마다 page_start / page_end)
+  → 임베딩 + COPY (ingest_chunks 의 ChunkEmbedder / ChunkLoader, 묶음마다 진행도 기록)
+- 진행 상태는 공유 캐시(upload_status)에 기록 → 워커가 달라도 같은 상태 조회, 완료 정보는 컬렉션 메타데이터에도 남김
+- 색인이 끝나기 전 질문은 보고 있는 페이지 주변 텍스트로 답변 (nearby_pages), 끝나면 업로드 컬렉션 검색 (vector)
+
+처리량 목표 (쪽/초, 1쪽 ≈ 1,000자 기준, 상태의 pages_per_second 로 확인)
+- 텍스트 추출 500 이상 (300쪽 PDF 측정 약 800~1,100)
+- 청크 분할 200 이상
+- 임베딩 + 적재 25 이상: 임베딩 속도 제한(EMBED_TPM 100만, 토큰 ≈ 글자 수 / 2)이 상한이라 글자 수에 반비례
+  (가짜 임베딩 서버 측정: 1쪽 1,000자 약 36쪽/초, 1,800자 약 22쪽/초)
+- 전체 20 이상 → 300쪽 책이 15초 안팎에 검색 가능
+"""
+import asyncio
+import bisect
+import json
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+from openai import AsyncOpenAI
+from sqlalchemy import create_engine, text
+
+from backend.app.config import settings
+from backend.app.core.cache import get_cache
+from backend.app.core.database import DatabaseManager
+from backend.app.core.system import get_assistant_system
+from backend.app.core.tokens import count_tokens
+from backend.app.core.vector_store import VectorStoreManager
+from batch_jobs import EMBEDDING_STORE_PATH
+from chunker import chunk_book
+from content_store import EmbeddingStore
+from ingest_chunks import ChunkEmbedder, ChunkLoader, connect, set_collection_metadata
+
+EXTRACT_PAGES_PER_STEP = 50    # 추출 진행도 기록 단위 (쪽)
+CHUNK_MIN_TOKENS = 100
+CHUNK_MAX_TOKENS = 400
+CHUNK_OVERLAP_TOKENS = 40      # 임베딩 전용이라 앞 청크 마지막 문장을 겹침
+CHUNKS_PER_STEP = 128          # 임베딩 + 적재 진행도 기록 단위 (청크, 트랜잭션 1개)
+EMBED_BATCH_SIZE = 32          # 요청 1건당 입력 수 (CHUNKS_PER_STEP 을 동시 요청 4개로 나눔)
+INDEX_CONCURRENCY = 1          # 동시에 색인하는 업로드 수 (임베딩 한도를 나눠 쓰지 않도록)
+NEARBY_PAGES = 2               # 색인 전 답변에 쓰는 앞뒤 페이지 수
+NEARBY_MAX_TOKENS = 3000
+STALE_SECONDS = 300            # 이 시간 동안 진행도 갱신이 없으면 중단된 작업으로 보고 다시 색인
+MISSING_TTL = 30               # 없는 업로드 조회 결과 캐시 시간 (초, 같은 id 로 DB 를 반복 조회하지 않도록)
+VECTOR_STORE_CACHE_SIZE = 8    # 메모리에 둘 업로드 검색 객체 수 (엔진은 모든 업로드가 공유)
+PAGE_TEXT_CACHE_SIZE = 8       # 메모리에 둘 업로드 페이지 텍스트 수 (나머지는 {sha256}.txt 에서 다시 읽음)
+
+TARGET_PAGES_PER_SECOND = {"extract": 500, "chunk": 200, "embed": 25, "total": 20}
+RUNNING_STATES = ("queued", "extracting", "chunking", "embedding")
+PAGE_SEPARATOR = "\f"
+
+
+def extract_pages(pdf_path: str, start: int, end: int) -> List[str]:
+    """[start, end) 페이지 텍스트 (0부터)"""
+    with fitz.open(pdf_path) as doc:
+        return [doc.load_page(i).get_text("text") for i in range(start, min(end, doc.page_count))]
+
+
+def pdf_info(data: bytes) -> Dict:
+    """페이지 수 / 제목 / 저자 (열 수 없는 PDF 면 ValueError)"""
+    try:
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            metadata = doc.metadata or {}
+            return {"page_count": doc.page_count, "title": metadata.get("title") or "", "author": metadata.get("author") or ""}
+    except Exception as e:
+        raise ValueError(f"PDF를 열 수 없습니다: {e}") from e
+
+
+def chunk_pages(texts: List[str]) -> List[Dict]:
+    """
+    페이지 텍스트 → 청크 (챕터 인식, 페이지 경계를 넘어 이어지는 문단도 한 청크)
+
+    Returns:
+        [{chunk_index, chapter_name, content_ko, char_start, char_end, page_start, page_end}, ...]
+        (ChunkLoader 가 content_ko 를 임베딩 / 저장하므로 업로드 본문은 번역 없이 그 자리에 넣음)
+    """
+    offsets = []
+    position = 0
+    for page_text in texts:
+        offsets.append(position)
+        position += len(page_text) + 2
+    full_text = "\n\n".join(texts)
+
+    chunks = []
+    for chunk in chunk_book(full_text, CHUNK_MIN_TOKENS, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS):
+        chunks.append({
+            "chunk_index": chunk["chunk_index"],
+            "chapter_name": chunk["chapter_name"],
+            "content_ko": chunk["content_en"],
+            "char_start": chunk["char_start"],
+            "char_end": chunk["char_end"],
+            "page_start": bisect.bisect_right(offsets, chunk["char_start"]),
+            "page_end": bisect.bisect_right(offsets, max(chunk["char_start"], chunk["char_end"] - 1)),
+        })
+    return chunks
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.split()).lower()
+
+
+def find_page(texts: List[str], passage: str) -> Optional[int]:
+    """구절이 들어 있는 페이지 번호 (1부터, 앞부분 60자 기준, 없으면 None)"""
+    needle = _normalize(passage)[:60]
+    if not needle:
+        return None
+    for i, page_text in enumerate(texts):
+        if needle in _normalize(page_text):
+            return i + 1
+    return None
+
+
+def nearby_pages(texts: List[str], page: int, radius: int = NEARBY_PAGES, max_tokens: int = NEARBY_MAX_TOKENS) -> List[int]:
+    """page 에 가까운 순서로 앞뒤 radius 쪽까지, 토큰 예산 안에서 고른 페이지 번호 (오름차순, 최소 1쪽)"""
+    page = max(1, min(len(texts), page))
+    candidates = [page]
+    for distance in range(1, radius + 1):
+        # 앞 내용이 질문 맥락에 더 가까우므로 앞 페이지 먼저
+        candidates += [p for p in (page - distance, page + distance) if 1 <= p <= len(texts)]
+
+    selected, used = [], 0
+    for p in candidates:
+        tokens = count_tokens(texts[p - 1])
+        if selected and used + tokens > max_tokens:
+            break
+        selected.append(p)
+        used += tokens
+    return sorted(selected)
+
+
+def format_pages(texts: List[str], pages: List[int]) -> str:
+    return "\n\n".join(f"[{p}쪽]\n{texts[p - 1].strip()}" for p in pages)
+
+
+def _write_atomic(path: Path, data: bytes):
+    """임시 파일에 쓴 뒤 rename (다른 워커가 반쯤 쓴 파일을 읽지 않도록)"""
+    tmp = path.with_name(f".tmp-{path.name}")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+class UploadIndexer:
+    """업로드 PDF 색인 작업 관리 (프로세스당 1개)"""
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        upload_dir: str = None,
+        collection_prefix: str = None,
+        concurrency: int = INDEX_CONCURRENCY
+    ):
+        """
+        Args:
+            db_manager: 색인이 끝난 업로드 검색용 DB 연결 (RAG 시스템과 공유)
+            upload_dir: PDF / 페이지 텍스트 저장 폴더 ({sha256}.pdf, {sha256}.txt)
+            collection_prefix: 업로드 컬렉션 이름 앞부분
+            concurrency: 동시에 색인하는 업로드 수
+        """
+        self.db_manager = db_manager
+        self.upload_dir = Path(upload_dir or settings.UPLOAD_DIR)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.collection_prefix = collection_prefix or settings.UPLOAD_COLLECTION_PREFIX
+        self.statuses = get_cache("upload_status", ttl=settings.UPLOAD_STATUS_TTL)
+        self.missing = get_cache("upload_missing", ttl=MISSING_TTL)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._submit_locks: Dict[str, asyncio.Lock] = {}
+        self._engine = None
+        self._vector_stores: "OrderedDict[str, VectorStoreManager]" = OrderedDict()
+        self._page_texts: "OrderedDict[str, List[str]]" = OrderedDict()
+
+    def collection_name(self, upload_id: str) -> str:
+        return f"{self.collection_prefix}{upload_id[:16]}"
+
+    def pdf_path(self, upload_id: str) -> Path:
+        return self.upload_dir / f"{upload_id}.pdf"
+
+    def _text_path(self, upload_id: str) -> Path:
+        return self.upload_dir / f"{upload_id}.txt"
+
+    @staticmethod
+    def is_upload_id(upload_id: str) -> bool:
+        return bool(re.fullmatch(r"[0-9a-f]{64}", upload_id))
+
+    async def _save_status(self, status: Dict) -> Dict:
+        status["updated_at"] = time.time()
+        await self.statuses.set(status["upload_id"], status)
+        return status
+
+    def _is_active(self, status: Dict) -> bool:
+        """진행 중 (이 프로세스의 작업이거나, 다른 워커 작업이 최근까지 진행도를 기록)"""
+        if status["upload_id"] in self._tasks:
+            return True
+        return status["state"] in RUNNING_STATES and time.time() - status.get("updated_at", 0) < STALE_SECONDS
+
+    async def status(self, upload_id: str) -> Optional[Dict]:
+        """
+        색인 상태 (없으면 None)
+
+        Returns:
+            {upload_id, name, title, author, state, page_count, pages_extracted, pages_indexed,
+             chunks, chunks_indexed, collection, seconds, pages_per_second, targets, eta_seconds, error}
+            state: queued / extracting / chunking / embedding / ready / failed
+        """
+        status = await self.statuses.get(upload_id)
+        if status is not None:
+            return status
+
+        if await self.missing.get(upload_id):
+            return None
+
+        # 상태 캐시가 비었으면(재시작 / TTL) 컬렉션 메타데이터의 완료 기록 사용 (RAG 시스템과 같은 커넥션 풀)
+        async with self.db_manager.async_engine.connect() as conn:
+            result = await conn.execute(
+                text("SELECT cmetadata FROM langchain_pg_collection WHERE name = :name"),
+                {"name": self.collection_name(upload_id)}
+            )
+            row = result.fetchone()
+        metadata = row[0] if row else None
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata)
+        if not metadata or "upload" not in metadata:
+            await self.missing.set(upload_id, True)
+            return None
+        return await self._save_status(dict(metadata["upload"]))
+
+    async def submit(self, upload_id: str, name: str, data: bytes) -> Dict:
+        """
+        업로드 저장 + 색인 시작 → 상태 (이미 끝났거나 진행 중이면 그대로 반환)
+
+        열 수 없는 PDF 면 ValueError
+        """
+        # 같은 PDF 동시 업로드 → 상태 확인부터 색인 시작까지 하나씩 (색인이 두 번 돌지 않도록)
+        lock = self._submit_locks.setdefault(upload_id, asyncio.Lock())
+        try:
+            async with lock:
+                return await self._submit(upload_id, name, data)
+        finally:
+            if not lock.locked():
+                self._submit_locks.pop(upload_id, None)
+
+    async def _submit(self, upload_id: str, name: str, data: bytes) -> Dict:
+        status = await self.status(upload_id)
+        if status is not None and (status["state"] == "ready" or self._is_active(status)):
+            return status
+
+        info = await asyncio.to_thread(pdf_info, data)
+        pdf_path = self.pdf_path(upload_id)
+        if not pdf_path.exists():
+            await asyncio.to_thread(_write_atomic, pdf_path, data)
+
+        await self.missing.delete(upload_id)
+        status = await self._save_status({
+            "upload_id": upload_id,
+            "name": name,
+            "title": info["title"] or Path(name).stem,
+            "author": info["author"] or "Unknown",
+            "state": "queued",
+            "page_count": info["page_count"],
+            "pages_extracted": 0,
+            "pages_indexed": 0,
+            "chunks": 0,
+            "chunks_indexed": 0,
+            "collection": self.collection_name(upload_id),
+            "seconds": {},
+            "pages_per_second": {},
+            "targets": TARGET_PAGES_PER_SECOND,
+            "eta_seconds": None,
+            "error": None,
+        })
+        task = asyncio.create_task(self._run(status))
+        self._tasks[upload_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(upload_id, None))
+        print(f"📥 업로드 색인 요청: {name} ({info['page_count']}쪽) → {status['collection']}")
+        return status
+
+    async def _run(self, status: Dict):
+        async with self._semaphore:
+            try:
+                await self._index(status)
+            except asyncio.CancelledError:
+                status.update({"state": "failed", "error": "색인 중단 (서버 종료)"})
+                await self._save_status(status)
+                raise
+            except Exception as e:
+                print(f"❌ 업로드 색인 실패 ({status['upload_id'][:12]}): {e}")
+                status.update({"state": "failed", "error": str(e)})
+                await self._save_status(status)
+
+    def _record(self, status: Dict, stage: str, seconds: float, pages: int):
+        status["seconds"][stage] = round(seconds, 2)
+        status["pages_per_second"][stage] = round(pages / seconds, 1) if seconds else None
+
+    async def _index(self, status: Dict):
+        upload_id = status["upload_id"]
+        page_count = status["page_count"]
+        started = time.perf_counter()
+
+        # 1. 텍스트 추출 (페이지 묶음마다 진행도 기록)
+        status["state"] = "extracting"
+        await self._save_status(status)
+        texts: List[str] = []
+        for start in range(0, page_count, EXTRACT_PAGES_PER_STEP):
+            texts += await asyncio.to_thread(extract_pages, str(self.pdf_path(upload_id)), start, start + EXTRACT_PAGES_PER_STEP)
+            status["pages_extracted"] = len(texts)
+            await self._save_status(status)
+        await asyncio.to_thread(self._text_path(upload_id).write_text, PAGE_SEPARATOR.join(texts), encoding="utf-8")
+        self._remember(self._page_texts, upload_id, texts, PAGE_TEXT_CACHE_SIZE)
+        self._record(status, "extract", time.perf_counter() - started, page_count)
+
+        # 2. 청크 분할
+        chunk_started = time.perf_counter()
+        status["state"] = "chunking"
+        await self._save_status(status)
+        chunks = await asyncio.to_thread(chunk_pages, texts)
+        status["chunks"] = len(chunks)
+        self._record(status, "chunk", time.perf_counter() - chunk_started, page_count)
+
+        # 3. 임베딩 + 적재 (묶음 = 트랜잭션 1개, 행 id 고정이라 중간에 끊겨도 다시 실행하면 이어서 같은 결과)
+        embed_started = time.perf_counter()
+        status["state"] = "embedding"
+        await self._save_status(status)
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        conn = await connect()
+        try:
+            embedder = ChunkEmbedder(
+                client, settings.EMBEDDING_MODEL, EmbeddingStore(EMBEDDING_STORE_PATH, settings.EMBEDDING_MODEL),
+                batch_size=EMBED_BATCH_SIZE
+            )
+            loader = ChunkLoader(conn, status["collection"], embedder, rows_per_copy=CHUNKS_PER_STEP)
+            await loader.setup()
+            book_id = upload_id[:16]
+            for i in range(0, len(chunks), CHUNKS_PER_STEP):
+                group = chunks[i:i + CHUNKS_PER_STEP]
+                await loader.append_chunks(book_id, group)
+                elapsed = time.perf_counter() - embed_started
+                status["chunks_indexed"] = i + len(group)
+                # 청크는 페이지 순서라 마지막 청크의 끝 페이지까지 색인됨
+                status["pages_indexed"] = group[-1]["page_end"] if status["chunks_indexed"] < len(chunks) else page_count
+                rate = status["chunks_indexed"] / elapsed if elapsed else 0
+                status["eta_seconds"] = round((len(chunks) - status["chunks_indexed"]) / rate, 1) if rate else None
+                await self._save_status(status)
+            self._record(status, "embed", time.perf_counter() - embed_started, page_count)
+            self._record(status, "total", time.perf_counter() - started, page_count)
+            status.update({"state": "ready", "pages_indexed": page_count, "eta_seconds": 0})
+
+            # 상태 캐시가 사라져도(재시작) 완료 여부를 알 수 있도록 컬렉션 메타데이터에 기록
+            await set_collection_metadata(conn, loader.collection_id, {**loader.collection_metadata, "upload": status})
+        finally:
+            await conn.close()
+            await client.close()
+
+        await self._save_status(status)
+        below = [stage for stage, target in TARGET_PAGES_PER_SECOND.items() if (status["pages_per_second"].get(stage) or 0) < target]
+        print(
+            f"✅ 업로드 색인 완료: {status['name']} {page_count}쪽 / {len(chunks)}청크, "
+            f"{status['seconds']['total']}s ({status['pages_per_second']['total']} 쪽/초, 단계별 {status['pages_per_second']})"
+            + (f" ⚠️ 목표 미달: {', '.join(below)}" if below else "")
+        )
+
+    @staticmethod
+    def _remember(cache: OrderedDict, key: str, value, max_entries: int):
+        """개수 제한 LRU 에 추가 (가장 오래 안 쓴 항목부터 제거)"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+    def page_texts(self, upload_id: str) -> Optional[List[str]]:
+        """페이지별 텍스트 (0번 = 1쪽, 추출 전이면 None)"""
+        texts = self._page_texts.get(upload_id)
+        if texts is not None:
+            self._page_texts.move_to_end(upload_id)
+            return texts
+        path = self._text_path(upload_id)
+        if not path.exists():
+            return None
+        texts = path.read_text(encoding="utf-8").split(PAGE_SEPARATOR)
+        self._remember(self._page_texts, upload_id, texts, PAGE_TEXT_CACHE_SIZE)
+        return texts
+
+    async def _vector_store(self, upload_id: str) -> VectorStoreManager:
+        vector_store = self._vector_stores.get(upload_id)
+        if vector_store is not None:
+            self._vector_stores.move_to_end(upload_id)
+            return vector_store
+
+        # 업로드마다 커넥션 풀을 만들지 않도록 엔진 1개를 공유
+        if self._engine is None:
+            self._engine = create_engine(self.db_manager.connection_string, pool_size=5, max_overflow=5, pool_pre_ping=True)
+        # PGVector 생성 시 DB 에 접속하므로 스레드에서
+        vector_store = await asyncio.to_thread(
+            VectorStoreManager, self.db_manager, self.collection_name(upload_id), engine=self._engine
+        )
+        self._remember(self._vector_stores, upload_id, vector_store, VECTOR_STORE_CACHE_SIZE)
+        return vector_store
+
+    async def context(
+        self,
+        upload_id: str,
+        selected_passage: str,
+        user_question: str,
+        k: int = 5,
+        page: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        업로드 PDF 에서 답변 컨텍스트 (업로드가 없으면 None)
+
+        Returns:
+            {text, book_title, book_author, mode, pages}
+            mode: vector (색인 완료, 업로드 컬렉션 검색) / nearby_pages (색인 전, page 주변 텍스트)
+        """
+        status = await self.status(upload_id)
+        if status is None:
+            return None
+        book = {"book_title": status["title"], "book_author": status["author"]}
+
+        if status["state"] == "ready":
+            vector_store = await self._vector_store(upload_id)
+            docs = await vector_store.search_docs(selected_passage, user_question, k, NEARBY_MAX_TOKENS)
+            formatted = [
+                f"[구절 {i} - {doc.metadata.get('page_start')}~{doc.metadata.get('page_end')}쪽]\n{doc.page_content}"
+                for i, doc in enumerate(docs, 1)
+            ]
+            pages = sorted({doc.metadata.get("page_start") for doc in docs if doc.metadata.get("page_start")})
+            return {"text": "\n\n".join(formatted) or "관련 내용을 찾을 수 없습니다.", **book, "mode": "vector", "pages": pages}
+
+        texts = await asyncio.to_thread(self.page_texts, upload_id)
+        if texts is None:
+            # 추출 전 (대기 중) → 저장된 PDF 에서 바로 읽기
+            texts = await asyncio.to_thread(extract_pages, str(self.pdf_path(upload_id)), 0, status["page_count"])
+        if not texts:
+            return {"text": "관련 내용을 찾을 수 없습니다.", **book, "mode": "nearby_pages", "pages": []}
+        page = page or find_page(texts, selected_passage) or 1
+        pages = await asyncio.to_thread(nearby_pages, texts, page)
+        return {"text": format_pages(texts, pages), **book, "mode": "nearby_pages", "pages": pages}
+
+    async def close(self):
+        """진행 중인 색인 취소 (앱 종료 시 호출, 다음 업로드 요청 때 처음부터 다시 색인)"""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._vector_stores.clear()
+        if self._engine is not None:
+            self._engine.dispose()
+
+
+_upload_indexer = None
+
+def get_upload_indexer():
+    global _upload_indexer
+    if _upload_indexer is None:
+        _upload_indexer = UploadIndexer(get_assistant_system().db_manager)
+    return _upload_indexer
@@ -2,9 +2,13 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import PGVector
 from backend.app.core.database import DatabaseManager
 from backend.app.config import settings
+from backend.app.core.cache import get_cache
+from backend.app.core.tokens import count_tokens
 import asyncio
-from typing import List
+import hashlib
+from typing import Dict, List, Optional
 from langchain.schema import Document
+from sqlalchemy.engine import Engine
 
 
 class VectorStoreManager:
@@ -13,81 +17,169 @@ class VectorStoreManager:
     def __init__(
         self,
         db_manager: DatabaseManager,
-        collection_name: str = None
+        collection_name: str = None,
+        index_params: Optional[Dict[str, int]] = None,
+        engine: Optional[Engine] = None
     ):
+        """
+        Args:
+            db_manager: DB 연결 관리
+            collection_name: PGVector 컬렉션명
+            index_params: 세션별 인덱스 검색 파라미터 (예: {"hnsw.ef_search": 40, "ivfflat.probes": 10})
+            engine: 여러 컬렉션이 같이 쓰는 SQLAlchemy 엔진 (없으면 PGVector 가 컬렉션마다 엔진 / 커넥션 풀 생성)
+        """
         self.db_manager = db_manager
         self.collection_name = collection_name or settings.COLLECTION_NAME
+        self.index_params = index_params or {}
+        self.engine = engine
         self.embeddings = OpenAIEmbeddings(model=settings.EMBEDDING_MODEL)
         self.vector_store = self._get_vector_store()
+        self.embedding_cache = get_cache("embedding", ttl=settings.EMBEDDING_CACHE_TTL)
     
     def _get_vector_store(self):
         """PGVector 연결"""
+        if self.engine is not None:
+            # 공유 엔진 사용 (검색은 collection_name 으로 컬렉션 구분)
+            return PGVector(
+                connection_string=self.db_manager.connection_string,
+                embedding_function=self.embeddings,
+                collection_name=self.collection_name,
+                connection=self.engine
+            )
+        
+        options = {}
+        if self.index_params:
+            # 커넥션마다 SET 하지 않도록 접속 옵션(-c)으로 전달
+            settings_string = " ".join(f"-c {name}={value}" for name, value in self.index_params.items())
+            options["engine_args"] = {"connect_args": {"options": settings_string}}
+        
         return PGVector.from_existing_index(
             embedding=self.embeddings,
             collection_name=self.collection_name,
-            connection_string=self.db_manager.connection_string
+            connection_string=self.db_manager.connection_string,
+            **options
         )
     
-    async def hybrid_search(
+    async def embed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩 (모델명 + 텍스트 해시로 캐시)"""
+        key = f"{settings.EMBEDDING_MODEL}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+        
+        vector = await self.embedding_cache.get(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await self.embedding_cache.set(key, vector)
+        return vector
+    
+    async def _search(self, query: str, k: int) -> List[Document]:
+        """캐시된 임베딩으로 벡터 검색 (DB 조회는 스레드에서)"""
+        vector = await self.embed_query(query)
+        return await asyncio.to_thread(self.vector_store.similarity_search_by_vector, vector, k)
+    
+    @staticmethod
+    def _dedup_docs(results: List[List[Document]], k: int) -> List[Document]:
+        """검색 결과 합치기 + 내용 기준 중복 제거 (상위 k개)"""
+        seen_contents = set()
+        unique_docs = []
+        
+        for doc_list in results:
+            for doc in doc_list:
+                if doc.page_content not in seen_contents:
+                    seen_contents.add(doc.page_content)
+                    unique_docs.append(doc)
+        
+        return unique_docs[:k]
+    
+    @staticmethod
+    def chunk_id(doc: Document) -> str:
+        """청크 식별자 (chunk_id 메타데이터, 없으면 book_id:chunk_index)"""
+        metadata = doc.metadata
+        if metadata.get("chunk_id") is not None:
+            return str(metadata["chunk_id"])
+        return f"{metadata.get('book_id')}:{metadata.get('chunk_index')}"
+    
+    @classmethod
+    def _fit_budget(cls, docs: List[Document], max_tokens: int) -> List[Document]:
+        """포맷팅 후 토큰 수가 max_tokens 이하가 되도록 앞에서부터 선택 (최소 1개)"""
+        selected = []
+        used = 0
+        for doc in docs:
+            tokens = count_tokens(cls._format_docs([doc]))
+            if selected and used + tokens > max_tokens:
+                break
+            selected.append(doc)
+            used += tokens
+        return selected
+    
+    @staticmethod
+    def _format_docs(docs: List[Document]) -> str:
+        """[구절 N - 챕터] 형식으로 포맷팅"""
+        formatted = []
+        for i, doc in enumerate(docs, 1):
+            chapter = doc.metadata.get('chapter_name', 'Unknown')
+            formatted.append(f"[구절 {i} - {chapter}]\n{doc.page_content}")
+        return "\n\n".join(formatted)
+    
+    async def search_docs(
         self,
         selected_passage: str,
         user_question: str,
-        k: int = 5
-    ) -> dict:
-        """하이브리드 검색 (구절 + 질문)"""
+        k: int = 5,
+        max_context_tokens: Optional[int] = None
+    ) -> List[Document]:
+        """구절 / 질문 각각 검색 → 내용 기준 중복 제거 상위 k개 (토큰 예산 적용)"""
         selected_passage = selected_passage.strip()
         user_question = user_question.strip()
 
         if not selected_passage and not user_question:
             raise ValueError("검색할 구절 또는 질문이 필요합니다.")
 
-        print("hybrid_search ::: ")
-
         tasks = []
         if selected_passage:
-            tasks.append(self.vector_store.asimilarity_search(selected_passage, k=k))
+            tasks.append(self._search(selected_passage, k))
         
         if user_question:
-            tasks.append(self.vector_store.asimilarity_search(user_question, k=k))
+            tasks.append(self._search(user_question, k))
         
         # asyncio.gather: 여러 비동기 작업을 병렬로 실행
         results: List[List[Document]] = await asyncio.gather(*tasks)
 
-        # 결과 합치기
-        all_docs = []
-        for doc_list in results:
-            all_docs.extend(doc_list)
-
-        # 중복 제거
-        seen_contents = set()
-        unique_docs = []
-        
-        for doc in all_docs:
-            if doc.page_content not in seen_contents:
-                seen_contents.add(doc.page_content)
-                unique_docs.append(doc)
+        selected_docs = self._dedup_docs(results, k)
+        if max_context_tokens:
+            selected_docs = self._fit_budget(selected_docs, max_context_tokens)
+        return selected_docs
+    
+    async def hybrid_search(
+        self,
+        selected_passage: str,
+        user_question: str,
+        k: int = 5,
+        max_context_tokens: Optional[int] = None
+    ) -> dict:
+        """
+        하이브리드 검색 (구절 + 질문)
         
-        selected_docs = unique_docs[:k]
+        Args:
+            max_context_tokens: 컨텍스트 토큰 예산 (넘치면 뒤쪽 구절부터 제외)
+        """
+        print("hybrid_search ::: ")
+
+        selected_docs = await self.search_docs(selected_passage, user_question, k, max_context_tokens)
         
         if not selected_docs:
             return {
                 "text": "관련 내용을 찾을 수 없습니다.",
                 "book_title": "Unknown",
-                "book_author": "Unknown"
+                "book_author": "Unknown",
+                "chunk_ids": []
             }
         
         # 책 메타데이터 조회
         book_id = selected_docs[0].metadata["book_id"]
         metadatas = await self.db_manager.get_book_metadata(book_id)
         
-        # 포맷팅
-        formatted = []
-        for i, doc in enumerate(selected_docs, 1):
-            chapter = doc.metadata.get('chapter_name', 'Unknown')
-            formatted.append(f"[구절 {i} - {chapter}]\n{doc.page_content}")
-        
         return {
-            "text": "\n\n".join(formatted),
+            "text": self._format_docs(selected_docs),
             "book_title": metadatas["book_title"],
-            "book_author": metadatas["book_author"]
+            "book_author": metadatas["book_author"],
+            "chunk_ids": [self.chunk_id(doc) for doc in selected_docs]
         }
\ No newline at end of file
@@ -7,22 +7,30 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from backend.app.core.system import get_assistant_system
+from backend.app.core.image_variants import get_variant_manager, init_variant_manager
+from backend.app.core.uploads import get_upload_indexer
+from backend.app.core.cache import get_cache, close_cache_backend
+from backend.app.config import settings
 from backend.app.models.request import RAGRequest
 from pydantic import BaseModel
 from typing import Optional
 from pathlib import Path
-from fastapi.responses import FileResponse
 from backend.app.api.router import api_router
 import yaml
+import os
 
 from vector_search import VectorSearchEngine
 from prompt_generator import PromptGenerator
-from comfyui_client import ComfyUIClient
+from glossary import BookGlossary
+from character_sheets import CharacterSheetStore
+from comfyui_client import AsyncComfyUIClient
+from image_cache import ImageCache
 
 from contextlib import asynccontextmanager
 
 services = {}
-sessions = {}
+# 세션 상태는 공유 캐시 백엔드에 저장 (워커가 달라도 같은 세션 조회 가능)
+sessions = get_cache("session", ttl=settings.SESSION_TTL)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -31,7 +39,8 @@ async def lifespan(app: FastAPI):
     print("서비스 시작 중...")
     
     # 설정 파일 로드
-    with open("config.yaml", "r", encoding="utf-8") as f:
+    # APP_CONFIG: 다른 설정 파일로 실행 (부하 테스트 등)
+    with open(os.getenv("APP_CONFIG", "config.yaml"), "r", encoding="utf-8") as f:
         config = yaml.safe_load(f)
     
     # 서비스 초기화
@@ -41,18 +50,45 @@ async def lifespan(app: FastAPI):
         embedding_model=config['vector_db']['embedding_model']
     )
     
-    services['prompt_generator'] = PromptGenerator()
+    glossary_config = config.get('glossary', {})
+    services['prompt_generator'] = PromptGenerator(
+        glossary=BookGlossary(
+            glossary_dir=glossary_config.get('dir', 'data/glossary'),
+            min_confidence=glossary_config.get('min_confidence', 0.5)
+        ),
+        character_sheets=CharacterSheetStore(
+            sheet_dir=config.get('character_sheets', {}).get('dir', 'data/character_sheets')
+        )
+    )
+    
+    # 생성 이미지 폴더 (다운로드 / 캐시 / /images 제공이 같은 폴더를 사용)
+    cache_config = config.get('image_cache', {})
+    image_dir = cache_config.get('dir', 'generated_images')
+    init_variant_manager(image_dir)
+    image_cache = None
+    if cache_config.get('enabled', False):
+        image_cache = ImageCache(
+            cache_dir=image_dir,
+            max_disk_mb=cache_config.get('max_disk_mb', 1024)
+        )
     
-    services['comfyui_client'] = ComfyUIClient(
-        server_address=config['comfyui_server']
+    services['comfyui_client'] = AsyncComfyUIClient(
+        server_address=config['comfyui_server'],
+        deterministic_seed=config['image_generation'].get('deterministic_seed', False),
+        image_cache=image_cache,
+        image_dir=image_dir
     )
     
     print("서비스 초기화 완료!")
     yield
     # 종료 시
     print("앱 종료: DB 연결 해제")
+    await services['comfyui_client'].close()
+    get_variant_manager().shutdown()
+    await get_upload_indexer().close()
     assistant_system = get_assistant_system()
     await assistant_system.db_manager.close()
+    await close_cache_backend()
 
 
 # ===== 요청/응답 모델 =====
@@ -65,6 +101,8 @@ class GenerationRequest(BaseModel):
     width: Optional[int] = 1024
     height: Optional[int] = 1024
     lora_strength: Optional[float] = 0.8
+    seed: Optional[int] = None
+    session_id: Optional[str] = None
 
 app = FastAPI(
     title="Reading Assistant API",
@@ -102,7 +140,7 @@ async def generate_image(request: GenerationRequest):
         
         # 2. 프롬프트 생성
         print("\n프롬프트 생성 중...")
-        prompt_data = services['prompt_generator'].generate_comfyui_prompt(
+        prompt_data = await services['prompt_generator'].generate_comfyui_prompt(
             context=context,
             user_input=request.user_input,
             book_context=request.book_id
@@ -116,34 +154,48 @@ async def generate_image(request: GenerationRequest):
             "height": request.height,
             "lora_strength": request.lora_strength,
         })
+        if request.seed is not None:
+            prompt_data['style_params']['seed'] = request.seed
         
         print(f"프롬프트 생성 완료")
         
         # 3. 이미지 생성
         print("\nComfyUI 이미지 생성 중...")
-        result = services['comfyui_client'].generate_image(
+        result = await services['comfyui_client'].generate_image(
             prompt_data=prompt_data
         )
         
         print(f"이미지 생성 완료!")
         print(f"image_url : /images/{Path(result['image_path']).name}")
         
+        image_url = f"/images/{Path(result['image_path']).name}"
+        if request.session_id:
+            session = await sessions.get(request.session_id) or {}
+            session.setdefault("images", []).append({
+                "user_input": request.user_input,
+                "book_id": request.book_id,
+                "image_url": image_url
+            })
+            await sessions.set(request.session_id, session)
         
-        return {"image_url" : f"/images/{Path(result['image_path']).name}"}
+        return {
+            "image_url" : image_url,
+            "cache" : result.get("cache")
+        }
     
     except Exception as e:
         print(f"\n오류 ::: {e}")
         
 
-@app.get("/images/{filename}")
-async def get_image(filename: str):
-    """생성된 이미지 파일 반환"""
-    image_path = Path("generated_images") / filename
-    
-    if not image_path.exists():
-        return {"status_code":404, "detail":"이미지 없음"}
-    
-    return FileResponse(image_path)
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """세션 상태 (생성한 삽화 목록)"""
+    return await sessions.get(session_id) or {}
+
+@app.get("/generate/progress")
+async def generate_progress():
+    """진행 중인 이미지 생성의 스텝 진행도 (prompt_id → value/max)"""
+    return services['comfyui_client'].progress
 
 # @app.get("/test")
 # async def test():
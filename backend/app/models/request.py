@@ -1,6 +1,7 @@
 """
 API 요청 모델
 """
+from typing import Optional
 from pydantic import BaseModel, Field
 
 class RAGRequest(BaseModel):
@@ -8,6 +9,8 @@ class RAGRequest(BaseModel):
     selected_passage: str = Field(..., description="사용자가 선택한 책 구절")
     user_question: str = Field(..., description="사용자의 질문")
     k: int = Field(default=5, description="검색할 문서 개수", ge=1, le=20)
+    upload_id: Optional[str] = Field(default=None, description="업로드 PDF sha256 (있으면 그 책에서 답변)")
+    page: Optional[int] = Field(default=None, description="보고 있는 페이지 (업로드 색인 전 주변 페이지로 답변)", ge=1)
 
 class BookSearchRequest(BaseModel):
     """책 검색 요청"""
@@ -2,7 +2,7 @@
 API 응답 모델
 """
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class RAGResponse(BaseModel):
     """RAG 질문 응답"""
@@ -10,6 +10,8 @@ class RAGResponse(BaseModel):
     book_title: Optional[str] = None
     book_author: Optional[str] = None
     rag_score: Optional[float] = None
+    context_mode: Optional[str] = None         # 업로드 PDF: vector (색인 완료) / nearby_pages (색인 중)
+    context_pages: Optional[List[int]] = None
 
 class ErrorResponse(BaseModel):
     """에러 응답"""
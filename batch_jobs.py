@@ -0,0 +1,346 @@
+# python batch_jobs.py prepare --kind translation --input data/02_cleaned/little_women/en.txt
+# python batch_jobs.py prepare --kind embedding --input data/03_processed/chunked_data_little_women.jsonl
+# python batch_jobs.py submit
+# python batch_jobs.py poll --wait
+# python batch_jobs.py export-embeddings --input data/03_processed/chunked_data_little_women.jsonl
+"""
+오프라인 배치 작업 (OpenAI Batch API 호환 엔드포인트)
+- 번역 / 임베딩 요청을 JSONL 작업 파일로 작성 → 업로드 → 배치 생성 → 상태 폴링 → 결과 적재
+- custom_id = 콘텐츠 해시 키 (content_store) → 결과 파일을 여러 번 적재해도 같은 결과
+- 이미 저장소에 있거나 다른 작업 파일에 들어 있는 요청은 다시 만들지 않음
+- 번역 결과는 data_translate.py 체크포인트에 적재 → data_translate.py 재실행 시 API 호출 없이 JSON 생성
+- 임베딩 결과는 임베딩 저장소에 적재 → export-embeddings로 DB 적재용 JSON 생성
+- 작업 상태는 data/batch_jobs/manifest.json 에 기록 (중간에 끊겨도 poll 부터 다시 실행)
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from openai import OpenAI
+
+import chunk_io
+from chunker import chunk_book
+from content_store import ContentHashStore, EmbeddingStore, TranslationCheckpoint
+from data_translate import (
+    CHECKPOINT_PATH,
+    TRANSLATION_MODEL,
+    TRANSLATION_PROMPT_VERSION,
+    translation_cost,
+    translation_request_body,
+)
+
+JOBS_DIR = os.path.join('data', 'batch_jobs')
+EMBEDDING_STORE_PATH = os.path.join('data', '03_processed', 'embedding_store.jsonl')
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+ENDPOINTS = {"translation": "/v1/chat/completions", "embedding": "/v1/embeddings"}
+MAX_REQUESTS_PER_FILE = 50_000          # Batch API 파일당 요청 수 한도
+MAX_BYTES_PER_FILE = 190 * 1024 * 1024  # Batch API 입력 파일 한도 200MB (여유분 제외)
+BATCH_DISCOUNT = 0.5                    # Batch API 가격 = 동기 호출의 50%
+ACTIVE_STATUSES = ("submitted", "validating", "in_progress", "finalizing", "cancelling")
+
+
+def load_texts(kind: str, input_path: str) -> List[str]:
+    """
+    작업 대상 텍스트 로드
+
+    - .txt: data_translate.py 와 같은 방식(chunk_book 기본값)으로 청크 분할
+    - .jsonl(.gz / .zst) / .json: data_translate.py 출력 (번역 = content_en, 임베딩 = content_ko)
+    """
+    if input_path.endswith(".txt"):
+        with open(input_path, "r", encoding="utf-8") as f:
+            return [chunk["content_en"] for chunk in chunk_book(f.read())]
+
+    field = "content_en" if kind == "translation" else "content_ko"
+    return [chunk[field] for _, chunk in chunk_io.iter_chunks(input_path) if chunk.get(field)]
+
+
+def open_store(kind: str, model: str, path: Optional[str] = None) -> ContentHashStore:
+    if kind == "translation":
+        return TranslationCheckpoint(path or CHECKPOINT_PATH, model, TRANSLATION_PROMPT_VERSION)
+    return EmbeddingStore(path or EMBEDDING_STORE_PATH, model)
+
+
+def request_line(kind: str, key: str, text: str, model: str) -> Dict:
+    """Batch API 입력 파일 한 줄"""
+    if kind == "translation":
+        body = translation_request_body(text, model)
+    else:
+        body = {"model": model, "input": text, "encoding_format": "float"}
+    return {"custom_id": key, "method": "POST", "url": ENDPOINTS[kind], "body": body}
+
+
+def parse_result_line(kind: str, line: Dict):
+    """결과 파일 한 줄 → (키, 값) / 실패면 (키, None)"""
+    response = line.get("response") or {}
+    if line.get("error") or response.get("status_code") != 200:
+        return line.get("custom_id"), None
+
+    body = response["body"]
+    if kind == "translation":
+        return line["custom_id"], body["choices"][0]["message"]["content"].strip()
+    return line["custom_id"], body["data"][0]["embedding"]
+
+
+class BatchJobRunner:
+    def __init__(self, client: Optional[OpenAI] = None, jobs_dir: str = JOBS_DIR):
+        """
+        배치 작업 관리자 초기화
+
+        Args:
+            client: OpenAI 호환 클라이언트 (prepare / ingest만 할 때는 없어도 됨)
+            jobs_dir: 작업 파일 / 결과 파일 / manifest.json 폴더
+        """
+        self.client = client
+        self.jobs_dir = Path(jobs_dir)
+        self.manifest_path = self.jobs_dir / "manifest.json"
+        self.jobs: List[Dict] = []
+        if self.manifest_path.exists():
+            self.jobs = json.loads(self.manifest_path.read_text(encoding="utf-8"))["jobs"]
+
+    def _save(self):
+        """manifest 저장 (임시 파일 → rename, 중간에 죽어도 깨지지 않음)"""
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"jobs": self.jobs}, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def _pending_keys(self, kind: str) -> Set[str]:
+        """아직 적재되지 않은 작업 파일에 들어 있는 키 (중복 제출 방지)"""
+        keys = set()
+        for job in self.jobs:
+            if job["kind"] != kind or job["status"] not in ("prepared",) + ACTIVE_STATUSES:
+                continue
+            with open(job["file"], "r", encoding="utf-8") as f:
+                keys.update(json.loads(line)["custom_id"] for line in f if line.strip())
+        return keys
+
+    # ===== 1. 작업 파일 작성 =====
+    def prepare(self, kind: str, texts: List[str], model: str, store_path: Optional[str] = None) -> List[Dict]:
+        """저장소에 없는 텍스트만 JSONL 작업 파일로 작성 (파일당 요청 수 / 용량 한도로 분할)"""
+        store = open_store(kind, model, store_path)
+        skip = self._pending_keys(kind)
+
+        lines: List[str] = []
+        for text in texts:
+            key = store.make_key(text)
+            if key in store or key in skip:
+                continue
+            skip.add(key)
+            lines.append(json.dumps(request_line(kind, key, text, model), ensure_ascii=False) + "\n")
+
+        if not lines:
+            print(f"✅ {kind}: 새로 처리할 요청이 없습니다 (전체 {len(texts)}개)")
+            return []
+
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        created = []
+        part: List[str] = []
+        part_bytes = 0
+
+        def flush():
+            path = self.jobs_dir / f"{kind}-{stamp}-{len(self.jobs) + len(created):03d}.jsonl"
+            path.write_text("".join(part), encoding="utf-8")
+            created.append({
+                "file": str(path),
+                "kind": kind,
+                "model": model,
+                "store": str(store.path),
+                "requests": len(part),
+                "status": "prepared",
+                "batch_id": None,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+            })
+
+        for line in lines:
+            size = len(line.encode("utf-8"))
+            if part and (len(part) >= MAX_REQUESTS_PER_FILE or part_bytes + size > MAX_BYTES_PER_FILE):
+                flush()
+                part, part_bytes = [], 0
+            part.append(line)
+            part_bytes += size
+        flush()
+
+        self.jobs.extend(created)
+        self._save()
+        print(f"📝 {kind}: 요청 {len(lines)}개 → 작업 파일 {len(created)}개 (전체 {len(texts)}개 중 {len(texts) - len(lines)}개는 이미 처리됐거나 중복)")
+        return created
+
+    # ===== 2. 제출 =====
+    def submit(self):
+        for job in self.jobs:
+            if job["status"] != "prepared":
+                continue
+            with open(job["file"], "rb") as f:
+                uploaded = self.client.files.create(file=f, purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint=ENDPOINTS[job["kind"]],
+                completion_window="24h",
+                metadata={"kind": job["kind"], "file": Path(job["file"]).name}
+            )
+            job.update({"status": "submitted", "input_file_id": uploaded.id, "batch_id": batch.id})
+            self._save()
+            print(f"🚀 제출: {Path(job['file']).name} → {batch.id} ({job['requests']}개 요청)")
+
+    # ===== 3. 폴링 + 적재 =====
+    def poll(self, wait: bool = False, interval: float = 30.0) -> List[Dict]:
+        """진행 중인 배치 상태 갱신, 끝난 배치는 결과 다운로드 후 적재"""
+        while True:
+            active = [job for job in self.jobs if job["status"] in ACTIVE_STATUSES]
+            for job in active:
+                batch = self.client.batches.retrieve(job["batch_id"])
+                counts = batch.request_counts
+                job["request_counts"] = {"total": counts.total, "completed": counts.completed, "failed": counts.failed} if counts else None
+                job["status"] = batch.status
+
+                if batch.status in ("completed", "expired", "cancelled", "failed"):
+                    # 만료 / 취소된 배치도 끝난 요청의 결과는 적재 (나머지는 다음 prepare 때 다시 포함)
+                    if batch.output_file_id:
+                        job["output_file"] = self._download(batch.output_file_id, job, "output")
+                    if batch.error_file_id:
+                        job["error_file"] = self._download(batch.error_file_id, job, "errors")
+                    self.ingest(job)
+                    job["status"] = "ingested" if batch.status == "completed" else f"ingested_{batch.status}"
+                self._save()
+                print(f"⏳ {job['batch_id']}: {job['status']} {job.get('request_counts') or ''}")
+
+            if not wait or not any(job["status"] in ACTIVE_STATUSES for job in self.jobs):
+                return self.jobs
+            time.sleep(interval)
+
+    def _download(self, file_id: str, job: Dict, suffix: str) -> str:
+        path = Path(job["file"]).with_suffix(f".{suffix}.jsonl")
+        path.write_bytes(self.client.files.content(file_id).content)
+        return str(path)
+
+    def ingest(self, job: Dict) -> Dict:
+        """작업의 결과 파일을 저장소에 적재 (여러 번 실행해도 같은 결과)"""
+        report = ingest_file(job.get("output_file"), job["kind"], job["model"], job["store"])
+        if job.get("error_file"):
+            with open(job["error_file"], "r", encoding="utf-8") as f:
+                report["failed"] += sum(1 for line in f if line.strip())
+        job["ingest"] = report
+        return report
+
+
+def ingest_file(path: Optional[str], kind: str, model: str, store_path: Optional[str] = None) -> Dict:
+    """Batch API 결과 파일 → 저장소 (키가 같으면 덮어쓰지 않음)"""
+    report = {"succeeded": 0, "failed": 0, "written": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    if not path:
+        return report
+
+    store = open_store(kind, model, store_path)
+    keys, values = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for raw in f:
+            if not raw.strip():
+                continue
+            line = json.loads(raw)
+            key, value = parse_result_line(kind, line)
+            if value is None:
+                report["failed"] += 1
+                continue
+            keys.append(key)
+            values.append(value)
+            usage = line["response"]["body"].get("usage") or {}
+            report["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            report["completion_tokens"] += usage.get("completion_tokens", 0)
+
+    report["succeeded"] = len(keys)
+    report["written"] = store.put_keys(keys, values)
+    cost = translation_cost(model, report["prompt_tokens"], report["completion_tokens"])
+    report["cost_usd"] = round(cost * BATCH_DISCOUNT, 4) if cost is not None else None
+    print(f"📥 적재: 성공 {report['succeeded']}개 (새로 기록 {report['written']}개), 실패 {report['failed']}개, 비용 {report['cost_usd']} USD")
+    return report
+
+
+def export_embeddings(input_path: str, output_path: str, model: str, store_path: Optional[str] = None) -> Dict:
+    """
+    번역 청크 파일 + 임베딩 저장소 → DB 적재용 JSON (book_id, chunk_index, chapter_name, text_content, embedding)
+
+    청크를 한 개씩 읽어 바로 기록 (JSON 배열 형식은 노트북 적재 코드와 동일)
+    """
+    store = open_store("embedding", model, store_path)
+    exported, missing = 0, 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for book, chunk in chunk_io.iter_chunks(input_path):
+            vector = store.get(chunk.get("content_ko") or "")
+            if vector is None:
+                missing += 1
+                continue
+            record = {
+                "book_id": book["book_id"],
+                "chunk_index": chunk["chunk_index"],
+                "chapter_name": chunk["chapter_name"],
+                "text_content": chunk["content_ko"],
+                "embedding": vector
+            }
+            f.write((", " if exported else "") + json.dumps(record, ensure_ascii=False))
+            exported += 1
+        f.write("]")
+    print(f"💾 {exported}개 청크 저장: {output_path} (임베딩 없음 {missing}개)")
+    return {"exported": exported, "missing": missing}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="번역 / 임베딩 오프라인 배치 작업")
+    parser.add_argument("--jobs-dir", default=JOBS_DIR)
+    parser.add_argument("--base-url", default=os.environ.get("OPENAI_BASE_URL"), help="OpenAI 호환 엔드포인트 (로컬 fake 서버 등)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    prepare = sub.add_parser("prepare", help="저장소에 없는 요청만 JSONL 작업 파일로 작성")
+    prepare.add_argument("--kind", choices=list(ENDPOINTS), required=True)
+    prepare.add_argument("--input", required=True, help="영어 정제 텍스트(.txt) 또는 data_translate.py 출력(.jsonl / .json)")
+    prepare.add_argument("--model", default=None, help=f"기본: 번역 {TRANSLATION_MODEL} / 임베딩 {EMBEDDING_MODEL}")
+    prepare.add_argument("--store", default=None, help="결과 저장소 경로 (기본: 체크포인트 / 임베딩 저장소)")
+
+    sub.add_parser("submit", help="작성된 작업 파일 업로드 + 배치 생성")
+
+    poll = sub.add_parser("poll", help="배치 상태 확인, 끝난 배치 결과 적재")
+    poll.add_argument("--wait", action="store_true", help="모든 배치가 끝날 때까지 대기")
+    poll.add_argument("--interval", type=float, default=30.0)
+
+    ingest = sub.add_parser("ingest", help="결과 파일 직접 적재")
+    ingest.add_argument("--kind", choices=list(ENDPOINTS), required=True)
+    ingest.add_argument("--file", required=True)
+    ingest.add_argument("--model", default=None)
+    ingest.add_argument("--store", default=None)
+
+    export = sub.add_parser("export-embeddings", help="DB 적재용 임베딩 JSON 생성")
+    export.add_argument("--input", required=True, help="data_translate.py 출력 JSONL(.gz / .zst) 또는 JSON")
+    export.add_argument("--output", default=None, help="기본: <input>_with_embeddings.json")
+    export.add_argument("--model", default=EMBEDDING_MODEL)
+    export.add_argument("--store", default=None)
+
+    args = parser.parse_args()
+    model = getattr(args, "model", None) or (TRANSLATION_MODEL if getattr(args, "kind", None) == "translation" else EMBEDDING_MODEL)
+
+    if args.command == "ingest":
+        ingest_file(args.file, args.kind, model, args.store)
+        return
+    if args.command == "export-embeddings":
+        export_embeddings(args.input, args.output or chunk_io.jsonl_path(args.input, "_with_embeddings.json"), model, args.store)
+        return
+
+    client = None
+    if args.command in ("submit", "poll"):
+        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=args.base_url)
+    runner = BatchJobRunner(client, args.jobs_dir)
+
+    if args.command == "prepare":
+        runner.prepare(args.kind, load_texts(args.kind, args.input), model, args.store)
+    elif args.command == "submit":
+        runner.submit()
+    elif args.command == "poll":
+        runner.poll(wait=args.wait, interval=args.interval)
+
+
+if __name__ == "__main__":
+    main()
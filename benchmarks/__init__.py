@@ -0,0 +1,5 @@
+"""
+성능 측정 도구 모음
+- loadtest : 가짜 OpenAI / Tavily / ComfyUI 서버에 붙인 FastAPI 앱 부하 테스트
+- micro    : 스텁 I/O 기반 마이크로 벤치마크 (기준: micro_baseline.json)
+"""
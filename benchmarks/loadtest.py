@@ -0,0 +1,462 @@
+# python -m benchmarks.loadtest --endpoints ask,generate --concurrency 1,4,16 --requests 40
+# python -m benchmarks.loadtest --compare benchmarks/results/loadtest-baseline.json
+"""
+End-to-end 부하 테스트
+1. 가짜 OpenAI / Tavily / ComfyUI 서버를 별도 프로세스로 실행 (지연 분포 / 오류율 설정)
+2. FastAPI 앱(benchmarks.serve:app)을 uvicorn으로 실행 - 외부 API 주소만 가짜 서버로 교체
+3. /rag/ask, /generate 를 동시성 단계별로 호출 → p50/p95/p99, 처리량, 이벤트 루프 lag 측정
+4. 결과 JSON 저장 (--compare 로 이전 결과와 p95/처리량 비교, 회귀 시 exit 1)
+- --cassette 를 주면 가짜 OpenAI / Tavily 대신 녹화된 실제 호출(fakes/cassette_server.py)을 재생
+
+Postgres(pgvector)와 Chroma는 실제 로컬 DB를 그대로 사용 (.env의 DB_* 설정)
+- 가짜 임베딩 차원(--embedding-dim)은 저장된 벡터 차원과 같아야 함
+- OpenAIEmbeddings가 tiktoken 인코딩 파일을 내려받으므로 오프라인이면 TIKTOKEN_CACHE_DIR 준비
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+import yaml
+
+from benchmarks.stats import summarize
+from fakes.latency import LatencyModel
+
+PASSAGES = [
+    "그 집을 사이클론의 한가운데로 끌어올렸다",
+    "도로시는 토토를 품에 안고 지하실로 향했다",
+    "허수아비는 뇌가 없어서 생각을 할 수 없다고 말했다",
+    "양철 나무꾼은 심장을 갖고 싶어 했다",
+]
+QUESTIONS = [
+    "여기서 사이클론이 의미하는게 뭐야?",
+    "왜 지하실이 필요했어?",
+    "허수아비는 왜 뇌를 원했어?",
+    "이 장면이 이야기에서 어떤 의미야?",
+]
+SCENES = [
+    "도로시가 토토를 안고 노란 벽돌길을 걷는 장면",
+    "사이클론에 휩쓸려 날아가는 집",
+    "허수아비가 옥수수밭 장대에 매달려 있는 모습",
+    "에메랄드 시의 초록색 성문",
+]
+
+LAG_PATH = "/__loadtest__/loop_lag"
+
+
+# ===== 가짜 서버 프로세스 =====
+def _run_fakes(options: Dict, ports: Dict[str, int]):
+    """가짜 서버들을 한 프로세스(이벤트 루프)에서 실행"""
+    from aiohttp import web
+    from fakes.cassette_server import Cassette, CassetteServer
+    from fakes.comfyui_server import FakeComfyUIServer
+    from fakes.openai_server import FakeOpenAIServer
+    from fakes.tavily_server import FakeTavilyServer
+
+    if options["cassette"]:
+        fakes = {"cassette": CassetteServer(
+            "replay",
+            Cassette(options["cassette"]),
+            latency_scale=options["latency_scale"],
+            match=options["match"]
+        )}
+    else:
+        fakes = {
+            "openai": FakeOpenAIServer(
+                chat_latency=LatencyModel.parse(options["llm_latency"], options["llm_error_rate"], options["seed"]),
+                embedding_latency=LatencyModel.parse(options["embedding_latency"], options["llm_error_rate"], options["seed"]),
+                reply_tokens=options["reply_tokens"],
+                embedding_dim=options["embedding_dim"]
+            ),
+            "tavily": FakeTavilyServer(LatencyModel.parse(options["tavily_latency"], options["tavily_error_rate"], options["seed"])),
+        }
+    fakes["comfyui"] = FakeComfyUIServer(
+        steps=options["comfyui_steps"],
+        step_delay=options["comfyui_step_delay"],
+        error_rate=options["comfyui_error_rate"]
+    )
+
+    async def serve():
+        for name, fake in fakes.items():
+            runner = web.AppRunner(fake.make_app(), access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, "127.0.0.1", ports[name]).start()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def _write_app_config(comfyui_port: int, workdir: str) -> str:
+    """config.yaml 복사본 - ComfyUI 주소와 이미지 캐시 위치만 교체"""
+    with open("config.yaml", "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    config["comfyui_server"] = f"127.0.0.1:{comfyui_port}"
+    config["image_cache"] = {"enabled": True, "dir": "generated_images/loadtest", "max_disk_mb": 256}
+
+    path = os.path.join(workdir, "config.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return path
+
+
+def _app_env(args, ports: Dict[str, int], config_path: str) -> Dict[str, str]:
+    if "cassette" in ports:
+        openai_url = f"http://127.0.0.1:{ports['cassette']}/openai/v1"
+        tavily_url = f"http://127.0.0.1:{ports['cassette']}/tavily"
+    else:
+        openai_url = f"http://127.0.0.1:{ports['openai']}/v1"
+        tavily_url = f"http://127.0.0.1:{ports['tavily']}"
+
+    env = dict(os.environ)
+    env.update({
+        "APP_CONFIG": config_path,
+        "OPENAI_BASE_URL": openai_url,
+        "OPENAI_API_KEY": "sk-loadtest",
+        "TAVILY_API_BASE_URL": tavily_url,
+        "TAVILY_API_KEY": "tvly-loadtest",
+        "PYTHONUNBUFFERED": "1",
+    })
+    if args.cache_backend:
+        env["CACHE_BACKEND"] = args.cache_backend
+    return env
+
+
+async def _wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            try:
+                async with session.get(f"{base_url}/connection_check") as response:
+                    if response.status == 200:
+                        return True
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    return False
+
+
+# ===== 요청 생성 =====
+def make_payload(endpoint: str, index: int, distinct: bool, image_size: int) -> Dict:
+    """index번째 요청 본문 (distinct면 캐시/요청 합치기에 걸리지 않도록 요청마다 다르게)"""
+    suffix = f" (#{index})" if distinct else ""
+
+    if endpoint == "ask":
+        return {
+            "selected_passage": PASSAGES[index % len(PASSAGES)],
+            "user_question": QUESTIONS[index % len(QUESTIONS)] + suffix,
+            "k": 5
+        }
+
+    payload = {
+        "user_input": SCENES[index % len(SCENES)],
+        "book_id": "the_wizard_of_oz",
+        "steps": 20,
+        "width": image_size,
+        "height": image_size
+    }
+    if distinct:
+        payload["seed"] = index
+    return payload
+
+
+ENDPOINT_PATHS = {"ask": "/rag/ask", "generate": "/generate"}
+
+
+async def _call(session: aiohttp.ClientSession, url: str, payload: Dict, timeout: float) -> Dict:
+    started = time.perf_counter()
+    try:
+        async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            body = await response.read()
+            status = response.status
+    except asyncio.TimeoutError:
+        return {"latency_ms": (time.perf_counter() - started) * 1000, "status": "timeout", "ok": False}
+    except aiohttp.ClientError as e:
+        return {"latency_ms": (time.perf_counter() - started) * 1000, "status": type(e).__name__, "ok": False}
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+
+    # /generate 는 내부 오류 시 200 + null 을 반환하므로 본문까지 확인
+    ok = 200 <= status < 300 and isinstance(data, dict) and ("answer" in data or "image_url" in data)
+    return {"latency_ms": latency_ms, "status": status, "ok": ok}
+
+
+async def run_level(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    endpoint: str,
+    concurrency: int,
+    total: int,
+    args,
+    offset: int = 0
+) -> Dict:
+    """동시성 1단계: concurrency개 워커가 total개 요청을 나눠서 연속 호출 (closed loop)"""
+    url = base_url + ENDPOINT_PATHS[endpoint]
+    counter = iter(range(offset, offset + total))
+    results: List[Dict] = []
+
+    async def worker():
+        for index in counter:
+            payload = make_payload(endpoint, index, not args.repeat, args.image_size)
+            results.append(await _call(session, url, payload, args.timeout))
+
+    await _get_json(session, f"{base_url}{LAG_PATH}?reset=1")
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    lag = await _get_json(session, f"{base_url}{LAG_PATH}")
+
+    ok = [r for r in results if r["ok"]]
+    status_counts: Dict[str, int] = {}
+    for r in results:
+        status_counts[str(r["status"])] = status_counts.get(str(r["status"]), 0) + 1
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "ok": len(ok),
+        "errors": len(results) - len(ok),
+        "error_rate": round((len(results) - len(ok)) / max(len(results), 1), 4),
+        "status_counts": status_counts,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": summarize([r["latency_ms"] for r in ok]),
+        "latency_all_ms": summarize([r["latency_ms"] for r in results]),
+        "loop_lag_ms": lag,
+    }
+
+
+async def _get_json(session: aiohttp.ClientSession, url: str) -> Optional[Dict]:
+    try:
+        async with session.get(url) as response:
+            return await response.json()
+    except (aiohttp.ClientError, ValueError):
+        return None
+
+
+async def run_load(args, base_url: str, fake_ports: Dict[str, int]) -> Dict:
+    levels = [int(c) for c in args.concurrency.split(",")]
+    endpoints = args.endpoints.split(",")
+    connector = aiohttp.TCPConnector(limit=max(levels) * 2)
+
+    results = []
+    async with aiohttp.ClientSession(connector=connector) as session:
+        offset = 0
+        for endpoint in endpoints:
+            # 워밍업 (임포트 / 커넥션 풀 / 싱글톤 초기화)
+            await run_level(session, base_url, endpoint, 1, args.warmup, args, offset)
+            offset += args.warmup
+
+            for concurrency in levels:
+                result = await run_level(session, base_url, endpoint, concurrency, args.requests, args, offset)
+                offset += args.requests
+                results.append(result)
+                _print_row(result)
+
+        fake_stats = {
+            name: await _get_json(session, f"http://127.0.0.1:{port}/__stats__")
+            for name, port in fake_ports.items()
+        }
+
+    return {"results": results, "fakes": fake_stats}
+
+
+# ===== 출력 / 비교 =====
+def _print_row(result: Dict):
+    latency = result["latency_ms"]
+    lag = result["loop_lag_ms"] or {}
+    print(
+        f"{result['endpoint']:<9} c={result['concurrency']:<4} "
+        f"ok={result['ok']}/{result['requests']:<5} "
+        f"p50={latency['p50']:>8.1f} p95={latency['p95']:>8.1f} p99={latency['p99']:>8.1f}ms  "
+        f"{result['throughput_rps']:>7.2f} rps  "
+        f"lag p99={lag.get('p99', 0):.1f} max={lag.get('max', 0):.1f}ms"
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """p95 지연 증가 / 처리량 감소가 tolerance(비율)를 넘는 항목"""
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+
+    for result in current["results"]:
+        old = previous.get((result["endpoint"], result["concurrency"]))
+        if not old or not old["ok"] or not result["ok"]:
+            continue
+
+        name = f"{result['endpoint']} c={result['concurrency']}"
+        p95, old_p95 = result["latency_ms"]["p95"], old["latency_ms"]["p95"]
+        rps, old_rps = result["throughput_rps"], old["throughput_rps"]
+        print(f"{name:<16} p95 {old_p95:.1f} → {p95:.1f}ms, 처리량 {old_rps:.2f} → {rps:.2f} rps")
+
+        if old_p95 and p95 > old_p95 * (1 + tolerance):
+            regressions.append(f"{name}: p95 {old_p95:.1f} → {p95:.1f}ms")
+        if old_rps and rps < old_rps * (1 - tolerance):
+            regressions.append(f"{name}: 처리량 {old_rps:.2f} → {rps:.2f} rps")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 외부 서버 기반 End-to-end 부하 테스트")
+    parser.add_argument("--endpoints", default="ask,generate", help="ask, generate (쉼표 구분)")
+    parser.add_argument("--concurrency", default="1,4,16", help="동시성 단계 (쉼표 구분)")
+    parser.add_argument("--requests", type=int, default=40, help="단계별 요청 수")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청 1개 타임아웃 (초)")
+    parser.add_argument("--repeat", action="store_true", help="같은 요청 반복 (캐시 / 요청 합치기 효과 측정)")
+    parser.add_argument("--image-size", type=int, default=512)
+    # 앱
+    parser.add_argument("--app-port", type=int, default=8403)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수")
+    parser.add_argument("--cache-backend", default=None, help="CACHE_BACKEND 덮어쓰기 (memory / sqlite / redis)")
+    parser.add_argument("--startup-timeout", type=float, default=90.0)
+    # 가짜 서버
+    parser.add_argument("--fake-port", type=int, default=8390, help="가짜 서버 시작 포트 (openai, tavily, comfyui 순)")
+    parser.add_argument("--llm-latency", default="lognormal:300:0.5", help="fixed:ms / uniform:min:max / lognormal:median:sigma")
+    parser.add_argument("--embedding-latency", default="lognormal:40:0.3")
+    parser.add_argument("--tavily-latency", default="lognormal:800:0.4")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--tavily-error-rate", type=float, default=0.0)
+    parser.add_argument("--comfyui-error-rate", type=float, default=0.0)
+    parser.add_argument("--comfyui-steps", type=int, default=20)
+    parser.add_argument("--comfyui-step-delay", type=float, default=0.05)
+    parser.add_argument("--reply-tokens", type=int, default=120)
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cassette", default=None, help="가짜 OpenAI / Tavily 대신 재생할 카세트 (JSONL)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="카세트 재생 지연 배율")
+    parser.add_argument("--match", choices=["exact", "path"], default="path", help="카세트 요청 매칭 방식")
+    # 결과
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: benchmarks/results/loadtest-<시각>.json)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀 판정 허용 비율")
+    args = parser.parse_args()
+
+    fake_options = {
+        "llm_latency": args.llm_latency,
+        "embedding_latency": args.embedding_latency,
+        "tavily_latency": args.tavily_latency,
+        "llm_error_rate": args.llm_error_rate,
+        "tavily_error_rate": args.tavily_error_rate,
+        "comfyui_error_rate": args.comfyui_error_rate,
+        "comfyui_steps": args.comfyui_steps,
+        "comfyui_step_delay": args.comfyui_step_delay,
+        "reply_tokens": args.reply_tokens,
+        "embedding_dim": args.embedding_dim,
+        "seed": args.seed,
+        "cassette": args.cassette,
+        "latency_scale": args.latency_scale,
+        "match": args.match,
+    }
+    if args.cassette:
+        fake_ports = {"cassette": args.fake_port, "comfyui": args.fake_port + 2}
+    else:
+        fake_ports = {"openai": args.fake_port, "tavily": args.fake_port + 1, "comfyui": args.fake_port + 2}
+    base_url = f"http://127.0.0.1:{args.app_port}"
+
+    fakes = multiprocessing.get_context("spawn").Process(target=_run_fakes, args=(fake_options, fake_ports), daemon=True)
+    fakes.start()
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    app_log_path = os.path.join(workdir, "app.log")
+    app_log = open(app_log_path, "w", encoding="utf-8")
+    app = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.serve:app",
+            "--host", "127.0.0.1", "--port", str(args.app_port),
+            "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"
+        ],
+        env=_app_env(args, fake_ports, _write_app_config(fake_ports["comfyui"], workdir)),
+        stdout=app_log,
+        stderr=subprocess.STDOUT
+    )
+
+    try:
+        print(f"앱 시작 대기 중... (로그: {app_log_path})")
+        if not asyncio.run(_wait_until_ready(base_url, app, args.startup_timeout)):
+            app_log.flush()
+            print("❌ 앱이 시작되지 않았습니다. 로그 마지막 부분:")
+            print("".join(open(app_log_path, encoding="utf-8").readlines()[-30:]))
+            sys.exit(1)
+
+        print(f"부하 테스트: endpoints={args.endpoints} concurrency={args.concurrency} requests={args.requests}\n")
+        report = asyncio.run(run_load(args, base_url, fake_ports))
+    finally:
+        app.terminate()
+        try:
+            app.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            app.kill()
+        app_log.close()
+        fakes.terminate()
+
+    report["meta"] = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "workers": args.workers,
+        "cache_backend": args.cache_backend or os.getenv("CACHE_BACKEND", "memory"),
+        "distinct_requests": not args.repeat,
+        "requests_per_level": args.requests,
+        "fakes": {
+            "llm": LatencyModel.parse(args.llm_latency, args.llm_error_rate).describe(),
+            "embedding": LatencyModel.parse(args.embedding_latency, args.llm_error_rate).describe(),
+            "tavily": LatencyModel.parse(args.tavily_latency, args.tavily_error_rate).describe(),
+            "comfyui": {
+                "steps": args.comfyui_steps,
+                "step_delay": args.comfyui_step_delay,
+                "error_rate": args.comfyui_error_rate
+            },
+            "cassette": {"path": args.cassette, "latency_scale": args.latency_scale, "match": args.match} if args.cassette else None,
+        },
+        "app_log": app_log_path,
+    }
+
+    output = Path(args.output or f"benchmarks/results/loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        print(f"\n=== {args.compare} 와 비교 ===")
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ 성능 회귀:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✅ 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+# python -m benchmarks.micro
+# python -m benchmarks.micro --compare benchmarks/micro_baseline.json
+# python -m benchmarks.micro --save benchmarks/micro_baseline.json
+"""
+마이크로 벤치마크 (요청 1건 중 프레임워크 / 순수 파이썬 오버헤드 측정)
+- 외부 I/O(OpenAI, DB, ComfyUI)는 전부 즉시 반환하는 스텁으로 대체
+- 벤치마크별로 반복 횟수를 자동 보정 → rounds회 측정 → 1회당 시간(µs) 통계
+- --compare 로 기준 파일(micro_baseline.json)과 최솟값 비교 (노이즈에 가장 덜 민감), 회귀 시 exit 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# 백엔드 설정(Settings) 로드용 더미 값 - 실제 연결은 하지 않음
+for _name in ("DB_NAME", "DB_USER", "DB_PASS", "DB_HOST", "DB_PORT", "OPENAI_API_KEY"):
+    os.environ.setdefault(_name, "benchmark")
+
+BENCHMARKS: List[Dict] = []
+
+
+def benchmark(group: str, name: str, is_async: bool = False):
+    """벤치마크 등록 데코레이터 - 함수는 측정할 callable(또는 coroutine 함수)을 반환"""
+    def decorator(setup: Callable):
+        BENCHMARKS.append({"group": group, "name": name, "setup": setup, "is_async": is_async})
+        return setup
+    return decorator
+
+
+# ===== 대상: LangGraph =====
+class _StubPlanner:
+    async def analyze(self, selected_passage, user_question):
+        return {"need_rag": True, "need_web": True, "question_type": "contextual", "complexity": "medium"}
+
+
+class _StubVectorStoreManager:
+    async def hybrid_search(self, selected_passage, user_question, k=5):
+        return {"text": "[구절 1 - 1장]\n사이클론이 집을 들어올렸다.", "book_title": "오즈의 마법사", "book_author": "L. 프랭크 바움"}
+
+
+class _StubRAGEngine:
+    async def generate_answer(self, *args):
+        return "사이클론은 강한 회오리바람을 뜻합니다."
+
+
+class _StubEvaluator:
+    async def evaluate(self, question, context, answer):
+        return 0.9
+
+
+class _StubWebSearch:
+    async def search(self, *args):
+        return "웹 검색 결과"
+
+
+class _StubMerger:
+    async def merge(self, rag_result, web_result, user_question):
+        return rag_result + "\n" + web_result
+
+
+def _stub_assistant_system():
+    """외부 호출 없이 그래프만 실제로 돌리는 ReadingAssistantSystem"""
+    from backend.app.core.system import ReadingAssistantSystem
+
+    system = ReadingAssistantSystem.__new__(ReadingAssistantSystem)
+    system.planner = _StubPlanner()
+    system.vector_store_manager = _StubVectorStoreManager()
+    system.rag_engine = _StubRAGEngine()
+    system.rag_evaluator = _StubEvaluator()
+    system.web_search_engine = _StubWebSearch()
+    system.document_merger = _StubMerger()
+    system.rag_score_threshold = 0.6
+    system.max_retries = 2
+    system.graph = system._create_graph()
+    return system
+
+
+@benchmark("graph", "debug_reducer")
+def bench_debug_reducer():
+    from backend.app.core.system import debug_reducer
+
+    cases = [
+        (None, "사이클론"), ("old", ""), ("old", "Unknown"), (None, 5), (3, None),
+        ({}, {"need_rag": True}), ({"a": 1}, {}), (None, None), ("a", ["b"]), ("old", "new"),
+    ]
+
+    def run():
+        for old, new in cases:
+            debug_reducer(old, new)
+    return run
+
+
+@benchmark("graph", "state_merge_noop_graph", is_async=True)
+def bench_noop_graph():
+    """GraphState(리듀서 포함)로 같은 모양의 빈 그래프 실행 → LangGraph 자체 오버헤드"""
+    from langgraph.graph import StateGraph, START, END
+    from backend.app.core.system import GraphState
+
+    workflow = StateGraph(GraphState)
+    workflow.add_node("planner", lambda state: {"plan": {"need_rag": True}, "book_title": "오즈의 마법사"})
+    workflow.add_node("rag", lambda state: {"rag_result": "답변"})
+    workflow.add_node("web_search", lambda state: {"web_result": "웹"})
+    workflow.add_node("evaluate", lambda state: {"rag_score": 0.9})
+    workflow.add_node("merge", lambda state: {"final_answer": "최종"})
+    workflow.add_edge(START, "planner")
+    workflow.add_edge("planner", "rag")
+    workflow.add_edge("planner", "web_search")
+    workflow.add_edge("rag", "evaluate")
+    workflow.add_edge("evaluate", "merge")
+    workflow.add_edge("web_search", "merge")
+    workflow.add_edge("merge", END)
+    graph = workflow.compile()
+
+    state = {"selected_passage": "그 집을 사이클론의 한가운데로 끌어올렸다", "user_question": "사이클론?", "k": 5, "retry_count": 0}
+
+    async def run():
+        await graph.ainvoke(state)
+    return run
+
+
+@benchmark("graph", "assistant_ask_stubbed", is_async=True)
+def bench_assistant_ask():
+    """실제 노드 코드(state 출력 포함) + 스텁 엔진으로 ask() 1회"""
+    system = _stub_assistant_system()
+
+    async def run():
+        await system.ask("그 집을 사이클론의 한가운데로 끌어올렸다", "여기서 사이클론이 의미하는게 뭐야?", 5)
+    return run
+
+
+# ===== 대상: hybrid_search =====
+def _documents(count: int, offset: int = 0):
+    from langchain.schema import Document
+    return [
+        Document(
+            page_content=f"도로시는 토토와 함께 노란 벽돌길을 따라 걸었다. 문단 {i}. " * 6,
+            metadata={"book_id": 1, "chapter_name": f"{i % 24 + 1}장", "chunk_index": i}
+        )
+        for i in range(offset, offset + count)
+    ]
+
+
+@benchmark("retrieval", "hybrid_dedup_k5")
+def bench_dedup():
+    from backend.app.core.vector_store import VectorStoreManager
+
+    # 구절 검색 / 질문 검색 결과가 절반쯤 겹치는 경우
+    results = [_documents(5), _documents(5, offset=3)]
+
+    def run():
+        VectorStoreManager._dedup_docs(results, 5)
+    return run
+
+
+@benchmark("retrieval", "hybrid_format_k5")
+def bench_format():
+    from backend.app.core.vector_store import VectorStoreManager
+
+    docs = _documents(5)
+
+    def run():
+        VectorStoreManager._format_docs(docs)
+    return run
+
+
+class _StubVectorStore:
+    def __init__(self):
+        self.docs = _documents(5)
+
+    def similarity_search_by_vector(self, vector, k):
+        return self.docs[:k]
+
+
+class _StubEmbeddings:
+    async def aembed_query(self, text):
+        return [0.01] * 1536
+
+
+class _StubDatabaseManager:
+    async def get_book_metadata(self, book_id):
+        return {"book_title": "오즈의 마법사", "book_author": "L. 프랭크 바움"}
+
+
+@benchmark("retrieval", "hybrid_search_stubbed", is_async=True)
+def bench_hybrid_search():
+    """임베딩(캐시 hit) → 스레드 검색 → 중복 제거 → 메타데이터 → 포맷팅 전체"""
+    from backend.app.core.cache import InProcessCacheBackend, get_cache, set_cache_backend
+    from backend.app.core.vector_store import VectorStoreManager
+
+    set_cache_backend(InProcessCacheBackend())
+    manager = VectorStoreManager.__new__(VectorStoreManager)
+    manager.db_manager = _StubDatabaseManager()
+    manager.embeddings = _StubEmbeddings()
+    manager.vector_store = _StubVectorStore()
+    manager.embedding_cache = get_cache("embedding")
+
+    async def run():
+        await manager.hybrid_search("그 집을 사이클론의 한가운데로 끌어올렸다", "여기서 사이클론이 의미하는게 뭐야?", 5)
+    return run
+
+
+# ===== 대상: 프롬프트 / ComfyUI =====
+SENTENCE_INPUTS = [
+    "도로시, 토토, 허수아비",
+    "도로시가 토토를 안고 노란 벽돌길을 걷는 장면",
+    "에메랄드 시",
+    "사이클론에 휩쓸려 날아가는 집을 그려줘",
+    "양철 나무꾼 도끼 숲 오두막 기름통",
+    "허수아비는 뇌가 없다고 말했다",
+]
+
+
+@benchmark("prompt", "is_sentence_input_x6")
+def bench_is_sentence_input():
+    from prompt_generator import PromptGenerator
+
+    generator = PromptGenerator()
+
+    def run():
+        for text in SENTENCE_INPUTS:
+            generator._is_sentence_input(text)
+    return run
+
+
+@benchmark("prompt", "comfyui_inject_prompt")
+def bench_inject_prompt():
+    """워크플로우 생성 + 프롬프트 주입 (요청마다 새 워크플로우를 만드는 실제 경로)"""
+    from comfyui_client import ComfyUIClient
+
+    client = ComfyUIClient(server_address="127.0.0.1:0", deterministic_seed=True)
+    prompt_data = {
+        "positive": "storybook illustration, a girl in a blue gingham dress walking on a yellow brick road with a small black dog",
+        "style_params": {"steps": 20, "cfg_scale": 1.0, "width": 1024, "height": 1024, "lora_strength": 0.8}
+    }
+
+    def run():
+        client._inject_prompt(client._get_flux_workflow(), prompt_data)
+    return run
+
+
+# ===== 대상: 응답 직렬화 =====
+@benchmark("response", "rag_response_model_dump_json")
+def bench_rag_response_json():
+    from backend.app.models.response import RAGResponse
+
+    answer = "사이클론은 강한 회오리바람으로, 이 장면에서는 도로시를 일상에서 환상의 세계로 데려가는 계기입니다. " * 20
+
+    def run():
+        RAGResponse(answer=answer, book_title="오즈의 마법사", book_author="L. 프랭크 바움", rag_score=0.85).model_dump_json()
+    return run
+
+
+@benchmark("response", "rag_response_fastapi_path")
+def bench_rag_response_fastapi():
+    """FastAPI response_model 경로와 같은 순서: 모델 생성 → jsonable_encoder → JSONResponse 렌더링"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from backend.app.models.response import RAGResponse
+
+    answer = "사이클론은 강한 회오리바람으로, 이 장면에서는 도로시를 일상에서 환상의 세계로 데려가는 계기입니다. " * 20
+
+    def run():
+        response = RAGResponse(answer=answer, book_title="오즈의 마법사", book_author="L. 프랭크 바움", rag_score=0.85)
+        JSONResponse(jsonable_encoder(response)).body
+    return run
+
+
+# ===== 측정 =====
+def _calibrate(run_batch: Callable[[int], float], min_time: float) -> int:
+    """1회 배치가 min_time 이상 걸리는 반복 횟수"""
+    number = 1
+    while True:
+        if run_batch(number) >= min_time or number >= 10 ** 7:
+            return number
+        number *= 2
+
+
+def measure(entry: Dict, rounds: int, min_time: float) -> Dict:
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        target = entry["setup"]()
+
+        if entry["is_async"]:
+            loop = asyncio.new_event_loop()
+
+            async def batch(number: int) -> float:
+                started = time.perf_counter()
+                for _ in range(number):
+                    await target()
+                return time.perf_counter() - started
+
+            run_batch = lambda number: loop.run_until_complete(batch(number))
+        else:
+            def run_batch(number: int) -> float:
+                started = time.perf_counter()
+                for _ in range(number):
+                    target()
+                return time.perf_counter() - started
+
+        try:
+            run_batch(1)  # 워밍업 (지연 import / 캐시 채우기)
+            number = _calibrate(run_batch, min_time)
+            per_op = [run_batch(number) / number * 1e6 for _ in range(rounds)]
+        finally:
+            if entry["is_async"]:
+                loop.close()
+
+    return {
+        "group": entry["group"],
+        "iterations": number,
+        "rounds": rounds,
+        "min_us": round(min(per_op), 3),
+        "median_us": round(statistics.median(per_op), 3),
+        "mean_us": round(statistics.mean(per_op), 3),
+        "stddev_us": round(statistics.stdev(per_op), 3) if rounds > 1 else 0.0,
+        "ops_per_sec": round(1e6 / statistics.median(per_op), 1),
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """최솟값이 tolerance(비율) 이상 느려진 벤치마크"""
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if not old:
+            print(f"{name:<32} (기준 없음)")
+            continue
+        ratio = result["min_us"] / old["min_us"] if old["min_us"] else 1.0
+        mark = "❌" if ratio > 1 + tolerance else ("✅" if ratio < 1 - tolerance else "  ")
+        print(f"{mark} {name:<32} {old['min_us']:>10.2f} → {result['min_us']:>10.2f}µs  (x{ratio:.2f})")
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {old['min_us']:.2f} → {result['min_us']:.2f}µs (x{ratio:.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="마이크로 벤치마크 (스텁 I/O)")
+    parser.add_argument("--filter", default=None, help="이름/그룹에 이 문자열이 포함된 벤치마크만")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.1, help="라운드당 최소 측정 시간 (초)")
+    parser.add_argument("--save", default=None, help="결과 JSON 저장 경로 (기준 파일 갱신 시)")
+    parser.add_argument("--compare", default=None, help="비교할 기준 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="회귀 판정 허용 비율")
+    args = parser.parse_args()
+
+    selected = [
+        b for b in BENCHMARKS
+        if not args.filter or args.filter in b["name"] or args.filter in b["group"]
+    ]
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": {}
+    }
+
+    print(f"{'benchmark':<32} {'median':>12} {'min':>12} {'stddev':>10} {'ops/s':>12}")
+    for entry in selected:
+        result = measure(entry, args.rounds, args.min_time)
+        report["benchmarks"][entry["name"]] = result
+        print(
+            f"{entry['name']:<32} {result['median_us']:>10.2f}µs {result['min_us']:>10.2f}µs "
+            f"{result['stddev_us']:>8.2f}µs {result['ops_per_sec']:>12.1f}"
+        )
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\n결과 저장: {args.save}")
+
+    if args.compare:
+        print(f"\n=== {args.compare} 와 비교 (허용 {args.tolerance:.0%}) ===")
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ 성능 회귀:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✅ 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
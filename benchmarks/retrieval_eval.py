@@ -0,0 +1,253 @@
+# python -m benchmarks.retrieval_eval build --chunks data/03_processed/chunked_data_the_wizard_of_oz.jsonl --out benchmarks/golden/the_wizard_of_oz.jsonl
+# python -m benchmarks.retrieval_eval run --golden benchmarks/golden/the_wizard_of_oz.jsonl --k 3,5,8 --budgets 0,800,1500 --target-recall 0.8
+"""
+검색 품질 vs 비용 오프라인 평가
+- 골든셋 (구절, 질문, 정답 청크 id) 을 실제 hybrid_search 에 k / 인덱스 파라미터 / 컨텍스트 예산별로 실행
+- recall@k, MRR, 적중률, RAG 프롬프트 토큰 수, 검색 지연(p50/p95) 리포트
+- --target-recall 을 만족하는 설정 중 프롬프트 토큰이 가장 적은 설정 추천
+
+골든셋 형식 (JSONL, 1줄 = 1문항):
+  {"passage": "...", "question": "...", "relevant": ["1:12", "1:13"]}
+  relevant 는 VectorStoreManager.chunk_id 형식 (chunk_id 메타데이터, 없으면 book_id:chunk_index)
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.stats import summarize
+from chunk_io import iter_chunks
+
+QUESTION_TEMPLATES = [
+    "이 장면에서 무슨 일이 일어나고 있어?",
+    "여기서 이 인물은 왜 이렇게 행동했어?",
+    "이 구절이 이야기에서 어떤 의미야?",
+    "이 부분을 쉽게 설명해 줘",
+]
+
+
+# ===== 골든셋 =====
+def load_golden(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_golden(chunks_path: str, samples: int, seed: int = 42, min_length: int = 10) -> List[Dict]:
+    """
+    번역 청크 파일 (data_translate.py 출력 JSONL / 예전 JSON) 에서 합성 골든셋 생성
+    - 청크 안의 한 문장을 '선택 구절'로, 그 청크를 정답으로 사용 (자기 검색 기준선)
+    - 실제 사용자 질문 골든셋이 생기면 그쪽을 우선 사용
+    """
+    candidates = []
+    for book, chunk in iter_chunks(chunks_path):
+        sentences = [
+            s.strip() for s in re.split(r"(?<=[.!?。])\s+|\n+", chunk.get("content_ko") or "")
+            if len(s.strip()) >= min_length
+        ]
+        if sentences:
+            candidates.append((book["book_id"], chunk, sentences))
+
+    rng = random.Random(seed)
+    golden = []
+    for book_id, chunk, sentences in rng.sample(candidates, min(samples, len(candidates))):
+        golden.append({
+            "passage": rng.choice(sentences),
+            "question": rng.choice(QUESTION_TEMPLATES),
+            "relevant": [chunk.get("chunk_id") or f"{book_id}:{chunk['chunk_index']}"],
+        })
+    return golden
+
+
+# ===== 지표 =====
+def recall_at_k(retrieved: List[str], relevant: List[str]) -> float:
+    if not relevant:
+        return 0.0
+    return len(set(retrieved) & set(relevant)) / len(set(relevant))
+
+
+def reciprocal_rank(retrieved: List[str], relevant: List[str]) -> float:
+    for rank, chunk_id in enumerate(retrieved, 1):
+        if chunk_id in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def prompt_tokens(result: Dict, passage: str, question: str) -> Dict[str, int]:
+    """실제 RAG 프롬프트로 포맷팅했을 때의 토큰 수"""
+    from backend.app.core.tokens import count_tokens
+    from backend.app.prompts.rag_prompts import RAG_PROMPT
+
+    prompt = RAG_PROMPT.format(
+        context=result["text"],
+        book_title=result["book_title"],
+        book_author=result["book_author"],
+        selected_passage=passage,
+        user_question=question
+    )
+    return {"prompt": count_tokens(prompt), "context": count_tokens(result["text"])}
+
+
+async def evaluate_config(manager, golden: List[Dict], k: int, budget: Optional[int]) -> Dict:
+    """설정 1개로 골든셋 전체 실행 (순차 실행 → 지연은 단일 요청 기준)"""
+    recalls, rrs, hits, latencies, prompt_sizes, context_sizes = [], [], [], [], [], []
+
+    for item in golden:
+        started = time.perf_counter()
+        result = await manager.hybrid_search(item["passage"], item["question"], k, max_context_tokens=budget or None)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        retrieved = result.get("chunk_ids", [])
+        recalls.append(recall_at_k(retrieved, item["relevant"]))
+        rrs.append(reciprocal_rank(retrieved, item["relevant"]))
+        hits.append(1.0 if recalls[-1] > 0 else 0.0)
+
+        tokens = prompt_tokens(result, item["passage"], item["question"])
+        prompt_sizes.append(tokens["prompt"])
+        context_sizes.append(tokens["context"])
+
+    count = max(len(golden), 1)
+    return {
+        "recall": round(sum(recalls) / count, 4),
+        "mrr": round(sum(rrs) / count, 4),
+        "hit_rate": round(sum(hits) / count, 4),
+        "prompt_tokens": summarize(prompt_sizes, digits=1),
+        "context_tokens": summarize(context_sizes, digits=1),
+        "latency_ms": summarize(latencies),
+    }
+
+
+def recommend(results: List[Dict], target_recall: float, target_mrr: float = 0.0) -> Optional[Dict]:
+    """목표 품질을 만족하는 설정 중 프롬프트 토큰(평균) → p95 지연 순으로 가장 저렴한 것"""
+    passing = [r for r in results if r["recall"] >= target_recall and r["mrr"] >= target_mrr]
+    if not passing:
+        return None
+    return min(passing, key=lambda r: (r["prompt_tokens"]["mean"], r["latency_ms"]["p95"]))
+
+
+# ===== 실행 =====
+def parse_index_params(spec: str) -> List[Dict[str, int]]:
+    """"hnsw.ef_search=40;hnsw.ef_search=100" → [{"hnsw.ef_search": 40}, {"hnsw.ef_search": 100}] (빈 값 = 기본값)"""
+    configs = []
+    for group in spec.split(";"):
+        params = {}
+        for pair in filter(None, group.split(",")):
+            name, value = pair.split("=")
+            params[name.strip()] = int(value)
+        configs.append(params)
+    return configs
+
+
+async def warm_embeddings(manager, golden: List[Dict]) -> Dict:
+    """질의 임베딩을 미리 계산해 캐시 → 설정별 지연에는 DB 검색 + 후처리만 포함"""
+    latencies = []
+    for item in golden:
+        for text in (item["passage"].strip(), item["question"].strip()):
+            if text:
+                started = time.perf_counter()
+                await manager.embed_query(text)
+                latencies.append((time.perf_counter() - started) * 1000)
+    return summarize(latencies)
+
+
+async def run_eval(args) -> Dict:
+    from backend.app.core.database import DatabaseManager
+    from backend.app.core.tokens import token_counter_name
+    from backend.app.core.vector_store import VectorStoreManager
+
+    golden = load_golden(args.golden)
+    ks = [int(k) for k in args.k.split(",")]
+    budgets = [int(b) for b in args.budgets.split(",")]
+    db_manager = DatabaseManager()
+
+    results = []
+    embedding_latency = None
+    try:
+        for index_params in parse_index_params(args.index_params):
+            manager = VectorStoreManager(db_manager, args.collection, index_params=index_params)
+            if embedding_latency is None:
+                embedding_latency = await warm_embeddings(manager, golden)
+
+            for k, budget in product(ks, budgets):
+                metrics = await evaluate_config(manager, golden, k, budget)
+                result = {"k": k, "budget": budget or None, "index_params": index_params, **metrics}
+                results.append(result)
+                print(
+                    f"k={k:<3} budget={str(budget or '-'):<6} index={json.dumps(index_params):<28} "
+                    f"recall={result['recall']:.3f} mrr={result['mrr']:.3f} "
+                    f"tokens={result['prompt_tokens']['mean']:>7.0f} "
+                    f"p50={result['latency_ms']['p50']:>7.1f} p95={result['latency_ms']['p95']:>7.1f}ms"
+                )
+    finally:
+        await db_manager.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "golden": args.golden,
+            "questions": len(golden),
+            "collection": args.collection,
+            "token_counter": token_counter_name(),
+            "embedding_latency_ms": embedding_latency,
+        },
+        "results": results,
+        "recommendation": recommend(results, args.target_recall, args.target_mrr),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 품질 vs 비용 평가")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="번역 결과 JSON으로 합성 골든셋 생성")
+    build.add_argument("--chunks", required=True, help="data_translate.py 출력 JSONL(.gz / .zst) 또는 예전 JSON")
+    build.add_argument("--out", required=True)
+    build.add_argument("--samples", type=int, default=50)
+    build.add_argument("--seed", type=int, default=42)
+
+    run = sub.add_parser("run", help="설정 조합별 평가")
+    run.add_argument("--golden", required=True)
+    run.add_argument("--k", default="3,5,8,10")
+    run.add_argument("--budgets", default="0,800,1500", help="컨텍스트 토큰 예산 (0 = 제한 없음)")
+    run.add_argument("--index-params", default="", help='세미콜론으로 설정 구분, 예: "hnsw.ef_search=40;hnsw.ef_search=100"')
+    run.add_argument("--collection", default=None)
+    run.add_argument("--target-recall", type=float, default=0.8)
+    run.add_argument("--target-mrr", type=float, default=0.0)
+    run.add_argument("--output", default=None, help="결과 JSON 경로 (기본: benchmarks/results/retrieval-<시각>.json)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        golden = build_golden(args.chunks, args.samples, args.seed)
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            for item in golden:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        print(f"골든셋 {len(golden)}문항 저장: {args.out}")
+        return
+
+    report = asyncio.run(run_eval(args))
+
+    output = Path(args.output or f"benchmarks/results/retrieval-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n결과 저장: {output}")
+
+    best = report["recommendation"]
+    if best is None:
+        print(f"❌ recall ≥ {args.target_recall} 을 만족하는 설정이 없습니다")
+        sys.exit(1)
+    print(
+        f"✅ 추천: k={best['k']} budget={best['budget']} index={best['index_params']} "
+        f"(recall={best['recall']:.3f}, mrr={best['mrr']:.3f}, 프롬프트 {best['prompt_tokens']['mean']:.0f} 토큰, "
+        f"p95 {best['latency_ms']['p95']:.1f}ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# uvicorn benchmarks.serve:app --port 8403
+"""
+부하 테스트용 앱 엔트리포인트
+- backend.app.main.app 을 그대로 감싸고, 이벤트 루프 지연(lag) 측정만 추가
+- GET /__loadtest__/loop_lag[?reset=1] : 이 워커 프로세스의 lag 통계 (ms)
+"""
+import asyncio
+import json
+import os
+from collections import deque
+
+from backend.app.main import app as backend_app
+from benchmarks.stats import summarize
+
+
+class LoopLagProbe:
+    """interval마다 sleep → 실제로 깨어난 시각과의 차이를 lag로 기록하는 ASGI 래퍼"""
+    
+    PATH = "/__loadtest__/loop_lag"
+    
+    def __init__(self, app, interval: float = 0.01, max_samples: int = 200000):
+        """
+        Args:
+            app: 감쌀 ASGI 앱
+            interval: 측정 주기 (초)
+            max_samples: 보관할 최대 샘플 수
+        """
+        self.app = app
+        self.interval = interval
+        self.samples = deque(maxlen=max_samples)
+        self._task = None
+    
+    async def _monitor(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval) * 1000)
+    
+    async def _respond(self, scope, send):
+        stats = {"pid": os.getpid(), "interval_ms": self.interval * 1000, **summarize(list(self.samples))}
+        if b"reset=1" in scope.get("query_string", b""):
+            self.samples.clear()
+        
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps(stats).encode()})
+    
+    async def __call__(self, scope, receive, send):
+        if self._task is None and scope["type"] in ("http", "lifespan"):
+            self._task = asyncio.get_running_loop().create_task(self._monitor())
+        
+        if scope["type"] == "http" and scope["path"] == self.PATH:
+            await self._respond(scope, send)
+            return
+        await self.app(scope, receive, send)
+
+
+app = LoopLagProbe(backend_app)
@@ -0,0 +1,28 @@
+"""
+측정값 요약 (백분위수 등)
+"""
+import math
+from typing import Dict, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """nearest-rank 백분위수 (q: 0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def summarize(values: List[float], digits: int = 2) -> Dict[str, float]:
+    """count / mean / p50 / p95 / p99 / max"""
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), digits),
+        "p50": round(percentile(values, 50), digits),
+        "p95": round(percentile(values, 95), digits),
+        "p99": round(percentile(values, 99), digits),
+        "max": round(max(values), digits)
+    }
@@ -0,0 +1,281 @@
+# python character_sheets.py --input data/03_processed/chunked_data_the_wizard_of_oz.jsonl --book-id the_wizard_of_oz
+# python character_sheets.py --input ... --book-id ... --refresh   (책 재수집 후 전체 재생성)
+"""
+책별 캐릭터 외형 시트
+- 용어집의 캐릭터마다 언급된 청크 전체를 map-reduce로 요약
+- 서버에서는 메모리에 올려두고 이름으로 바로 조회 (요청마다 LLM 추출 생략)
+- 같은 캐릭터는 항상 같은 외형으로 그려짐
+- 시트 파일이 바뀌면 (재생성) 다음 조회 때 다시 읽음, book_id 는 영문 / 숫자 / _ / - 만 허용
+"""
+import argparse
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from chunk_io import iter_chunks
+from glossary import BookGlossary, is_valid_book_id
+
+load_dotenv()
+
+MAP_PROMPT = """다음 텍스트에서 '{name}' ({english})의 외형 묘사만 추출하세요.
+
+<텍스트>
+{text}
+</텍스트>
+
+**추출 대상:** 나이/연령대, 성별, 머리 스타일 및 색상, 옷차림, 키/체형, 얼굴 특징, 특별한 외형적 특징
+**제외 대상:** 성격, 행동, 감정, 대사
+
+**중요:**
+- 텍스트에 명시된 정보만 사용 (추측 금지, 없으면 빈 문자열)
+- 영어로 간결하게 나열
+
+JSON 형식:
+{{
+    "appearance": "young girl, braided brown hair, blue gingham dress",
+    "age_group": "child",
+    "gender": "female"
+}}
+
+age_group: "child", "teen", "adult", "elderly", "unknown"
+gender: "male", "female", "unknown"
+"""
+
+REDUCE_PROMPT = """다음은 '{name}' ({english})에 대해 책 여러 부분에서 추출한 외형 묘사입니다.
+하나의 일관된 캐릭터 외형 설명으로 합치세요.
+
+<부분_묘사>
+{partials}
+</부분_묘사>
+
+**규칙:**
+- 여러 번 등장한 특징을 우선
+- 서로 모순되면 더 자주 나온 쪽 선택
+- 이미지 생성용 영어 키워드 나열 (최대 25단어)
+
+JSON 형식:
+{{
+    "appearance": "young girl, braided brown hair with blue ribbons, blue gingham dress, silver shoes"
+}}
+"""
+
+
+class CharacterSheetStore:
+    def __init__(self, sheet_dir: str = "data/character_sheets"):
+        """
+        캐릭터 시트 저장소
+        
+        Args:
+            sheet_dir: 책별 시트 JSON 저장 폴더 ({book_id}.json)
+        """
+        self.sheet_dir = Path(sheet_dir)
+        self._books: Dict[str, Dict[str, Dict]] = {}
+        self._mtimes: Dict[str, int] = {}
+    
+    def _path(self, book_id: str) -> Path:
+        if not is_valid_book_id(book_id):
+            raise ValueError(f"잘못된 book_id: {book_id!r}")
+        return self.sheet_dir / f"{book_id}.json"
+    
+    def load(self, book_id: str) -> Dict[str, Dict]:
+        """
+        책 시트 로드 (파일 수정 시각이 바뀌었을 때만 디스크에서 다시 읽음)
+        
+        잘못된 book_id 이거나 시트 파일이 없으면 빈 dict (캐시하지 않음)
+        """
+        if not is_valid_book_id(book_id):
+            return {}
+        path = self._path(book_id)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self.invalidate(book_id)
+            return {}
+        
+        # 조회는 요청마다 스레드에서 실행되므로 dict 를 다시 꺼내지 않고 지역 변수로 반환
+        book = self._books.get(book_id)
+        if book is None or self._mtimes.get(book_id) != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                book = json.load(f)
+            self._books[book_id] = book
+            self._mtimes[book_id] = mtime
+        return book
+    
+    def get(self, book_id: str, character_name: str) -> Optional[Dict]:
+        """캐릭터 시트 조회 (한글 이름 기준)"""
+        return self.load(book_id).get(character_name)
+    
+    def invalidate(self, book_id: str):
+        """메모리 캐시 제거 (다음 조회 시 디스크에서 다시 읽음)"""
+        self._books.pop(book_id, None)
+        self._mtimes.pop(book_id, None)
+    
+    def save(self, book_id: str, sheets: Dict[str, Dict]):
+        """임시 파일에 쓰고 rename"""
+        self.sheet_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(book_id)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(sheets, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+        self._books[book_id] = sheets
+        self._mtimes[book_id] = path.stat().st_mtime_ns
+
+
+def _chat_json(client, model: str, prompt: str) -> Dict:
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0,
+        response_format={"type": "json_object"}
+    )
+    return json.loads(response.choices[0].message.content)
+
+
+def find_mentions(chunks: List[Dict], korean: str, english: str) -> List[Dict]:
+    """한글 번역 또는 영어 원문에서 캐릭터가 언급된 청크"""
+    english_lower = english.lower()
+    return [
+        c for c in chunks
+        if korean in c.get("content_ko", "") or english_lower in c.get("content_en", "").lower()
+    ]
+
+
+def build_character_sheet(
+    client,
+    korean: str,
+    english: str,
+    mentions: List[Dict],
+    model: str = "gpt-4o-mini",
+    batch_size: int = 6
+) -> Optional[Dict]:
+    """
+    캐릭터 1명의 외형 시트 생성
+    
+    - map: 언급 청크 batch_size개씩 외형 추출
+    - reduce: 나이/성별은 다수결, 외형 묘사는 LLM으로 병합
+    """
+    partials = []
+    
+    for start in range(0, len(mentions), batch_size):
+        batch = mentions[start:start + batch_size]
+        text = "\n\n".join(c.get("content_en") or c.get("content_ko", "") for c in batch)
+        
+        try:
+            partials.append(_chat_json(client, model, MAP_PROMPT.format(name=korean, english=english, text=text)))
+        except Exception as e:
+            print(f"외형 추출 중 오류 발생 ({korean}): {e}")
+    
+    described = [p for p in partials if p.get("appearance")]
+    if not described:
+        return None
+    
+    age_votes = Counter(p.get("age_group", "unknown") for p in partials if p.get("age_group", "unknown") != "unknown")
+    gender_votes = Counter(p.get("gender", "unknown") for p in partials if p.get("gender", "unknown") != "unknown")
+    
+    if len(described) == 1:
+        appearance = described[0]["appearance"]
+    else:
+        partial_text = "\n".join(f"- {p['appearance']}" for p in described)
+        try:
+            appearance = _chat_json(
+                client, model, REDUCE_PROMPT.format(name=korean, english=english, partials=partial_text)
+            ).get("appearance", "")
+        except Exception as e:
+            print(f"외형 병합 중 오류 발생 ({korean}): {e}")
+            appearance = described[0]["appearance"]
+    
+    # 확신도: 외형 묘사가 나온 배치 비율 + 묘사 배치 수 보정
+    confidence = min(1.0, len(described) / len(partials) * 0.6 + min(len(described), 4) * 0.1)
+    
+    return {
+        "english": english,
+        "appearance": appearance,
+        "age_group": age_votes.most_common(1)[0][0] if age_votes else "unknown",
+        "gender": gender_votes.most_common(1)[0][0] if gender_votes else "unknown",
+        "confidence": round(confidence, 2),
+        "mentions": len(mentions),
+        "source": "sheet"
+    }
+
+
+def build_character_sheets(
+    client,
+    chunks: List[Dict],
+    characters: Dict[str, str],
+    existing: Optional[Dict[str, Dict]] = None,
+    model: str = "gpt-4o-mini",
+    max_mentions: int = 48
+) -> Dict[str, Dict]:
+    """
+    책 전체 캐릭터 시트 생성
+    
+    Args:
+        chunks: content_en / content_ko 를 가진 청크 리스트
+        characters: {한글 이름: 영문 이름}
+        existing: 기존 시트 (있는 캐릭터는 건너뜀)
+        max_mentions: 캐릭터당 사용할 최대 언급 청크 수 (비용 상한)
+    """
+    sheets = dict(existing or {})
+    
+    for i, (korean, english) in enumerate(characters.items(), 1):
+        if korean in sheets:
+            continue
+        
+        mentions = find_mentions(chunks, korean, english)
+        print(f"-> [{i}/{len(characters)}] {korean} ({english}): {len(mentions)}개 청크")
+        if not mentions:
+            continue
+        
+        # 책 전체에 고르게 분포하도록 샘플링
+        if len(mentions) > max_mentions:
+            step = len(mentions) / max_mentions
+            mentions = [mentions[int(j * step)] for j in range(max_mentions)]
+        
+        sheet = build_character_sheet(client, korean, english, mentions, model)
+        if sheet:
+            sheets[korean] = sheet
+    
+    print(f"캐릭터 시트 생성 완료: {len(sheets)}명")
+    return sheets
+
+
+def main():
+    """처리된 청크 JSON + 용어집으로 캐릭터 시트 생성/갱신"""
+    from openai import OpenAI
+    
+    parser = argparse.ArgumentParser(description="책별 캐릭터 외형 시트 생성")
+    parser.add_argument("--input", required=True, help="chunked_data_*.jsonl(.gz / .zst) 또는 예전 .json 경로")
+    parser.add_argument("--book-id", required=True, help="시트 키 (예: the_wizard_of_oz)")
+    parser.add_argument("--glossary-dir", default="data/glossary")
+    parser.add_argument("--sheet-dir", default="data/character_sheets")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--max-mentions", type=int, default=48)
+    parser.add_argument("--refresh", action="store_true", help="기존 시트를 버리고 전체 재생성 (책 재수집 시)")
+    args = parser.parse_args()
+    if not is_valid_book_id(args.book_id):
+        parser.error(f"--book-id 는 영문 / 숫자 / _ / - 만 사용할 수 있습니다: {args.book_id}")
+    
+    chunks = [chunk for _, chunk in iter_chunks(args.input)]
+    
+    glossary = BookGlossary(args.glossary_dir).load(args.book_id)
+    characters = {k: v["english"] for k, v in glossary.items() if v.get("type") == "character"}
+    if not characters:
+        print(f"err ::: 용어집에 캐릭터가 없습니다. 먼저 glossary.py를 실행하세요: {args.book_id}")
+        return
+    
+    store = CharacterSheetStore(args.sheet_dir)
+    existing = None if args.refresh else store.load(args.book_id)
+    
+    sheets = build_character_sheets(OpenAI(), chunks, characters, existing, args.model, args.max_mentions)
+    store.save(args.book_id, sheets)
+    print(f"저장 완료: {Path(args.sheet_dir) / (args.book_id + '.json')}")
+
+
+if __name__ == "__main__":
+    main()
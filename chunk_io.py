@@ -0,0 +1,214 @@
+# python chunk_io.py convert data/03_processed/chunked_data_little_women.json                (→ .jsonl)
+# python chunk_io.py convert data/03_processed/*.json --suffix .jsonl.zst
+# python chunk_io.py stats data/03_processed/chunked_data_little_women.jsonl.gz
+"""
+처리된 청크 파일 읽기 / 쓰기 (data_translate.py 출력 → ingest_chunks.py / batch_jobs.py / glossary.py ...)
+
+JSONL 형식 (.jsonl / .jsonl.gz / .jsonl.zst)
+- 책마다 헤더 1줄 {"type": "book", "book_id", "gutenberg_id", "title_ko", "title_en", "author"}
+- 이어서 청크 1개 = 1줄 {"type": "chunk", "chunk_index", "chapter_name", "content_en", "content_ko", ...}
+- 한 파일에 책 여러 권 가능 (다음 헤더부터 다음 책)
+- 청크를 만드는 대로 한 줄씩 기록, 읽을 때도 한 줄씩 → 파일 전체를 메모리에 올리지 않음
+- 임시 파일에 쓰고 끝나면 교체 → 중간에 죽어도 이전 파일은 그대로
+- 예전 형식(.json, [{..., "chunks": [...]}])도 같은 함수로 읽음 (파일 전체 로드)
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import time
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+JSONL_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+BOOK_RECORD = "book"
+CHUNK_RECORD = "chunk"
+
+
+def _open_zstd(path: str, mode: str) -> IO:
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(f"zstd 파일을 다루려면 zstandard 패키지가 필요합니다 (pip install zstandard): {path}")
+    if "r" in mode:
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True), encoding="utf-8")
+    return io.TextIOWrapper(zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"), closefd=True), encoding="utf-8")
+
+
+def open_text(path: str, mode: str = "r") -> IO:
+    """확장자(.gz / .zst)에 맞게 압축을 풀거나 압축하며 텍스트로 열기 (mode: r / w)"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.endswith(".zst"):
+        return _open_zstd(path, mode)
+    return open(path, mode, encoding="utf-8")
+
+
+def is_jsonl(path: str) -> bool:
+    return path.endswith(JSONL_SUFFIXES)
+
+
+def jsonl_path(json_path: str, suffix: str = ".jsonl") -> str:
+    """chunked_data_x.json(l...) → chunked_data_x.jsonl(.gz / .zst)"""
+    for known in JSONL_SUFFIXES[::-1] + (".json",):
+        if json_path.endswith(known):
+            return json_path[:-len(known)] + suffix
+    return json_path + suffix
+
+
+def iter_records(path: str) -> Iterator[Dict]:
+    """
+    파일 → 레코드 스트림 ({"type": "book", ...} 다음에 그 책의 {"type": "chunk", ...} 들)
+
+    .json(예전 형식)도 같은 순서의 레코드로 바꿔서 내보냄
+    """
+    if not is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            books = json.load(f)
+        for book in books:
+            book = dict(book)
+            chunks = book.pop("chunks", [])
+            yield {"type": BOOK_RECORD, **book}
+            for chunk in chunks:
+                yield {"type": CHUNK_RECORD, **chunk}
+        return
+
+    with open_text(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no} 잘못된 JSON 줄: {e}") from e
+
+
+def iter_chunks(path: str) -> Iterator[Tuple[Dict, Dict]]:
+    """파일 → (책 헤더, 청크) 스트림 (청크를 모아두지 않음)"""
+    book = None
+    for record in iter_records(path):
+        kind = record.pop("type", None)
+        if kind == BOOK_RECORD:
+            book = record
+        elif kind == CHUNK_RECORD:
+            if book is None:
+                raise ValueError(f"{path}: 책 헤더보다 청크가 먼저 나옵니다")
+            yield book, record
+
+
+def iter_books(path: str) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """파일 → (책 헤더, 그 책의 청크 목록) (책 1권 분량만 메모리에 둠)"""
+    book, chunks = None, []
+    for record in iter_records(path):
+        kind = record.pop("type", None)
+        if kind == BOOK_RECORD:
+            if book is not None:
+                yield book, chunks
+            book, chunks = record, []
+        elif kind == CHUNK_RECORD:
+            if book is None:
+                raise ValueError(f"{path}: 책 헤더보다 청크가 먼저 나옵니다")
+            chunks.append(record)
+    if book is not None:
+        yield book, chunks
+
+
+class ChunkWriter:
+    """
+    JSONL 청크 파일 쓰기 (with 블록이 정상 종료될 때만 최종 경로로 교체)
+
+    with ChunkWriter(path) as writer:
+        writer.write_book(book)
+        for chunk in chunks:
+            writer.write_chunk(chunk)
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 출력 경로 (.jsonl / .jsonl.gz / .jsonl.zst)
+        """
+        if not is_jsonl(path):
+            raise ValueError(f"JSONL 확장자가 아닙니다 ({', '.join(JSONL_SUFFIXES)}): {path}")
+        self.path = path
+        # 확장자로 압축 방식을 고르므로 임시 파일은 앞에 표시
+        directory, name = os.path.split(path)
+        self._tmp_path = os.path.join(directory, f".tmp-{name}")
+        self._file: Optional[IO] = None
+        self.stats = {"books": 0, "chunks": 0}
+
+    def __enter__(self) -> "ChunkWriter":
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open_text(self._tmp_path, "w")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+
+    def _write(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write_book(self, book: Dict):
+        """책 헤더 (chunks 필드는 무시)"""
+        self._write({"type": BOOK_RECORD, **{k: v for k, v in book.items() if k != "chunks"}})
+        self.stats["books"] += 1
+
+    def write_chunk(self, chunk: Dict):
+        self._write({"type": CHUNK_RECORD, **chunk})
+        self.stats["chunks"] += 1
+
+
+def convert(input_path: str, output_path: str) -> Dict:
+    """예전 JSON (또는 다른 압축의 JSONL) → JSONL"""
+    started = time.perf_counter()
+    with ChunkWriter(output_path) as writer:
+        for record in iter_records(input_path):
+            kind = record.pop("type", None)
+            if kind == BOOK_RECORD:
+                writer.write_book(record)
+            elif kind == CHUNK_RECORD:
+                writer.write_chunk(record)
+    result = {
+        **writer.stats,
+        "bytes_in": os.path.getsize(input_path),
+        "bytes_out": os.path.getsize(output_path),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    print(
+        f"✅ {input_path} → {output_path}: {result['books']}권 / {result['chunks']}청크, "
+        f"{result['bytes_in'] / 1e6:.2f}MB → {result['bytes_out'] / 1e6:.2f}MB, {result['seconds']}s"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="처리된 청크 파일 변환 / 확인")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = sub.add_parser("convert", help="예전 JSON → JSONL (.jsonl / .jsonl.gz / .jsonl.zst)")
+    convert_parser.add_argument("paths", nargs="+")
+    convert_parser.add_argument("--suffix", default=".jsonl", choices=list(JSONL_SUFFIXES))
+    convert_parser.add_argument("--output", default=None, help="출력 경로 (입력이 1개일 때만)")
+
+    stats_parser = sub.add_parser("stats", help="책 / 청크 수 확인 (스트리밍으로 읽음)")
+    stats_parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        if args.output and len(args.paths) > 1:
+            parser.error("--output 은 입력이 1개일 때만 사용할 수 있습니다")
+        for path in args.paths:
+            convert(path, args.output or jsonl_path(path, args.suffix))
+        return
+
+    for path in args.paths:
+        for book, chunks in iter_books(path):
+            print(f"{path}: book_id={book.get('book_id')} {book.get('title_ko')} / {len(chunks)}청크")
+
+
+if __name__ == "__main__":
+    main()
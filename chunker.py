@@ -0,0 +1,353 @@
+# python chunker.py data/02_cleaned/little_women/en.txt --max-tokens 500
+# python chunker.py --check   (제목 판정 예시 확인)
+"""
+챕터 인식 + 토큰 범위 청크 분할 (data_translate.py / batch_jobs.py 공용)
+- 실제 챕터 제목(CHAPTER ONE, Chapter 4, BOOK II, I. A SCANDAL IN BOHEMIA ...)을 찾아 chapter_name 으로 사용
+- 목차처럼 제목만 연달아 나오는 부분은 챕터로 보지 않음
+- 챕터 안에서 문단을 min~max 토큰 범위로 합치고, max 보다 긴 문단은 문장 → 단어 단위로 나눔
+- 청크는 챕터 경계를 넘지 않음, overlap_tokens 만큼 앞 청크의 마지막 문장을 이어 붙임
+- 청크마다 토큰 수, 원문(en.txt) 기준 문자 위치 기록 → content_en == text[char_start:char_end]
+- 청크 1개 = 번역 1건이므로 content_en / content_ko 는 청크 단위로 1:1 정렬 유지
+"""
+import argparse
+import re
+from typing import Dict, List, Optional, Tuple
+
+CHUNK_MIN_TOKENS = 200
+CHUNK_MAX_TOKENS = 500
+CHUNK_OVERLAP_TOKENS = 0   # 번역용은 0 (겹치면 같은 문장을 두 번 번역), 임베딩 전용이면 50 정도
+FRONT_MATTER = "Front Matter"
+
+_NUMBER_WORDS = (
+    "one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen|"
+    "sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety"
+)
+# 올바른 로마 숫자만 (IGNORECASE 에서 did / mid 같은 단어를 숫자로 보지 않도록, 앞의 lookahead 로 빈 문자열 제외)
+_ROMAN_NUMERAL = r"(?=[mdclxvi])m{0,4}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})"
+
+HEADING_PATTERNS = [
+    # CHAPTER ONE / Chapter 4 / BOOK II. / PART TWENTY-ONE / STAVE III: ... (뒷부분은 _heading_rest 로 확인)
+    re.compile(
+        rf"^(chapter|book|part|volume|stave|adventure|letter)\s+"
+        rf"(\d+|{_ROMAN_NUMERAL}|(?:{_NUMBER_WORDS})(?:[- ](?:{_NUMBER_WORDS}))?)(?!\w)(?P<rest>[^\n]*)$",
+        re.IGNORECASE
+    ),
+    # I. A SCANDAL IN BOHEMIA / XII. (대문자 로마 숫자 + 마침표, 뒤는 소문자 없음)
+    re.compile(r"^[IVXLC]+\.(\s+[^a-z\n]*)?$"),
+]
+MAX_HEADING_CHARS = 100
+
+# --check 로 확인하는 제목 판정 예시 (문장, 제목 여부)
+HEADING_CHECKS = [
+    ("CHAPTER ONE", True),
+    ("Chapter 4", True),
+    ("Chapter iv", True),
+    ("Chapter XLII", True),
+    ("BOOK II.", True),
+    ("PART TWENTY-ONE", True),
+    ("STAVE III: The Second of the Three Spirits", True),
+    ("CHAPTER I. PLAYING PILGRIMS", True),
+    ("Chapter 1 The Boy Who Lived", True),
+    ("Adventure I. A Scandal in Bohemia", True),
+    ("I. A SCANDAL IN BOHEMIA", True),
+    ("XII.", True),
+    ("Part did not matter to him.", False),
+    ("Book one of us", False),
+    ("Book dim lights", False),
+    ("Book - and then she left.", False),
+    ("Letter — from Jo", False),
+    ("Adventure - Dorothy ran away", False),
+    ("Part (two)", False),
+    ("Letter . It said nothing at all to her.", False),
+]
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+")
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"tokens ::: tiktoken 사용 불가, 근사값 사용 ({e})")
+            _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트 토큰 수 (tiktoken cl100k_base, 없으면 UTF-8 바이트 / 4 근사, 한글 1자 ≈ 0.75토큰)
+
+    청크 예산과 백엔드 검색 / 평가 예산(backend.app.core.tokens)이 같은 함수를 사용
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+def token_counter_name() -> str:
+    """현재 사용 중인 계산 방식 (tiktoken / approx)"""
+    return "tiktoken" if _get_encoding() is not None else "approx"
+
+
+def paragraph_spans(text: str) -> List[Tuple[int, int]]:
+    """빈 줄 기준 문단 위치 (앞뒤 공백 제외)"""
+    spans = []
+    start = 0
+    for match in re.finditer(r"\n[ \t]*\n\s*", text):
+        spans.append((start, match.start()))
+        start = match.end()
+    spans.append((start, len(text)))
+
+    trimmed = []
+    for s, e in spans:
+        chunk = text[s:e]
+        if chunk.strip():
+            s += len(chunk) - len(chunk.lstrip())
+            e -= len(chunk) - len(chunk.rstrip())
+            trimmed.append((s, e))
+    return trimmed
+
+
+def is_heading(paragraph: str) -> bool:
+    if len(paragraph) > MAX_HEADING_CHARS or paragraph.count("\n") > 1:
+        return False
+    first_line = paragraph.split("\n")[0].strip()
+    for pattern in HEADING_PATTERNS:
+        match = pattern.match(first_line)
+        if match and _heading_rest(match.groupdict().get("rest")):
+            return True
+    return False
+
+
+def _heading_rest(rest: Optional[str]) -> bool:
+    """
+    번호 뒤 나머지가 제목 줄다운지 (없음 / 구두점으로 시작 / 대문자로 시작하는 제목)
+
+    "Part did not matter to him." 처럼 Part / Book 으로 시작하는 문장을 제목으로 보지 않음
+    """
+    rest = (rest or "").strip()
+    if not rest or rest[0] in ".:;-–—(":
+        return True
+    rest = rest.rstrip(".")
+    return bool(rest) and not rest[0].islower() and _is_title(rest)
+
+
+def _is_title(paragraph: str) -> bool:
+    """챕터 제목 다음 줄의 부제 (PLAYING PILGRIMS / A Merry Christmas)"""
+    if len(paragraph) > 80 or "\n" in paragraph or paragraph[-1] in ".!?,;:\"'”’":
+        return False
+    words = paragraph.split()
+    return paragraph.isupper() or (len(words) <= 10 and all(w[0].isupper() or not w[0].isalpha() or len(w) <= 3 for w in words))
+
+
+def _normalize_heading(*parts: str) -> str:
+    return ": ".join(re.sub(r"\s+", " ", p).strip().rstrip(".") for p in parts if p)
+
+
+def find_chapters(text: str, spans: List[Tuple[int, int]]) -> List[Tuple[str, int]]:
+    """
+    챕터 시작 (챕터명, 문단 번호) 목록
+
+    다음 문단도 제목이면(목차) 챕터로 보지 않음
+    """
+    chapters = []
+    paragraphs = [text[s:e] for s, e in spans]
+    for i, paragraph in enumerate(paragraphs):
+        if not is_heading(paragraph):
+            continue
+        if i + 1 < len(paragraphs) and is_heading(paragraphs[i + 1]):
+            continue
+        title = None
+        if i + 1 < len(paragraphs) and "\n" not in paragraph and _is_title(paragraphs[i + 1]):
+            title = paragraphs[i + 1]
+        chapters.append((_normalize_heading(paragraph, title), i))
+    return chapters
+
+
+def _split_span(text: str, start: int, end: int, max_tokens: int) -> List[Tuple[int, int]]:
+    """max_tokens 보다 긴 문단 → 문장 단위, 그래도 길면 단어 단위 위치 목록"""
+    if count_tokens(text[start:end]) <= max_tokens:
+        return [(start, end)]
+
+    pieces = []
+    cursor = start
+    for match in SENTENCE_END.finditer(text, start, end):
+        pieces.append((cursor, match.start() + len(match.group(0).rstrip())))
+        cursor = match.end()
+    if cursor < end:
+        pieces.append((cursor, end))
+
+    if len(pieces) == 1:
+        # 문장 구분이 없으면 단어 단위로 max_tokens 까지 채움
+        words = [(m.start(), m.end()) for m in re.finditer(r"\S+", text[start:end])]
+        pieces, current = [], None
+        for ws, we in words:
+            ws, we = ws + start, we + start
+            if current and count_tokens(text[current[0]:we]) > max_tokens:
+                pieces.append(current)
+                current = None
+            current = (current[0], we) if current else (ws, we)
+        if current:
+            pieces.append(current)
+        return pieces
+
+    result = []
+    for s, e in pieces:
+        result.extend(_split_span(text, s, e, max_tokens))
+    return result
+
+
+def _overlap_start(text: str, start: int, end: int, overlap_tokens: int) -> Optional[int]:
+    """이전 청크 끝에서 overlap_tokens 안에 들어가는 마지막 문장들의 시작 위치"""
+    if overlap_tokens <= 0:
+        return None
+    starts = [start] + [m.end() for m in SENTENCE_END.finditer(text, start, end)]
+    chosen = None
+    for s in reversed(starts):
+        if s >= end or count_tokens(text[s:end]) > overlap_tokens:
+            break
+        chosen = s
+    return chosen if chosen is not None and chosen > start else None
+
+
+def _rebalance_tail(
+    text: str,
+    previous: List[Tuple[int, int]],
+    tail: List[Tuple[int, int]],
+    min_tokens: int,
+    budget: int
+) -> List[Tuple[int, int]]:
+    """
+    챕터 끝의 min_tokens 보다 짧은 묶음 정리 → 남은 마지막 묶음 (빈 리스트면 앞 묶음에 합쳐짐)
+
+    앞 묶음은 예산까지 채운 뒤 끊긴 것이라 통째로 합치면 대개 예산을 넘으므로,
+    합쳐서 예산 안이면 합치고 아니면 앞 묶음 끝 문단을 넘겨 받음 (앞 묶음도 min_tokens 이상 유지)
+    """
+    if count_tokens(text[previous[0][0]:tail[-1][1]]) <= budget:
+        previous.extend(tail)
+        return []
+
+    while len(previous) > 1 and count_tokens(text[tail[0][0]:tail[-1][1]]) < min_tokens:
+        if count_tokens(text[previous[-1][0]:tail[-1][1]]) > budget \
+                or count_tokens(text[previous[0][0]:previous[-2][1]]) < min_tokens:
+            break
+        tail.insert(0, previous.pop())
+    return tail
+
+
+def chunk_book(
+    text: str,
+    min_tokens: int = CHUNK_MIN_TOKENS,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS
+) -> List[Dict]:
+    """
+    책 본문 → 청크 목록
+
+    Returns:
+        [{chunk_index, chapter_name, content_en, token_count, char_start, char_end}, ...]
+    """
+    if not 0 < min_tokens <= max_tokens or not 0 <= overlap_tokens < max_tokens:
+        raise ValueError(f"잘못된 토큰 범위: min={min_tokens}, max={max_tokens}, overlap={overlap_tokens}")
+
+    spans = paragraph_spans(text)
+    chapters = find_chapters(text, spans)
+    boundaries = [(FRONT_MATTER, 0)] if not chapters or chapters[0][1] > 0 else []
+    boundaries += chapters
+
+    # 겹치는 문장이 붙어도 max_tokens 를 넘지 않도록 묶음 예산에서 overlap 을 뺌
+    budget = max_tokens - overlap_tokens
+    chunks: List[Dict] = []
+    for c, (chapter_name, first) in enumerate(boundaries):
+        last = boundaries[c + 1][1] if c + 1 < len(boundaries) else len(spans)
+        units = []
+        for s, e in spans[first:last]:
+            units.extend(_split_span(text, s, e, budget))
+
+        # 문단(조각)을 예산까지 채워 묶기
+        groups: List[List[Tuple[int, int]]] = []
+        current: List[Tuple[int, int]] = []
+        for unit in units:
+            if current and count_tokens(text[current[0][0]:unit[1]]) > budget:
+                groups.append(current)
+                current = []
+            current.append(unit)
+        if current:
+            if groups and count_tokens(text[current[0][0]:current[-1][1]]) < min_tokens:
+                current = _rebalance_tail(text, groups[-1], current, min_tokens, budget)
+            if current:
+                groups.append(current)
+
+        previous_end = None
+        for g, group in enumerate(groups):
+            start, end = group[0][0], group[-1][1]
+            if g > 0:
+                overlap = _overlap_start(text, groups[g - 1][0][0], previous_end, overlap_tokens)
+                start = overlap if overlap is not None else start
+            previous_end = end
+            content = text[start:end]
+            chunks.append({
+                "chunk_index": len(chunks),
+                "chapter_name": chapter_name,
+                "content_en": content,
+                "token_count": count_tokens(content),
+                "char_start": start,
+                "char_end": end,
+            })
+    return chunks
+
+
+def summarize_chunks(chunks: List[Dict]) -> Dict:
+    tokens = sorted(c["token_count"] for c in chunks) or [0]
+    return {
+        "chunks": len(chunks),
+        "chapters": len({c["chapter_name"] for c in chunks}),
+        "tokens_total": sum(tokens),
+        "tokens_min": tokens[0],
+        "tokens_median": tokens[len(tokens) // 2],
+        "tokens_max": tokens[-1],
+    }
+
+
+def check_headings() -> bool:
+    """HEADING_CHECKS 예시의 제목 판정 확인 → 모두 맞으면 True"""
+    wrong = [(line, expected) for line, expected in HEADING_CHECKS if is_heading(line) != expected]
+    for line, expected in wrong:
+        print(f"❌ 제목 판정 오류: {line!r} (기대값 {expected})")
+    if not wrong:
+        print(f"✅ 제목 판정 {len(HEADING_CHECKS)}건 모두 일치")
+    return not wrong
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="챕터 인식 청크 분할 결과 확인")
+    parser.add_argument("path", nargs="?", help="정제된 영어 텍스트 (data/02_cleaned/{book}/en.txt)")
+    parser.add_argument("--min-tokens", type=int, default=CHUNK_MIN_TOKENS)
+    parser.add_argument("--max-tokens", type=int, default=CHUNK_MAX_TOKENS)
+    parser.add_argument("--overlap-tokens", type=int, default=CHUNK_OVERLAP_TOKENS)
+    parser.add_argument("--check", action="store_true", help="제목 판정 예시 확인 (HEADING_CHECKS)")
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(0 if check_headings() else 1)
+    if not args.path:
+        parser.error("path 또는 --check 가 필요합니다")
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        book_text = f.read()
+
+    book_chunks = chunk_book(book_text, args.min_tokens, args.max_tokens, args.overlap_tokens)
+    seen = set()
+    for chunk in book_chunks:
+        if chunk["chapter_name"] not in seen:
+            seen.add(chunk["chapter_name"])
+            print(f"[{chunk['chunk_index']:>5}] {chunk['chapter_name']}")
+    print(summarize_chunks(book_chunks))
@@ -7,24 +7,46 @@ ComfyUI API 클라이언트
 # uvicorn backend.app.main:app --reload --host 0.0.0.0 --port 8003
 
 import requests
+import aiohttp
+import asyncio
+import hashlib
+import io
 import json
+import os
 import time
 import uuid
-from typing import Dict
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
 from PIL import Image
 from pathlib import Path
 
+from image_cache import ImageCache
+
+# 스트리밍 다운로드 청크 크기 / 헤더 파싱용으로 보관할 앞부분 크기
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+HEADER_PROBE_SIZE = 64 * 1024
+FINISHED_PROMPTS_KEPT = 256  # 완료 후 늦게 도착하는 웹소켓 메시지를 무시하기 위해 기억하는 prompt_id 수
+
 
 class ComfyUIClient:
-    def __init__(self, server_address: str = "100.100.53.32:8288"):
+    def __init__(
+        self,
+        server_address: str = "100.100.53.32:8288",
+        deterministic_seed: bool = False,
+        image_dir: str = "generated_images"
+    ):
         """
         ComfyUI 클라이언트 초기화
         
         Args:
             server_address: ComfyUI 서버 주소 (IP:PORT)
+            deterministic_seed: True면 seed 미지정 시 프롬프트 해시로 시드 고정
+            image_dir: 생성 이미지 저장 폴더 (이미지 캐시를 쓰면 같은 폴더여야 rename 으로 옮겨짐)
         """
         self.server_address = server_address
         self.client_id = str(uuid.uuid4())
+        self.deterministic_seed = deterministic_seed
+        self.image_dir = Path(image_dir)
     
     def generate_image(self, prompt_data: Dict) -> Dict:
         """
@@ -52,11 +74,8 @@ class ComfyUIClient:
             # 완료 대기
             result = self._wait_for_completion(prompt_id)
             
-            # 이미지 다운로드
-            image_path = self._download_image(result)
-            
-            # 품질 평가
-            quality_score = self._evaluate_image_quality(image_path)
+            # 이미지 다운로드 + 품질 평가 (스트리밍 한 번에 처리)
+            image_path, quality_score = self._download_image(result)
             
             return {
                 "image_path": image_path,
@@ -162,6 +181,24 @@ class ComfyUIClient:
             }
         }
     
+    def _resolve_seed(self, prompt_data: Dict) -> Optional[int]:
+        """
+        KSampler 시드 결정
+        
+        - style_params.seed 지정 시 그대로 사용
+        - deterministic_seed 사용 시 positive 프롬프트 해시에서 유도
+        - 그 외 None (생성 시점 시간 기반 랜덤 시드)
+        """
+        seed = prompt_data.get("style_params", {}).get("seed")
+        if seed is not None:
+            return int(seed) % (2**32)
+        
+        if self.deterministic_seed:
+            digest = hashlib.sha256(prompt_data.get("positive", "").encode("utf-8")).digest()
+            return int.from_bytes(digest[:4], "big")
+        
+        return None
+    
     def _inject_prompt(self, workflow: Dict, prompt_data: Dict) -> Dict:
         """
         워크플로우에 프롬프트 및 파라미터 주입
@@ -183,6 +220,9 @@ class ComfyUIClient:
         width = style_params.get("width", 1024)
         height = style_params.get("height", 1024)
         lora_strength = style_params.get("lora_strength", 0.8)
+        seed = self._resolve_seed(prompt_data)
+        if seed is None:
+            seed = int(time.time() * 1000) % (2**32)
         
         print(f"✨ Positive: {positive_prompt[:100]}...")
         print(f"⚙️ Size: {width}x{height}, Steps: {steps}, CFG: {cfg}, LoRA: {lora_strength}")
@@ -205,7 +245,7 @@ class ComfyUIClient:
             
             # 샘플링 파라미터
             elif class_type == "KSampler":
-                node["inputs"]["seed"] = int(time.time() * 1000) % (2**32)
+                node["inputs"]["seed"] = seed
                 node["inputs"]["steps"] = int(steps)
                 node["inputs"]["cfg"] = float(cfg)
                 node["inputs"]["sampler_name"] = sampler
@@ -248,39 +288,73 @@ class ComfyUIClient:
         
         raise TimeoutError("이미지 생성 시간 초과")
     
-    def _download_image(self, result: Dict) -> str:
-        """생성된 이미지 다운로드"""
+    def _find_output_image(self, result: Dict) -> Tuple[Dict, str]:
+        """history 결과에서 첫 번째 출력 이미지의 /view 파라미터 추출"""
         outputs = result.get("outputs", {})
         
         for node_id, node_output in outputs.items():
             if "images" in node_output:
                 image_info = node_output["images"][0]
-                filename = image_info["filename"]
-                subfolder = image_info.get("subfolder", "")
-                file_type = image_info.get("type", "output")
-                
-                # 이미지 다운로드
-                url = f"http://{self.server_address}/view"
                 params = {
-                    "filename": filename,
-                    "subfolder": subfolder,
-                    "type": file_type
+                    "filename": image_info["filename"],
+                    "subfolder": image_info.get("subfolder", ""),
+                    "type": image_info.get("type", "output")
                 }
-                
-                response = requests.get(url, params=params)
+                return params, image_info["filename"]
+        
+        raise ValueError("생성된 이미지를 찾을 수 없습니다")
+    
+    def _download_image(self, result: Dict) -> Tuple[str, float]:
+        """생성된 이미지 스트리밍 다운로드 (임시 파일 → rename) 및 품질 평가"""
+        params, filename = self._find_output_image(result)
+        url = f"http://{self.server_address}/view"
+        
+        self.image_dir.mkdir(parents=True, exist_ok=True)
+        output_path = str(self.image_dir / filename)
+        tmp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.part"
+        
+        try:
+            with requests.get(url, params=params, stream=True, timeout=60) as response:
                 response.raise_for_status()
                 
-                # 저장
-                Path("generated_images").mkdir(exist_ok=True)
-                output_path = f"generated_images/{filename}"
-                
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
-                
-                print(f"💾 저장 완료: {output_path}")
-                return output_path
+                head = bytearray()
+                file_size = 0
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        file_size += len(chunk)
+                        if len(head) < HEADER_PROBE_SIZE:
+                            head.extend(chunk[:HEADER_PROBE_SIZE - len(head)])
+            
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         
-        raise ValueError("생성된 이미지를 찾을 수 없습니다")
+        print(f"💾 저장 완료: {output_path}")
+        return output_path, self._score_from_header(bytes(head), file_size)
+    
+    @staticmethod
+    def _quality_score(width: int, height: int, file_size: int) -> float:
+        """해상도 점수와 파일 크기 점수의 평균"""
+        resolution_score = min(1.0, (width * height) / (1024 * 1024))
+        size_score = min(1.0, file_size / (100 * 1024))
+        return (resolution_score + size_score) / 2
+    
+    def _score_from_header(self, head: bytes, file_size: int) -> float:
+        """
+        다운로드 중 보관한 앞부분 바이트로 품질 평가
+        
+        Image.open은 헤더만 읽으므로 픽셀 디코딩 없이 크기를 얻을 수 있음
+        """
+        try:
+            with Image.open(io.BytesIO(head)) as img:
+                width, height = img.size
+            return self._quality_score(width, height, file_size)
+        
+        except Exception as e:
+            print(f"⚠️ 품질 평가 오류: {e}")
+            return 0.5
     
     def _evaluate_image_quality(self, image_path: str) -> float:
         """
@@ -290,21 +364,355 @@ class ComfyUIClient:
         - 파일 크기 기반 점수
         """
         try:
-            img = Image.open(image_path)
-            width, height = img.size
-            
-            # 해상도 점수
-            resolution_score = min(1.0, (width * height) / (1024 * 1024))
+            with Image.open(image_path) as img:
+                width, height = img.size
             
-            # 파일 크기 점수
-            import os
-            file_size = os.path.getsize(image_path)
-            size_score = min(1.0, file_size / (100 * 1024))
-            
-            return (resolution_score + size_score) / 2
+            return self._quality_score(width, height, os.path.getsize(image_path))
             
         except Exception as e:
             print(f"⚠️ 품질 평가 오류: {e}")
             return 0.5
+
+
+class AsyncComfyUIClient(ComfyUIClient):
+    """
+    비동기 ComfyUI 클라이언트
+    
+    - aiohttp 세션 하나를 재사용 (keep-alive 커넥션 풀)
+    - /ws?clientId= 진행 스트림으로 완료 감지 (2초 폴링 지연 제거)
+    - 웹소켓 연결 실패 시에만 /history 폴링으로 대체
+    """
+    
+    def __init__(
+        self,
+        server_address: str = "100.100.53.32:8288",
+        pool_size: int = 20,
+        poll_interval: float = 2.0,
+        on_progress: Optional[Callable[[str, int, int], None]] = None,
+        deterministic_seed: bool = False,
+        image_cache: Optional[ImageCache] = None,
+        image_dir: str = "generated_images"
+    ):
+        """
+        Args:
+            server_address: ComfyUI 서버 주소 (IP:PORT)
+            pool_size: HTTP 커넥션 풀 최대 크기
+            poll_interval: 폴백 폴링 간격 (초)
+            on_progress: 스텝 진행 콜백 (prompt_id, value, max)
+            deterministic_seed: True면 seed 미지정 시 프롬프트 해시로 시드 고정
+            image_cache: 생성 이미지 캐시 (시드가 고정된 요청만 캐시)
+            image_dir: 생성 이미지 저장 폴더 (image_cache 의 폴더와 같게)
+        """
+        super().__init__(server_address, deterministic_seed, image_dir)
+        self.image_cache = image_cache
+        self.pool_size = pool_size
+        self.poll_interval = poll_interval
+        self.on_progress = on_progress
+        
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws_task: Optional[asyncio.Task] = None
+        self._ws_connected = asyncio.Event()
+        self._ws_failed = True
+        
+        # prompt_id → 완료 Future / 진행 상황
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._early_results: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self.progress: Dict[str, Dict] = {}
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """공유 aiohttp 세션 (싱글톤)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self):
+        """웹소켓 리스너 및 세션 종료 (앱 종료 시 호출)"""
+        if self._ws_task:
+            self._ws_task.cancel()
+            try:
+                await self._ws_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._ws_task = None
+        
+        if self._session and not self._session.closed:
+            await self._session.close()
+    
+    async def generate_image(self, prompt_data: Dict) -> Dict:
+        """
+        이미지 생성 (비동기, 캐시 사용 시 동일 요청 재사용)
+        
+        Args:
+            prompt_data: 프롬프트 및 파라미터 딕셔너리
+            
+        Returns:
+            생성 결과 (image_path, quality_score, cache 등)
+        """
+        seed = self._resolve_seed(prompt_data)
+        
+        # 시드가 랜덤이면 같은 입력도 결과가 달라지므로 캐시하지 않음
+        if self.image_cache is None or seed is None:
+            result = await self._generate(prompt_data)
+            result["cache"] = "disabled"
+            return result
+        
+        style_params = prompt_data.get("style_params", {})
+        key = self.image_cache.make_key({
+            "positive": prompt_data.get("positive", ""),
+            "steps": int(style_params.get("steps", 20)),
+            "cfg": float(style_params.get("cfg_scale", 1.0)),
+            "sampler": style_params.get("sampler", "euler"),
+            "width": int(style_params.get("width", 1024)),
+            "height": int(style_params.get("height", 1024)),
+            "lora_strength": float(style_params.get("lora_strength", 0.8)),
+            "seed": seed
+        })
+        
+        result, status = await self.image_cache.get_or_create(key, lambda: self._generate(prompt_data))
+        print(f"🗂️ 이미지 캐시: {status} ({key[:12]})")
+        
+        if status == "hit":
+            result.update({
+                "prompt_id": None,
+                "quality_score": self._evaluate_image_quality(result["image_path"]),
+                "generation_time": 0.0
+            })
+        result["cache"] = status
+        return result
+    
+    async def _generate(self, prompt_data: Dict) -> Dict:
+        """ComfyUI 실제 생성 (큐 제출 → 완료 대기 → 다운로드)"""
+        print("🎨 이미지 생성 시작")
+        
+        workflow = self._inject_prompt(self._get_flux_workflow(), prompt_data)
+        prompt_id = None
+        
+        try:
+            # 완료 이벤트를 놓치지 않도록 큐 제출 전에 웹소켓 연결
+            await self._ensure_listener()
+            
+            start_time = time.time()
+            prompt_id = await self._queue_prompt(workflow)
+            print(f"✅ Prompt ID: {prompt_id}")
+            
+            result = await self._wait_for_completion(prompt_id)
+            image_path, quality_score = await self._download_image(result)
+            
+            return {
+                "image_path": image_path,
+                "prompt_id": prompt_id,
+                "quality_score": quality_score,
+                "generation_time": round(time.time() - start_time, 2)
+            }
+            
+        except Exception as e:
+            print(f"❌ 오류 발생: {type(e).__name__} - {str(e)}")
+            raise
+        
+        finally:
+            self.progress.pop(prompt_id, None)
+    
+    async def _queue_prompt(self, workflow: Dict) -> str:
+        """ComfyUI 큐에 프롬프트 제출"""
+        url = f"http://{self.server_address}/prompt"
+        payload = {"prompt": workflow, "client_id": self.client_id}
+        
+        async with self.session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            response.raise_for_status()
+            data = await response.json()
+        
+        prompt_id = data["prompt_id"]
+        if prompt_id not in self._waiters:
+            self._waiters[prompt_id] = asyncio.get_running_loop().create_future()
+        return prompt_id
+    
+    async def _ensure_listener(self, connect_timeout: float = 5.0):
+        """웹소켓 리스너 태스크 시작 (클라이언트당 1개)"""
+        if self._ws_task is None or self._ws_task.done():
+            self._ws_connected.clear()
+            self._ws_task = asyncio.create_task(self._listen())
+        
+        if self._ws_connected.is_set():
+            return
+        
+        # 연결 완료 또는 연결 실패(태스크 종료) 중 먼저 오는 쪽까지 대기
+        connected = asyncio.create_task(self._ws_connected.wait())
+        await asyncio.wait(
+            {connected, self._ws_task},
+            timeout=connect_timeout,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        connected.cancel()
+        
+        self._ws_failed = not self._ws_connected.is_set()
+        if self._ws_failed:
+            print("⚠️ 웹소켓 연결 실패 - 폴링으로 대체")
+    
+    async def _listen(self):
+        """ComfyUI 진행 스트림 수신 및 prompt_id 별 디스패치"""
+        url = f"ws://{self.server_address}/ws?clientId={self.client_id}"
+        
+        try:
+            async with self.session.ws_connect(url, heartbeat=30) as ws:
+                self._ws_failed = False
+                self._ws_connected.set()
+                print("🔌 웹소켓 연결 완료")
+                
+                async for msg in ws:
+                    # 바이너리 메시지는 미리보기 이미지 → 무시
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        self._handle_message(json.loads(msg.data))
+                    elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ 웹소켓 오류: {type(e).__name__} - {e}")
+        finally:
+            # 연결이 끊기면 대기 중인 요청은 폴링으로 전환
+            self._ws_failed = True
+            self._ws_connected.clear()
+            for future in self._waiters.values():
+                if not future.done():
+                    future.set_result("fallback")
+    
+    def _handle_message(self, message: Dict):
+        """웹소켓 메시지 처리"""
+        msg_type = message.get("type")
+        data = message.get("data", {})
+        prompt_id = data.get("prompt_id")
+        
+        # 대기가 끝난 프롬프트의 늦은 메시지 (executing 종료 뒤 execution_success 등) 는 무시
+        if not prompt_id or prompt_id in self._finished:
+            return
+        
+        if msg_type == "progress":
+            value, maximum = data.get("value", 0), data.get("max", 0)
+            self.progress[prompt_id] = {"value": value, "max": maximum}
+            print(f"⏳ [{prompt_id[:8]}] {value}/{maximum} 스텝")
+            if self.on_progress:
+                self.on_progress(prompt_id, value, maximum)
+        
+        # node == None 이면 해당 프롬프트 실행 종료
+        elif msg_type == "executing" and data.get("node") is None:
+            self._resolve(prompt_id, "done")
+        
+        elif msg_type == "execution_success":
+            self._resolve(prompt_id, "done")
+        
+        elif msg_type in ("execution_error", "execution_interrupted"):
+            self._resolve(prompt_id, msg_type)
+    
+    def _resolve(self, prompt_id: str, status: str):
+        """완료 Future 설정 (Future 등록 전에 도착한 이벤트는 보관)"""
+        future = self._waiters.get(prompt_id)
+        if future is None:
+            self._early_results[prompt_id] = status
+            while len(self._early_results) > FINISHED_PROMPTS_KEPT:
+                self._early_results.popitem(last=False)
+        elif not future.done():
+            future.set_result(status)
+    
+    async def _wait_for_completion(self, prompt_id: str, timeout: int = 300) -> Dict:
+        """이미지 생성 완료 대기 (웹소켓 우선, 실패 시 폴링)"""
+        print("⏳ 이미지 생성 대기 중...")
+        
+        future = self._waiters.setdefault(prompt_id, asyncio.get_running_loop().create_future())
+        if prompt_id in self._early_results and not future.done():
+            future.set_result(self._early_results.pop(prompt_id))
+        
+        start_time = time.time()
+        
+        try:
+            if not self._ws_failed:
+                status = await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+                
+                if status in ("execution_error", "execution_interrupted"):
+                    raise RuntimeError(f"이미지 생성 실패: {status}")
+                
+                if status == "done":
+                    history = await self._get_history(prompt_id)
+                    if history is not None:
+                        print("✅ 생성 완료!")
+                        return history
+            
+            # 폴백: /history 폴링
+            remaining = timeout - (time.time() - start_time)
+            return await self._poll_history(prompt_id, remaining)
+        
+        except asyncio.TimeoutError:
+            raise TimeoutError("이미지 생성 시간 초과")
+        
+        finally:
+            self._waiters.pop(prompt_id, None)
+            self._early_results.pop(prompt_id, None)
+            self._finished[prompt_id] = None
+            while len(self._finished) > FINISHED_PROMPTS_KEPT:
+                self._finished.popitem(last=False)
+    
+    async def _get_history(self, prompt_id: str) -> Optional[Dict]:
+        """/history/{prompt_id} 단건 조회"""
+        url = f"http://{self.server_address}/history/{prompt_id}"
+        
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                return None
+            history = await response.json()
+        
+        return history.get(prompt_id)
+    
+    async def _poll_history(self, prompt_id: str, timeout: float) -> Dict:
+        """/history 폴링 (웹소켓 사용 불가 시 폴백)"""
+        print("🔁 폴링 모드로 완료 대기")
+        
+        start_time = time.time()
+        
+        while time.time() - start_time < timeout:
+            try:
+                history = await self._get_history(prompt_id)
+                if history is not None:
+                    print("✅ 생성 완료!")
+                    return history
+            except aiohttp.ClientError:
+                pass
+            
+            await asyncio.sleep(self.poll_interval)
+        
+        raise TimeoutError("이미지 생성 시간 초과")
+    
+    async def _download_image(self, result: Dict) -> Tuple[str, float]:
+        """생성된 이미지 스트리밍 다운로드 (임시 파일 → rename) 및 품질 평가"""
+        params, filename = self._find_output_image(result)
+        url = f"http://{self.server_address}/view"
+        
+        self.image_dir.mkdir(parents=True, exist_ok=True)
+        output_path = str(self.image_dir / filename)
+        tmp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.part"
+        
+        try:
+            async with self.session.get(url, params=params) as response:
+                response.raise_for_status()
+                
+                head = bytearray()
+                file_size = 0
+                # 파일 쓰기는 스레드에서 (디스크가 느려도 이벤트 루프를 막지 않음)
+                f = await asyncio.to_thread(open, tmp_path, "wb")
+                try:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+                        file_size += len(chunk)
+                        if len(head) < HEADER_PROBE_SIZE:
+                            head.extend(chunk[:HEADER_PROBE_SIZE - len(head)])
+                finally:
+                    await asyncio.to_thread(f.close)
+            
+            await asyncio.to_thread(os.replace, tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         
-        # uv run comfy launch
\ No newline at end of file
+        print(f"💾 저장 완료: {output_path}")
+        return output_path, self._score_from_header(bytes(head), file_size)
@@ -0,0 +1,143 @@
+"""
+콘텐츠 해시 기반 결과 저장소 (append-only JSONL)
+- (모델, 버전, 입력 텍스트) 해시 → 결과 (번역문 / 임베딩)
+- 결과가 나올 때마다 바로 한 줄씩 기록 → 중간에 죽어도 재실행 시 이어서 처리
+- 책을 수정해 다시 돌려도 바뀐 문단만 새로 처리 (같은 문단은 해시가 같음)
+- 같은 키를 같은 값으로 다시 넣으면 무시 → 배치 결과를 여러 번 적재해도 안전
+- 마지막 줄이 쓰다 만 상태여도 건너뛰고 로드
+- 값이 큰 저장소(임베딩)는 키 → 파일 위치만 메모리에 두고 값은 필요할 때 읽음
+"""
+import array
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class ContentHashStore:
+    # JSONL 한 줄에서 결과를 담는 필드명
+    VALUE_FIELD = "value"
+    # True면 값 대신 파일 위치(byte offset)만 메모리에 보관
+    LAZY = False
+
+    def __init__(self, path: str, model: str, version: str = ""):
+        """
+        저장소 초기화 (기존 기록 로드)
+
+        Args:
+            path: JSONL 파일 경로 (책 여러 권이 같은 파일을 써도 됨)
+            model: 모델명 (키에 포함 → 모델을 바꾸면 다시 처리)
+            version: 프롬프트 등 처리 방식 버전 (바꾸면 올려서 다시 처리)
+        """
+        self.path = Path(path)
+        self.model = model
+        self.version = version
+        self._entries: Dict[str, Any] = {}  # 키 → 값 (LAZY면 파일 위치)
+        self._needs_newline = False
+        self.stats = {"loaded": 0, "corrupt_lines": 0, "hit": 0, "miss": 0, "written": 0}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        offset = 0
+        line = b""
+        with open(self.path, "rb") as f:
+            for line in f:
+                position, offset = offset, offset + len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    self._entries[entry["key"]] = position if self.LAZY else entry[self.VALUE_FIELD]
+                except (json.JSONDecodeError, KeyError):
+                    # 기록 도중 종료된 마지막 줄 등
+                    self.stats["corrupt_lines"] += 1
+        # 쓰다 만 줄 뒤에 이어 쓰지 않도록 다음 기록 앞에 줄바꿈 추가
+        self._needs_newline = bool(line) and not line.endswith(b"\n")
+        self.stats["loaded"] = len(self._entries)
+        print(f"📂 {self.path.name} 로드: {len(self._entries)}개")
+
+    def make_key(self, text: str) -> str:
+        raw = f"{self.model}\n{self.version}\n{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _encode(self, value: Any) -> Any:
+        """값 → JSON에 기록할 형태"""
+        return value
+
+    def _decode(self, raw: Any) -> Any:
+        """JSON에 기록된 형태 → 값"""
+        return raw
+
+    def _raw(self, key: str) -> Optional[Any]:
+        """키 → 기록된 값 (LAZY면 파일에서 한 줄 읽음)"""
+        entry = self._entries.get(key)
+        if entry is None or not self.LAZY:
+            return entry
+        with open(self.path, "rb") as f:
+            f.seek(entry)
+            return json.loads(f.readline())[self.VALUE_FIELD]
+
+    def get(self, text: str) -> Optional[Any]:
+        raw = self._raw(self.make_key(text))
+        self.stats["hit" if raw is not None else "miss"] += 1
+        return self._decode(raw) if raw is not None else None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def put_many(self, texts: List[str], values: List[Any]):
+        """결과 기록 (한 묶음 = 한 번의 write + flush)"""
+        self.put_keys([self.make_key(text) for text in texts], values)
+
+    def put_keys(self, keys: List[str], values: List[Any]) -> int:
+        """키로 직접 기록 (배치 결과 적재용) → 새로 기록한 개수"""
+        pending: Dict[str, Any] = {}
+        for key, value in zip(keys, values):
+            raw = self._encode(value)
+            if pending.get(key, self._raw(key)) == raw:
+                continue
+            pending[key] = raw
+
+        if not pending:
+            return 0
+        self.stats["written"] += len(pending)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            if self._needs_newline:
+                f.write(b"\n")
+                self._needs_newline = False
+            for key, raw in pending.items():
+                position = f.tell()
+                f.write((json.dumps({"key": key, "model": self.model, self.VALUE_FIELD: raw}, ensure_ascii=False) + "\n").encode("utf-8"))
+                self._entries[key] = position if self.LAZY else raw
+            f.flush()
+        return len(pending)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TranslationCheckpoint(ContentHashStore):
+    """영어 청크 → 한국어 번역"""
+    VALUE_FIELD = "ko"
+
+    def __init__(self, path: str, model: str, prompt_version: str):
+        super().__init__(path, model, prompt_version)
+
+
+class EmbeddingStore(ContentHashStore):
+    """청크 텍스트 → 임베딩 벡터 (float32 base64로 저장해 파일 크기 절약, 메모리에는 위치만)"""
+    VALUE_FIELD = "embedding"
+    LAZY = True
+
+    def _encode(self, value: List[float]) -> str:
+        return base64.b64encode(array.array("f", value).tobytes()).decode("ascii")
+
+    def _decode(self, raw: str) -> List[float]:
+        vector = array.array("f")
+        vector.frombytes(base64.b64decode(raw))
+        return vector.tolist()
@@ -1,64 +1,203 @@
-# python data_preparation.py
+# python data_preparation.py                                  (data/book_meta.json 의 모든 책)
+# python data_preparation.py --books little_women sherlock --workers 4
+import argparse
+import json
+import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
 
-def clean_gutenberg_text(file_path, start_marker, end_marker):
+START_MARKER = "START OF THE PROJECT GUTENBERG EBOOK"
+END_MARKER = "END OF THE PROJECT GUTENBERG EBOOK"
+
+DATA_DIR = 'data'
+META_FILE_PATH = os.path.join(DATA_DIR, 'book_meta.json')  # 책 목록 (raw_folder 기준)
+ORIGINAL_DIR = os.path.join(DATA_DIR, '01_original')       # {raw_folder}/{raw_folder}_ori.txt
+CLEANED_DIR = os.path.join(DATA_DIR, '02_cleaned')         # {raw_folder}/en.txt (data_translate.py 입력)
+
+
+def iter_cleaned_lines(file_path, start_marker=START_MARKER, end_marker=END_MARKER, stats: Optional[Dict] = None) -> Iterator[str]:
+    """
+    구텐베르크 txt 파일을 한 줄씩 읽으며 본문 줄만 내보내는 제너레이터
+
+    - start_marker 가 있는 줄 다음부터 end_marker 가 있는 줄 전까지 (마커 줄의 제목 / *** 제외)
+    - start_marker 가 없으면 파일 처음부터 (경고 출력)
+    - 공백만 있는 줄은 빈 줄로, 연속된 빈 줄은 1개로, 앞뒤 빈 줄과 줄 끝 공백은 제거
+    - 파일 전체를 메모리에 올리지 않음
+    """
+    start_re = re.compile(re.escape(start_marker), re.IGNORECASE)
+    end_re = re.compile(re.escape(end_marker), re.IGNORECASE)
+    stats = stats if stats is not None else {}
+    stats.update({"lines_in": 0, "lines_out": 0, "start_found": False, "end_found": False})
+
+    # 1. start_marker 위치 찾기 (줄 번호만 기억)
+    start_line = 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for i, line in enumerate(f):
+            if start_re.search(line):
+                start_line = i + 1
+                stats["start_found"] = True
+                break
+    if not stats["start_found"]:
+        print(f"err ::: 본문 시작 마커를 찾을 수 없습니다. 파일 처음부터 사용합니다: {file_path}")
+
+    # 2. 본문 줄 정리
+    pending_blank = False
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for i, line in enumerate(f):
+            stats["lines_in"] += 1
+            if i < start_line:
+                continue
+
+            end_match = end_re.search(line)
+            if end_match:
+                stats["end_found"] = True
+                # 마커 앞부분은 보통 "*** " 뿐이므로 같은 줄의 본문만 남김
+                line = line[:end_match.start()].rstrip(" *")
+
+            line = line.rstrip()
+            if not line:
+                pending_blank = stats["lines_out"] > 0
+            else:
+                if pending_blank:
+                    yield ""
+                    stats["lines_out"] += 1
+                    pending_blank = False
+                yield line if stats["lines_out"] else line.lstrip()
+                stats["lines_out"] += 1
+
+            if end_match:
+                break
+
+    if not stats["end_found"]:
+        print(f"경고 ::: end_marker를 찾을 수 없습니다. 파일 끝까지 사용합니다: {file_path}")
+
+
+def clean_gutenberg_text(file_path, start_marker=START_MARKER, end_marker=END_MARKER):
     """
     구텐베르크 txt 파일에서 메타데이터를 제거하고 본문만 추출하는 함수
     """
     try:
-        # 1. 파일 읽기
-        with open(file_path, 'r', encoding='utf-8') as f:
-            full_text = f.read()
+        return "\n".join(iter_cleaned_lines(file_path, start_marker, end_marker))
     except FileNotFoundError:
         print(f"err ::: 파일을 찾을 수 없습니다: {file_path}")
         return None
-    
-    # 2. start_marker 기준으로 자르기
-    start_match = re.search(start_marker, full_text, re.IGNORECASE)
-    
-    if start_match:
-        text_after_start = full_text[start_match.end():]
-    else:
-        print("err ::: 본문 시작 마커를 찾을 수 없습니다.")
-        return full_text
-
-    # 3. end_marker 기준으로 자르기
-    end_match = re.search(end_marker, text_after_start, re.IGNORECASE)
-    
-    if end_match:
-        cleaned_text = text_after_start[:end_match.start()].strip()
-    else:
-        print("경고 ::: end_marker를 찾을 수 없습니다. 파일 전체를 사용합니다.")
-        cleaned_text = text_after_start.strip()
-        
-    # 4. 불필요한 공백 제거
-    cleaned_text = re.sub(r'\n\s*\n', '\n\n', cleaned_text)
-    
-    return cleaned_text
 
-def main():
+
+def clean_book(book: Dict) -> Dict:
     """
-    clean 함수 호출 및 파일 저장하는 메인 실행 함수
+    책 1권 정제 (프로세스 풀 작업 단위) → 처리 결과
+
+    Args:
+        book: raw_folder, input_path, output_path, start_marker, end_marker
+    """
+    started = time.perf_counter()
+    result = {"book": book["raw_folder"], "output_path": book["output_path"], "ok": False}
+    try:
+        stats = {}
+        os.makedirs(os.path.dirname(book["output_path"]), exist_ok=True)
+        tmp_path = book["output_path"] + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            for i, line in enumerate(iter_cleaned_lines(book["input_path"], book["start_marker"], book["end_marker"], stats)):
+                out.write(line if i == 0 else "\n" + line)
+        os.replace(tmp_path, book["output_path"])
+
+        result.update(stats)
+        result.update({
+            "ok": True,
+            "bytes_in": os.path.getsize(book["input_path"]),
+            "bytes_out": os.path.getsize(book["output_path"]),
+        })
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def load_books(manifest_path: str, names: Optional[List[str]] = None) -> List[Dict]:
+    """
+    book_meta.json (또는 같은 형식의 목록) → 정제 작업 목록
+
+    항목마다 raw_file / cleaned_file / start_marker / end_marker 로 기본값을 바꿀 수 있음
     """
-    book_name = "sherlock"
+    entries = []
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            entries = [e for e in json.load(f) if e.get('raw_folder')]
+    known = {e['raw_folder'] for e in entries}
+    if names:
+        # 목록에 없는 책 이름도 기본 경로로 처리
+        entries = [e for e in entries if e['raw_folder'] in names] + [{"raw_folder": n} for n in names if n not in known]
 
-    INPUT_FILE = f"C:/Reading_Mate/data/01_original/{book_name}/{book_name}_ori.txt"
-    OUTPUT_FILE = f"C:/Reading_Mate/data/02_cleaned/{book_name}/en/{book_name}_cleaned.txt"
+    books = []
+    for entry in entries:
+        folder = entry['raw_folder']
+        books.append({
+            "raw_folder": folder,
+            "input_path": entry.get('raw_file') or os.path.join(ORIGINAL_DIR, folder, f"{folder}_ori.txt"),
+            "output_path": entry.get('cleaned_file') or os.path.join(CLEANED_DIR, folder, 'en.txt'),
+            "start_marker": entry.get('start_marker', START_MARKER),
+            "end_marker": entry.get('end_marker', END_MARKER),
+        })
+    return books
 
-    START_MARKER = "START OF THE PROJECT GUTENBERG EBOOK"
-    END_MARKER = "END OF THE PROJECT GUTENBERG EBOOK"
 
-    print(f"[{book_name}] 정제 시작...")
+def clean_books(books: List[Dict], workers: Optional[int] = None) -> List[Dict]:
+    """여러 권을 프로세스 풀로 병렬 정제 (끝난 순서대로 진행 상황 출력)"""
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(clean_book, book) for book in books]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            mark = "✅" if result["ok"] else "❌"
+            print(f"{mark} [{result['book']}] {result['seconds']:.2f}s {result.get('error', '')}")
+    return sorted(results, key=lambda r: r["book"])
+
+
+def print_summary(results: List[Dict], wall_seconds: float):
+    print(f"\n{'책':<28}{'입력 줄':>10}{'출력 줄':>10}{'입력 MB':>10}{'출력 MB':>10}{'초':>8}{'MB/s':>8}")
+    for r in results:
+        if not r["ok"]:
+            print(f"{r['book']:<28}  실패: {r['error']}")
+            continue
+        mb_in = r["bytes_in"] / 1e6
+        print(
+            f"{r['book']:<28}{r['lines_in']:>10,}{r['lines_out']:>10,}{mb_in:>10.2f}{r['bytes_out'] / 1e6:>10.2f}"
+            f"{r['seconds']:>8.2f}{mb_in / max(r['seconds'], 1e-6):>8.1f}"
+            + ("" if r["start_found"] and r["end_found"] else "  ⚠️ 마커 누락")
+        )
+
+    done = [r for r in results if r["ok"]]
+    busy = sum(r["seconds"] for r in done)
+    total_mb = sum(r["bytes_in"] for r in done) / 1e6
+    print(
+        f"\n성공 {len(done)}/{len(results)}권, {total_mb:.2f}MB, 경과 {wall_seconds:.2f}s "
+        f"(책별 합계 {busy:.2f}s, 병렬 효율 {busy / max(wall_seconds, 1e-6):.1f}배, {total_mb / max(wall_seconds, 1e-6):.1f}MB/s)"
+    )
+
+
+def main():
+    """
+    여러 책을 병렬로 정제해 data/02_cleaned/{raw_folder}/en.txt 로 저장하는 메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="구텐베르크 원문 정제 (여러 권 병렬)")
+    parser.add_argument("--manifest", default=META_FILE_PATH, help="책 목록 JSON (book_meta.json 형식, raw_folder 필수)")
+    parser.add_argument("--books", nargs="*", help="정제할 책 raw_folder (기본: 목록 전체)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    args = parser.parse_args()
 
-    # 코드 실행
-    cleaned_content = clean_gutenberg_text(INPUT_FILE, START_MARKER, END_MARKER)
+    books = load_books(args.manifest, args.books)
+    if not books:
+        print(f"err ::: 정제할 책이 없습니다 ({args.manifest})")
+        return
 
-    if cleaned_content:
-        # 5. 정제된 텍스트 저장
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            f.write(cleaned_content)
-        print("저장 성공")
+    print(f"{len(books)}권 정제 시작 (workers={args.workers or os.cpu_count()})...")
+    started = time.perf_counter()
+    results = clean_books(books, args.workers)
+    print_summary(results, time.perf_counter() - started)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,16 @@
 import os
 import json
 import time
-from openai import OpenAI  # 예시로 OpenAI 사용
+import random
+import asyncio
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple
+import openai
+from openai import OpenAI, AsyncOpenAI  # 예시로 OpenAI 사용
+from chunker import CHUNK_MAX_TOKENS, CHUNK_MIN_TOKENS, CHUNK_OVERLAP_TOKENS, chunk_book, count_tokens, summarize_chunks
+from glossary import BookGlossary, build_glossary_from_chunks
+from content_store import TranslationCheckpoint
+from chunk_io import ChunkWriter, iter_chunks
 # client = OpenAI(api_key="YOUR_API_KEY")
 
 # ----------------------------------------------------
@@ -14,7 +23,38 @@ PROCESSED_DIR = os.path.join('data', '03_processed')
 META_FILE_PATH = os.path.join('data', 'book_meta.json') 
 
 INPUT_EN_PATH = os.path.join(CLEANED_DIR, 'en.txt')
-OUTPUT_JSON_PATH = os.path.join(PROCESSED_DIR, 'chunked_data_little_women.json') 
+OUTPUT_PATH = os.path.join(PROCESSED_DIR, 'chunked_data_little_women.jsonl')  # .jsonl.gz / .jsonl.zst 면 압축
+GLOSSARY_DIR = os.path.join('data', 'glossary')  # 책별 고유명사 용어집 ({book_id}.json, PromptGenerator 가 book_id 로 조회)
+CHECKPOINT_PATH = os.path.join(PROCESSED_DIR, 'translation_checkpoint.jsonl')  # 번역 체크포인트 (책 공용)
+
+# 번역 파이프라인 기본값 (OpenAI 계정 한도에 맞게 조정)
+TRANSLATION_MODEL = "gpt-4o"
+TRANSLATION_CONCURRENCY = 8      # 동시 요청 수
+TRANSLATION_RPM = 300            # 분당 요청 수 한도
+TRANSLATION_TPM = 150_000        # 분당 토큰 수 한도 (입력 + 예상 출력)
+BATCH_MAX_CHARS = 2000           # 짧은 문단 묶음 최대 글자 수 (0이면 묶지 않음)
+BATCH_MAX_PARAGRAPHS = 8         # 묶음당 최대 문단 수
+SHORT_PARAGRAPH_CHARS = 400      # 이보다 짧은 문단만 묶음 대상
+MAX_RETRIES = 5
+
+# 아래 프롬프트를 바꾸면 버전을 올려야 체크포인트의 이전 번역을 재사용하지 않음
+TRANSLATION_PROMPT_VERSION = "v1"
+TRANSLATION_SYSTEM_PROMPT = "You are a professional Korean translator. Translate the following English text into natural, formal Korean."
+BATCH_SYSTEM_PROMPT = (
+    "You are a professional Korean translator. Translate each English paragraph in the JSON array "
+    "`paragraphs` into natural, formal Korean. Respond with a JSON object "
+    "{\"translations\": [...]} containing exactly one translation per paragraph, in the same order."
+)
+
+# 모델별 가격 (USD / 1M 토큰, 입력 / 출력) - 비용 리포트용
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
 
 # ----------------------------------------------------
 # 2. 헬퍼 함수
@@ -29,13 +69,6 @@ def load_book_metadata(meta_path, book_folder):
                 return book
     raise FileNotFoundError(f"'{book_folder}'에 해당하는 책 메타데이터를 찾을 수 없습니다.")
 
-def simple_chunking(text: str) -> list:
-    """텍스트를 문단(두 개 이상의 줄바꿈) 기준으로 분할합니다."""
-    # 문단 분할: 두 개 이상의 연속된 줄바꿈('\n\n')을 기준으로 나눔
-    chunks = text.split('\n\n')
-    # 빈 문자열이나 공백만 있는 청크를 제거하고, 양쪽 공백 제거
-    return [chunk.strip() for chunk in chunks if chunk.strip()]
-
 def translate_chunk(client, text_en: str, model: str = "gpt-4o"):
     """LLM API를 사용하여 영어 텍스트를 한국어로 번역합니다."""
     # 실제 LLM API 호출 로직을 여기에 구현해야 합니다.
@@ -62,11 +95,310 @@ def translate_chunk(client, text_en: str, model: str = "gpt-4o"):
         print(f"번역 중 오류 발생: {e}")
         return "번역 오류"
 
+# ----------------------------------------------------
+# 2-1. 비동기 번역 파이프라인 (동시 요청 + 속도 제한 + 재시도 + 문단 묶음)
+# ----------------------------------------------------
+
+class TokenBucket:
+    """토큰 버킷 속도 제한 (rate: 초당 보충량, capacity: 최대 누적량)"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        """
+        amount만큼 쌓일 때까지 대기 후 차감 (요청 순서대로)
+
+        capacity보다 큰 요청은 가득 찰 때까지 기다린 뒤 전부 차감 (음수 = 빚, 다음 요청이 그만큼 더 기다림)
+        → 큰 요청도 분당 한도를 넘지 않음
+        """
+        needed = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+    ValueError,  # 묶음 응답 개수 불일치 / JSON 오류
+)
+
+
+def estimate_tokens(texts: List[str]) -> int:
+    """속도 제한용 토큰 추정 (입력 + 비슷한 길이의 한국어 출력)"""
+    chars = sum(len(t) for t in texts)
+    return chars // 4 + chars // 2 + 50
+
+
+def make_batches(
+    chunks: List[str],
+    max_chars: int = BATCH_MAX_CHARS,
+    max_paragraphs: int = BATCH_MAX_PARAGRAPHS,
+    short_chars: int = SHORT_PARAGRAPH_CHARS
+) -> List[List[int]]:
+    """연속된 짧은 문단을 한 요청으로 묶기 → 청크 인덱스 묶음 리스트 (순서 유지)"""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0
+
+    for i, chunk in enumerate(chunks):
+        if not max_chars or len(chunk) >= short_chars:
+            if current:
+                batches.append(current)
+                current, current_chars = [], 0
+            batches.append([i])
+            continue
+
+        if current and (current_chars + len(chunk) > max_chars or len(current) >= max_paragraphs):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(i)
+        current_chars += len(chunk)
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0, retry_after: Optional[float] = None) -> float:
+    """지수 백오프 + full jitter (서버가 Retry-After를 주면 그 이상 대기)"""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def translation_request_body(text_en: str, model: str) -> Dict:
+    """문단 1개 번역 요청 body (동시 요청 / 배치 작업 공용)"""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
+            {"role": "user", "content": text_en}
+        ],
+        "temperature": 0.3
+    }
+
+
+async def _request_translation(client: Optional[AsyncOpenAI], texts: List[str], model: str) -> Tuple[List[str], Dict]:
+    """문단 1개는 일반 요청, 여러 개는 JSON 묶음 요청 → (번역 리스트, usage)"""
+    if client is None:
+        # Dummy 모드: API 없이 파이프라인만 확인
+        return [translate_chunk(None, text) for text in texts], {}
+
+    if len(texts) == 1:
+        response = await client.chat.completions.create(**translation_request_body(texts[0], model))
+        translations = [response.choices[0].message.content.strip()]
+    else:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps({"paragraphs": texts}, ensure_ascii=False)}
+            ],
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+        translations = json.loads(response.choices[0].message.content).get("translations", [])
+        if len(translations) != len(texts) or not all(isinstance(t, str) for t in translations):
+            raise ValueError(f"묶음 번역 개수 불일치: {len(translations)} != {len(texts)}")
+        translations = [t.strip() for t in translations]
+
+    usage = response.usage
+    return translations, {
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0
+    }
+
+
+def translation_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """USD 비용 추정 (가격표에 없는 모델이면 None)"""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    return round(prompt_tokens / 1e6 * prices[0] + completion_tokens / 1e6 * prices[1], 4)
+
+
+async def translate_chunks(
+    client: Optional[AsyncOpenAI],
+    chunks_en: List[str],
+    model: str = TRANSLATION_MODEL,
+    concurrency: int = TRANSLATION_CONCURRENCY,
+    rpm: float = TRANSLATION_RPM,
+    tpm: float = TRANSLATION_TPM,
+    batch_chars: int = BATCH_MAX_CHARS,
+    max_retries: int = MAX_RETRIES,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    checkpoint: Optional[TranslationCheckpoint] = None,
+    on_result: Optional[Callable[[int, str], None]] = None
+) -> Tuple[List[str], Dict]:
+    """
+    청크 목록을 동시에 번역 (결과 순서 = 입력 순서)
+
+    checkpoint가 있으면 이미 번역된 청크는 건너뛰고, 새 번역은 묶음마다 바로 기록
+    on_result(청크 번호, 번역)는 결과가 정해질 때마다 호출 (완료 순서, 체크포인트 재사용분 포함)
+
+    Returns:
+        (번역 리스트, 통계: 요청/재시도/실패 수, 처리량, 토큰, 비용)
+    """
+    results: List[Optional[str]] = [None] * len(chunks_en)
+
+    def set_result(i: int, translation: str):
+        results[i] = translation
+        if on_result:
+            on_result(i, translation)
+
+    if checkpoint is not None:
+        for i, chunk in enumerate(chunks_en):
+            cached = checkpoint.get(chunk)
+            if cached is not None:
+                set_result(i, cached)
+    pending = [i for i, result in enumerate(results) if result is None]
+    batches = [[pending[j] for j in batch] for batch in make_batches([chunks_en[i] for i in pending], batch_chars)]
+    queue: asyncio.Queue = asyncio.Queue()
+    for batch in batches:
+        queue.put_nowait(batch)
+
+    # 초당 보충, 최대 1초 분량까지 몰아쓰기 허용
+    request_bucket = TokenBucket(rpm / 60, max(1.0, rpm / 60))
+    token_bucket = TokenBucket(tpm / 60, tpm / 60)
+    stats = {
+        "chunks": len(chunks_en), "cached": len(chunks_en) - len(pending), "batches": len(batches), "requests": 0, "retries": 0,
+        "failed_chunks": 0, "split_batches": 0, "prompt_tokens": 0, "completion_tokens": 0
+    }
+    done = len(chunks_en) - len(pending)
+
+    async def translate_batch(indices: List[int]) -> bool:
+        texts = [chunks_en[i] for i in indices]
+        for attempt in range(max_retries + 1):
+            if client is not None:  # Dummy 모드는 속도 제한 없음
+                await request_bucket.acquire(1)
+                await token_bucket.acquire(estimate_tokens(texts))
+            stats["requests"] += 1
+            try:
+                translations, usage = await _request_translation(client, texts, model)
+            except RETRYABLE_ERRORS as e:
+                if attempt == max_retries:
+                    print(f"번역 실패 (청크 {indices[0]}~{indices[-1]}): {e}")
+                    return False
+                stats["retries"] += 1
+                await asyncio.sleep(backoff_delay(attempt, retry_after=_retry_after(e)))
+                continue
+            except Exception as e:
+                # 재시도해도 같은 결과인 오류 (4xx 요청 오류, 빈 응답 등) → 바로 실패 처리 (묶음은 문단별로 다시 시도)
+                print(f"번역 실패 (청크 {indices[0]}~{indices[-1]}, 재시도 안 함): {type(e).__name__}: {e}")
+                return False
+
+            for i, translation in zip(indices, translations):
+                set_result(i, translation)
+            if checkpoint is not None:
+                checkpoint.put_many(texts, translations)
+            stats["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            stats["completion_tokens"] += usage.get("completion_tokens", 0)
+            return True
+        return False
+
+    async def worker():
+        nonlocal done
+        while True:
+            try:
+                indices = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            if not await translate_batch(indices):
+                if len(indices) > 1:
+                    # 묶음이 계속 실패하면 문단별로 다시 시도
+                    stats["split_batches"] += 1
+                    for i in indices:
+                        queue.put_nowait([i])
+                    continue
+                set_result(indices[0], "번역 오류")
+                stats["failed_chunks"] += 1
+
+            done += len(indices)
+            if on_progress:
+                on_progress(done, len(chunks_en))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(max(1, concurrency))])
+    elapsed = time.perf_counter() - started
+
+    # 처리량은 이번 실행에서 실제로 번역한 청크 기준
+    total_chars = sum(len(chunks_en[i]) for i in pending)
+    stats.update({
+        "model": model,
+        "elapsed_s": round(elapsed, 2),
+        "chunks_per_s": round(len(pending) / elapsed, 2) if elapsed else 0.0,
+        "chars_per_s": round(total_chars / elapsed, 1) if elapsed else 0.0,
+        "requests_per_s": round(stats["requests"] / elapsed, 2) if elapsed else 0.0,
+        "cost_usd": translation_cost(model, stats["prompt_tokens"], stats["completion_tokens"]),
+    })
+    return results, stats
+
+
+def print_translation_stats(stats: Dict):
+    cost = f"${stats['cost_usd']:.4f}" if stats.get("cost_usd") is not None else "알 수 없음 (가격표에 없는 모델)"
+    print(
+        f"\n번역 완료: {stats['chunks']}개 청크 (체크포인트 재사용 {stats['cached']}개) / {stats['requests']}회 요청 "
+        f"(묶음 {stats['batches']}개, 재시도 {stats['retries']}회, 실패 {stats['failed_chunks']}개)"
+    )
+    print(
+        f"처리량: {stats['chunks_per_s']} 청크/s, {stats['chars_per_s']} 글자/s, "
+        f"{stats['requests_per_s']} 요청/s ({stats['elapsed_s']}s)"
+    )
+    print(f"토큰: 입력 {stats['prompt_tokens']:,} / 출력 {stats['completion_tokens']:,}, 비용 {cost}")
+
 # ----------------------------------------------------
 # 3. 메인 실행 로직
 # ----------------------------------------------------
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="영어 정제 텍스트 → 한국어 번역 JSON")
+    parser.add_argument("--model", default=TRANSLATION_MODEL)
+    parser.add_argument("--base-url", default=os.environ.get("OPENAI_BASE_URL"), help="OpenAI 호환 엔드포인트 (로컬 fake 서버 등)")
+    parser.add_argument("--concurrency", type=int, default=TRANSLATION_CONCURRENCY)
+    parser.add_argument("--rpm", type=float, default=TRANSLATION_RPM, help="분당 요청 수 한도")
+    parser.add_argument("--tpm", type=float, default=TRANSLATION_TPM, help="분당 토큰 수 한도")
+    parser.add_argument("--batch-chars", type=int, default=BATCH_MAX_CHARS, help="짧은 문단 묶음 최대 글자 수 (0 = 묶지 않음)")
+    parser.add_argument("--max-retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--min-tokens", type=int, default=CHUNK_MIN_TOKENS, help="청크 최소 토큰 수")
+    parser.add_argument("--max-tokens", type=int, default=CHUNK_MAX_TOKENS, help="청크 최대 토큰 수")
+    parser.add_argument("--overlap-tokens", type=int, default=CHUNK_OVERLAP_TOKENS, help="앞 청크와 겹칠 토큰 수")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="번역 체크포인트 JSONL (재실행 시 이어서 번역)")
+    parser.add_argument("--no-checkpoint", action="store_true", help="체크포인트 없이 전부 새로 번역")
+    parser.add_argument("--dummy", action="store_true", help="API 호출 없이 Dummy 번역으로 실행 (체크포인트 미사용)")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="출력 JSONL (.jsonl / .jsonl.gz / .jsonl.zst)")
+    parser.add_argument("--glossary", action="store_true", help="번역 후 고유명사 용어집 생성 (--dummy 와 함께 쓰지 않음)")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+
     # 폴더 생성 확인
     os.makedirs(PROCESSED_DIR, exist_ok=True)
     
@@ -79,48 +411,77 @@ def main():
         with open(INPUT_EN_PATH, 'r', encoding='utf-8') as f:
             full_text_en = f.read()
             
-        # 3. 청크 분할
-        english_chunks = simple_chunking(full_text_en)
-        print(f"총 {len(english_chunks)}개의 청크로 분할되었습니다.")
-
-        # 4. 청크 처리 및 번역
-        processed_chunks = []
-        # LLM 클라이언트 초기화 (실제 사용 시 주석 해제)
-        # client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        
-        for i, chunk_en in enumerate(english_chunks):
-            print(f"-> 청크 {i+1}/{len(english_chunks)} 번역 중...")
-            
-            # 🌟 [중요] 실제 번역 함수 호출 🌟
-            # chunk_ko = translate_chunk(client, chunk_en) 
-            chunk_ko = translate_chunk(None, chunk_en) # Dummy 호출
-            
-            processed_chunks.append({
-                "chunk_index": i,
-                # 이 단계에서 챕터 이름을 자동으로 추출하는 복잡한 로직이 필요할 수 있으나,
-                # 일단은 수동 또는 간단한 정규표현식으로 처리 가정
-                "chapter_name": f"Chapter {i//10 + 1}", # 예시 챕터명 할당
-                "content_en": chunk_en,
+        # 3. 청크 분할 (챕터 인식 + 토큰 범위)
+        chunks = chunk_book(full_text_en, args.min_tokens, args.max_tokens, args.overlap_tokens)
+        english_chunks = [chunk["content_en"] for chunk in chunks]
+        print(f"총 {len(english_chunks)}개의 청크로 분할되었습니다. {summarize_chunks(chunks)}")
+
+        # 4. 청크 번역 (동시 요청 + 속도 제한, 결과 순서는 입력 순서 유지)
+        client = None
+        checkpoint = None
+        if not args.dummy:
+            client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=args.base_url, max_retries=0)
+            if not args.no_checkpoint:
+                checkpoint = TranslationCheckpoint(args.checkpoint, args.model, TRANSLATION_PROMPT_VERSION)
+
+        def on_progress(done: int, total: int):
+            if done == total or done % 50 < 1:
+                print(f"-> 청크 {done}/{total} 번역 완료")
+
+        def processed_chunk(chunk: Dict, chunk_ko: str) -> Dict:
+            return {
+                "chunk_index": chunk["chunk_index"],
+                "chapter_name": chunk["chapter_name"],
+                "content_en": chunk["content_en"],
                 "content_ko": chunk_ko,
+                "token_count_en": chunk["token_count"],
+                "token_count_ko": count_tokens(chunk_ko),
+                "char_start": chunk["char_start"],  # en.txt 기준 위치
+                "char_end": chunk["char_end"],
                 "corresponding_chunk_id": None # DB 적재 시 채워질 임시 값
+            }
+
+        # 5. 책 헤더 + 번역된 청크를 JSONL 로 바로 기록 (앞 청크가 모두 끝난 만큼만 순서대로)
+        with ChunkWriter(args.output) as writer:
+            writer.write_book({
+                "book_id": book_id,
+                "gutenberg_id": book_meta['gutenberg_id'],
+                "title_ko": book_meta['title_ko'],
+                "title_en": book_meta['title_en'],
+                "author": book_meta['author'],
             })
-            time.sleep(0.5) # API 호출 제한 방지 및 진행 상황 확인을 위한 딜레이
-
-        # 5. 최종 JSON 구조 생성
-        final_data_structure = [{
-            "book_id": book_id,
-            "gutenberg_id": book_meta['gutenberg_id'],
-            "title_ko": book_meta['title_ko'],
-            "title_en": book_meta['title_en'],
-            "author": book_meta['author'],
-            "chunks": processed_chunks
-        }]
+            ready: Dict[int, str] = {}
+            next_index = 0
+
+            def on_result(i: int, chunk_ko: str):
+                nonlocal next_index
+                ready[i] = chunk_ko
+                while next_index in ready:
+                    writer.write_chunk(processed_chunk(chunks[next_index], ready.pop(next_index)))
+                    next_index += 1
+
+            translations, stats = asyncio.run(translate_chunks(
+                client, english_chunks,
+                model=args.model,
+                concurrency=args.concurrency,
+                rpm=args.rpm,
+                tpm=args.tpm,
+                batch_chars=args.batch_chars,
+                max_retries=args.max_retries,
+                on_progress=on_progress,
+                checkpoint=checkpoint,
+                on_result=on_result
+            ))
+        print_translation_stats(stats)
+        print(f"\n성공: 최종 JSONL 파일이 '{args.output}'에 저장되었습니다. ({writer.stats['chunks']}개 청크)")
         
-        # 6. JSON 파일 저장
-        with open(OUTPUT_JSON_PATH, 'w', encoding='utf-8') as f:
-            json.dump(final_data_structure, f, ensure_ascii=False, indent=4)
-            
-        print(f"\n성공: 최종 JSON 파일이 '{OUTPUT_JSON_PATH}'에 저장되었습니다.")
+        # 7. 고유명사 용어집 생성 (번역 쌍 기반, 책당 1회)
+        # 실제 번역 결과가 있을 때만 의미가 있으므로 --glossary 를 준 경우에만 실행
+        if args.glossary and not args.dummy:
+            glossary_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=args.base_url)
+            glossary_entries = build_glossary_from_chunks(glossary_client, [chunk for _, chunk in iter_chunks(args.output)])
+            BookGlossary(GLOSSARY_DIR).add(str(book_id), glossary_entries, overwrite=True, create=True)
+            print(f"용어집 저장 완료: {len(glossary_entries)}개 항목 → {GLOSSARY_DIR}/{book_id}.json")
         
     except Exception as e:
         print(f"메인 실행 중 오류 발생: {e}")
@@ -128,4 +489,5 @@ def main():
 if __name__ == "__main__":
     # 실제 LLM API 키를 환경 변수에 설정해야 합니다.
     # dotenv 등을 사용하여 로드하는 것을 권장합니다.
-    main()
\ No newline at end of file
+    # 로컬 테스트: python -m fakes.translation_server --rpm 600 → python data_translate.py --base-url http://127.0.0.1:8391/v1
+    main()
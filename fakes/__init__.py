@@ -0,0 +1,4 @@
+"""
+로컬 가짜(fake) 서버 모음
+- 외부 서비스 없이 클라이언트 동작 확인용
+"""
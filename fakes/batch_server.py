@@ -0,0 +1,264 @@
+# python -m fakes.batch_server --port 8394 --process-seconds 5 --line-error-rate 0.01
+# python -m fakes.batch_server --check
+"""
+가짜 OpenAI Batch API 서버 (batch_jobs.py 테스트용)
+- POST /v1/files (purpose=batch), GET /v1/files/{id}, GET /v1/files/{id}/content
+- POST /v1/batches, GET /v1/batches/{id}, POST /v1/batches/{id}/cancel
+- 배치는 validating → in_progress → finalizing → completed 순서로 진행 (process_seconds 동안)
+- 각 줄은 가짜 번역 서버 / 가짜 임베딩과 같은 결과, line_error_rate 비율로 실패 줄은 에러 파일로
+- 실행: OPENAI_BASE_URL=http://127.0.0.1:8394/v1 python batch_jobs.py submit
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from fakes.translation_server import FakeTranslationServer
+
+
+class FakeBatchServer(FakeTranslationServer):
+    def __init__(self, process_seconds: float = 2.0, line_error_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            process_seconds: 배치 1개가 끝날 때까지 걸리는 시간 (초)
+            line_error_rate: 요청 줄이 실패하는 비율 (에러 파일로 기록)
+            seed: 난수 시드
+        """
+        super().__init__(seed=seed)
+        self.process_seconds = process_seconds
+        self.line_error_rate = line_error_rate
+        self._line_random = random.Random(seed)
+        self.files: Dict[str, Dict] = {}
+        self.batches: Dict[str, Dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.stats.update({"files": 0, "batches": 0, "batch_lines": 0, "batch_line_errors": 0})
+
+    def make_app(self) -> web.Application:
+        app = super().make_app()
+        app.router.add_post("/v1/files", self.handle_upload)
+        app.router.add_get("/v1/files/{file_id}", self.handle_file)
+        app.router.add_get("/v1/files/{file_id}/content", self.handle_file_content)
+        app.router.add_post("/v1/batches", self.handle_create_batch)
+        app.router.add_get("/v1/batches/{batch_id}", self.handle_batch)
+        app.router.add_post("/v1/batches/{batch_id}/cancel", self.handle_cancel)
+        return app
+
+    # ===== files =====
+    def _store_file(self, content: bytes, filename: str, purpose: str) -> Dict:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        self.files[file_id] = {
+            "meta": {
+                "id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": filename, "purpose": purpose, "status": "processed"
+            },
+            "content": content
+        }
+        self.stats["files"] += 1
+        return self.files[file_id]["meta"]
+
+    async def handle_upload(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        upload = form["file"]
+        return web.json_response(self._store_file(upload.file.read(), upload.filename, form.get("purpose", "batch")))
+
+    def _get_file(self, request: web.Request) -> Dict:
+        file = self.files.get(request.match_info["file_id"])
+        if file is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": {"message": "No such file", "type": "invalid_request_error"}}), content_type="application/json")
+        return file
+
+    async def handle_file(self, request: web.Request) -> web.Response:
+        return web.json_response(self._get_file(request)["meta"])
+
+    async def handle_file_content(self, request: web.Request) -> web.Response:
+        return web.Response(body=self._get_file(request)["content"], content_type="application/jsonl")
+
+    # ===== batches =====
+    async def handle_create_batch(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if body.get("input_file_id") not in self.files:
+            return web.json_response({"error": {"message": "input file not found", "type": "invalid_request_error"}}, status=400)
+
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        self.batches[batch_id] = {
+            "id": batch_id, "object": "batch", "endpoint": body["endpoint"], "errors": None,
+            "input_file_id": body["input_file_id"], "completion_window": body.get("completion_window", "24h"),
+            "status": "validating", "output_file_id": None, "error_file_id": None,
+            "created_at": int(time.time()), "metadata": body.get("metadata"),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0}
+        }
+        self.stats["batches"] += 1
+        self._tasks[batch_id] = asyncio.create_task(self._process(batch_id))
+        return web.json_response(self.batches[batch_id])
+
+    async def handle_batch(self, request: web.Request) -> web.Response:
+        batch = self.batches.get(request.match_info["batch_id"])
+        if batch is None:
+            return web.json_response({"error": {"message": "No such batch", "type": "invalid_request_error"}}, status=404)
+        return web.json_response(batch)
+
+    async def handle_cancel(self, request: web.Request) -> web.Response:
+        batch = self.batches.get(request.match_info["batch_id"])
+        if batch is None:
+            return web.json_response({"error": {"message": "No such batch", "type": "invalid_request_error"}}, status=404)
+        if batch["status"] in ("validating", "in_progress"):
+            batch["status"] = "cancelling"
+            batch["cancelling_at"] = int(time.time())
+        return web.json_response(batch)
+
+    def _answer(self, line: Dict) -> Dict:
+        """요청 줄 1개 → 응답 body (chat / embeddings)"""
+        body = line["body"]
+        if line["url"] == "/v1/embeddings":
+            inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            tokens = sum(self._count_tokens(text) for text in inputs)
+            return {
+                "object": "list", "model": body.get("model"),
+                "data": [{"object": "embedding", "index": i, "embedding": self._embed(text)} for i, text in enumerate(inputs)],
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+            }
+
+        reply = self._reply(body)
+        prompt_tokens = self._count_tokens(json.dumps(body.get("messages", []), ensure_ascii=False))
+        completion_tokens = self._count_tokens(reply["content"])
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion", "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply["content"]}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        }
+
+    async def _process(self, batch_id: str):
+        batch = self.batches[batch_id]
+        lines = [json.loads(l) for l in self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines() if l.strip()]
+        batch["request_counts"]["total"] = len(lines)
+
+        await asyncio.sleep(self.process_seconds * 0.2)
+        if batch["status"] == "cancelling":
+            lines = []
+        else:
+            batch.update({"status": "in_progress", "in_progress_at": int(time.time())})
+
+        outputs, errors = [], []
+        step = max(1, len(lines) // 10)
+        for i, line in enumerate(lines):
+            if batch["status"] == "cancelling":
+                break
+            if i % step == 0:
+                await asyncio.sleep(self.process_seconds * 0.6 / 10)
+
+            result = {"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": line["custom_id"]}
+            self.stats["batch_lines"] += 1
+            if self._line_random.random() < self.line_error_rate:
+                self.stats["batch_line_errors"] += 1
+                batch["request_counts"]["failed"] += 1
+                errors.append({**result, "response": {"status_code": 500, "request_id": uuid.uuid4().hex, "body": {"error": {"message": "fake server error", "type": "server_error"}}}, "error": None})
+                continue
+            batch["request_counts"]["completed"] += 1
+            outputs.append({**result, "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": self._answer(line)}, "error": None})
+
+        cancelled = batch["status"] == "cancelling"
+        batch.update({"status": "finalizing", "finalizing_at": int(time.time())})
+        await asyncio.sleep(self.process_seconds * 0.2)
+
+        def to_file(rows, name):
+            content = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+            return self._store_file(content, name, "batch_output")["id"]
+
+        if outputs:
+            batch["output_file_id"] = to_file(outputs, f"{batch_id}_output.jsonl")
+        if errors:
+            batch["error_file_id"] = to_file(errors, f"{batch_id}_error.jsonl")
+        status = "cancelled" if cancelled else "completed"
+        batch.update({"status": status, f"{status}_at": int(time.time())})
+
+
+async def run_check(port: int):
+    """가짜 서버에 batch_jobs 전체 흐름(작성 → 제출 → 폴링 → 적재 → 재적재 → 재작성)을 실행해 확인"""
+    import tempfile
+    from pathlib import Path
+    from openai import OpenAI
+
+    from batch_jobs import BatchJobRunner, export_embeddings, ingest_file, open_store
+    from fakes.translation_server import TRANSLATION_PREFIX
+
+    fake = FakeBatchServer(process_seconds=1.0, line_error_rate=0.05, seed=3)
+    runner = web.AppRunner(fake.make_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    client = OpenAI(api_key="sk-fake", base_url=f"http://127.0.0.1:{port}/v1", max_retries=0)
+    chunks = [f"Paragraph {i}: Jo sat in the garret writing." for i in range(120)] + ["* * *"] * 3
+
+    def run_sync(tmp: Path):
+        stores = {"translation": str(tmp / "translation.jsonl"), "embedding": str(tmp / "embedding.jsonl")}
+        jobs = BatchJobRunner(client, str(tmp / "jobs"))
+
+        # 1차: 번역 작업 (중복 문단 "* * *" 은 요청 1개로)
+        created = jobs.prepare("translation", chunks, "gpt-4o-mini", stores["translation"])
+        assert sum(job["requests"] for job in created) == 121
+        assert jobs.prepare("translation", chunks, "gpt-4o-mini", stores["translation"]) == []  # 제출 전 재작성 → 중복 없음
+        jobs.submit()
+        jobs.poll(wait=True, interval=0.2)
+        failed = jobs.jobs[0]["ingest"]["failed"]
+        assert jobs.jobs[0]["status"] == "ingested" and failed == fake.stats["batch_line_errors"]
+
+        # 같은 결과 파일 재적재 → 새로 기록되는 것 없음
+        again = ingest_file(jobs.jobs[0]["output_file"], "translation", "gpt-4o-mini", stores["translation"])
+        assert again["written"] == 0
+
+        # 2차: 실패한 줄만 다시 작성 → 제출 → 적재
+        retry = jobs.prepare("translation", chunks, "gpt-4o-mini", stores["translation"])
+        assert sum(job["requests"] for job in retry) == failed
+        fake.line_error_rate = 0.0
+        jobs.submit()
+        jobs.poll(wait=True, interval=0.2)
+        store = open_store("translation", "gpt-4o-mini", stores["translation"])
+        assert [store.get(c) for c in chunks] == [TRANSLATION_PREFIX + c for c in chunks]
+        print(f"✅ 번역: 1차 실패 {failed}개만 재제출, 적재 결과 전체 일치")
+
+        # 임베딩 작업 → DB 적재용 JSON
+        books = [{"book_id": 1, "chunks": [
+            {"chunk_index": i, "chapter_name": "Chapter 1", "content_en": c, "content_ko": TRANSLATION_PREFIX + c}
+            for i, c in enumerate(chunks)
+        ]}]
+        processed = tmp / "chunked.json"
+        processed.write_text(json.dumps(books, ensure_ascii=False), encoding="utf-8")
+        jobs.prepare("embedding", [c["content_ko"] for c in books[0]["chunks"]], "text-embedding-3-small", stores["embedding"])
+        jobs.submit()
+        jobs.poll(wait=True, interval=0.2)
+        report = export_embeddings(str(processed), str(tmp / "with_embeddings.json"), "text-embedding-3-small", stores["embedding"])
+        assert report == {"exported": len(chunks), "missing": 0}
+        vector = open_store("embedding", "text-embedding-3-small", stores["embedding"]).get(books[0]["chunks"][0]["content_ko"])
+        assert max(abs(a - b) for a, b in zip(vector, fake._embed(books[0]["chunks"][0]["content_ko"]))) < 1e-6
+        print(f"✅ 임베딩: {report['exported']}개 내보내기, float32 저장 후 값 일치")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            await asyncio.to_thread(run_sync, Path(tmp))
+    finally:
+        client.close()
+        await runner.cleanup()
+
+    print(f"✅ 서버 통계: {fake.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 OpenAI Batch API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8394)
+    parser.add_argument("--process-seconds", type=float, default=5.0, help="배치 1개 처리 시간")
+    parser.add_argument("--line-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--check", action="store_true", help="서버 실행 후 batch_jobs 흐름 확인")
+    args = parser.parse_args()
+
+    if args.check:
+        asyncio.run(run_check(args.port))
+    else:
+        server = FakeBatchServer(args.process_seconds, args.line_error_rate, args.seed)
+        web.run_app(server.make_app(), host=args.host, port=args.port)
@@ -0,0 +1,367 @@
+# python -m fakes.cassette_server record --cassette cassettes/session.jsonl
+# python -m fakes.cassette_server replay --cassette cassettes/session.jsonl --latency-scale 1.0
+# python -m fakes.cassette_server --check
+"""
+OpenAI / Tavily 호출 녹화(record) / 재생(replay) 프록시
+- /openai/... → OpenAI API, /tavily/... → Tavily API
+  (OPENAI_BASE_URL=http://127.0.0.1:8393/openai/v1, TAVILY_API_BASE_URL=http://127.0.0.1:8393/tavily)
+- ChatOpenAI / OpenAIEmbeddings / OpenAI / AsyncOpenAI / TavilySearch 모두 HTTP 단계에서 한 번에 처리
+- record : 실제 API로 전달하면서 요청 본문 / 응답 / 청크별 도착 시각을 카세트(JSONL)에 추가
+- replay : 네트워크 없이 카세트 응답을 원래 지연(또는 --latency-scale 배율)대로 재생
+- API 키(Authorization 헤더, 본문 api_key)는 저장하지 않음
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+UPSTREAMS = {
+    "openai": "https://api.openai.com",
+    "tavily": "https://api.tavily.com",
+}
+
+# 매칭 키에서 제외할 본문 필드 (비밀값 / 요청마다 바뀌는 값)
+IGNORED_FIELDS = ("api_key", "user", "metadata")
+
+# 응답에서 그대로 돌려줄 헤더
+KEPT_HEADERS = ("content-type", "openai-processing-ms", "x-request-id")
+
+
+class Cassette:
+    """카세트 파일 (JSONL, 상호작용 1건 = 1줄, 추가 전용)"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 카세트 파일 경로
+        """
+        self.path = path
+
+    def load(self) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def append(self, interaction: Dict):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(interaction, ensure_ascii=False) + "\n")
+
+
+def _clean_body(body: Optional[Dict]) -> Optional[Dict]:
+    if not isinstance(body, dict):
+        return body
+    return {k: v for k, v in body.items() if k not in IGNORED_FIELDS}
+
+
+def match_key(service: str, method: str, path: str, body: Optional[Dict], mode: str = "exact") -> str:
+    """
+    요청 매칭 키
+    - exact : 서비스 + 경로 + 본문 전체 (같은 요청 → 같은 응답)
+    - path  : 서비스 + 경로 + 모델 (그래프 / 프롬프트가 바뀌어도 녹화 순서대로 재생)
+    """
+    if mode == "path":
+        model = body.get("model", "") if isinstance(body, dict) else ""
+        return f"{service}:{method}:{path}:{model}"
+
+    canonical = json.dumps(_clean_body(body), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return f"{service}:{method}:{path}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+def _encode_body(data: bytes) -> Dict:
+    try:
+        return {"body": data.decode("utf-8"), "body_encoding": "utf-8"}
+    except UnicodeDecodeError:
+        return {"body": base64.b64encode(data).decode(), "body_encoding": "base64"}
+
+
+def _decode_body(interaction: Dict) -> bytes:
+    if interaction.get("body_encoding") == "base64":
+        return base64.b64decode(interaction["body"])
+    return interaction["body"].encode("utf-8")
+
+
+class CassetteServer:
+    def __init__(
+        self,
+        mode: str,
+        cassette: Cassette,
+        latency_scale: float = 1.0,
+        match: str = "exact",
+        upstreams: Dict[str, str] = None
+    ):
+        """
+        Args:
+            mode: record / replay
+            cassette: 카세트 파일
+            latency_scale: replay 지연 배율 (0이면 즉시, 1이면 원래 속도)
+            match: exact / path (match_key 참고)
+            upstreams: 서비스별 실제 API 주소 (record 시)
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"지원하지 않는 모드: {mode}")
+
+        self.mode = mode
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self.match = match
+        self.upstreams = {**UPSTREAMS, **(upstreams or {})}
+
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0, "upstream_errors": 0}
+        self._tapes: Dict[str, deque] = defaultdict(deque)
+        self._last: Dict[str, Dict] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        if mode == "replay":
+            interactions = cassette.load()
+            for interaction in interactions:
+                key = match_key(interaction["service"], interaction["method"], interaction["path"], interaction.get("request"), match)
+                self._tapes[key].append(interaction)
+            print(f"📼 카세트 로드: {len(interactions)}건 ({cassette.path})")
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/__stats__", self.handle_stats)
+        app.router.add_route("*", "/{service:(openai|tavily)}/{path:.*}", self.handle)
+        app.on_cleanup.append(self._close)
+        return app
+
+    async def _close(self, app):
+        if self._session is not None:
+            await self._session.close()
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        service = request.match_info["service"]
+        path = "/" + request.match_info["path"]
+        raw = await request.read()
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+
+        if self.mode == "record":
+            return await self._record(request, service, path, raw, body)
+        return await self._replay(request, service, path, body)
+
+    # ===== record =====
+    async def _record(self, request: web.Request, service: str, path: str, raw: bytes, body) -> web.StreamResponse:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(auto_decompress=True)
+
+        headers = {
+            k: v for k, v in request.headers.items()
+            if k.lower() not in ("host", "content-length", "accept-encoding", "connection")
+        }
+        url = self.upstreams[service] + path + (f"?{request.query_string}" if request.query_string else "")
+
+        started = time.perf_counter()
+        try:
+            upstream = await self._session.request(request.method, url, data=raw, headers=headers)
+        except aiohttp.ClientError as e:
+            self.stats["upstream_errors"] += 1
+            return web.json_response({"error": {"message": f"upstream error: {e}"}}, status=502)
+
+        ttfb_ms = (time.perf_counter() - started) * 1000
+        kept = {k: v for k, v in upstream.headers.items() if k.lower() in KEPT_HEADERS}
+        response = web.StreamResponse(status=upstream.status, headers=kept)
+        await response.prepare(request)
+
+        # 클라이언트에는 바로 흘려보내고, 청크 크기 / 도착 시각을 같이 기록
+        chunks = bytearray()
+        chunk_sizes, chunk_offsets_ms = [], []
+        async with upstream:
+            async for chunk in upstream.content.iter_any():
+                chunk_offsets_ms.append(round((time.perf_counter() - started) * 1000, 2))
+                chunk_sizes.append(len(chunk))
+                chunks.extend(chunk)
+                await response.write(chunk)
+        await response.write_eof()
+
+        self.cassette.append({
+            "service": service,
+            "method": request.method,
+            "path": path,
+            "request": _clean_body(body),
+            "status": upstream.status,
+            "headers": kept,
+            **_encode_body(bytes(chunks)),
+            "chunk_sizes": chunk_sizes,
+            "chunk_offsets_ms": chunk_offsets_ms,
+            "ttfb_ms": round(ttfb_ms, 2),
+            "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        self.stats["recorded"] += 1
+        return response
+
+    # ===== replay =====
+    def _next(self, key: str) -> Optional[Dict]:
+        """녹화 순서대로 꺼내고, 다 쓰면 마지막 응답 반복"""
+        tape = self._tapes.get(key)
+        if tape:
+            self._last[key] = tape.popleft()
+        return self._last.get(key)
+
+    async def _replay(self, request: web.Request, service: str, path: str, body) -> web.StreamResponse:
+        interaction = self._next(match_key(service, request.method, path, body, self.match))
+        if interaction is None:
+            self.stats["misses"] += 1
+            print(f"📼 카세트에 없는 요청: {service} {request.method} {path}")
+            return web.json_response(
+                {"error": {"message": f"cassette miss: {service} {request.method} {path}", "type": "cassette_miss"}},
+                status=404
+            )
+
+        started = time.perf_counter()
+
+        async def wait_until(offset_ms: float):
+            delay = offset_ms * self.latency_scale / 1000 - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        await wait_until(interaction.get("ttfb_ms", 0))
+        response = web.StreamResponse(status=interaction["status"], headers=interaction.get("headers", {}))
+        await response.prepare(request)
+
+        data = _decode_body(interaction)
+        sizes = interaction.get("chunk_sizes") or [len(data)]
+        offsets = interaction.get("chunk_offsets_ms") or [interaction.get("total_ms", 0)]
+        position = 0
+        for size, offset_ms in zip(sizes, offsets):
+            await wait_until(offset_ms)
+            await response.write(data[position:position + size])
+            position += size
+        if position < len(data):
+            await response.write(data[position:])
+        await response.write_eof()
+
+        self.stats["replayed"] += 1
+        return response
+
+
+async def run_check(port: int):
+    """가짜 OpenAI / Tavily를 실제 API 대신 두고 녹화 → 상류 종료 → 재생 결과가 같은지 확인"""
+    from openai import AsyncOpenAI, OpenAI
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+    from langchain_tavily import TavilySearch
+    from fakes.latency import LatencyModel
+    from fakes.openai_server import FakeOpenAIServer
+    from fakes.tavily_server import FakeTavilyServer
+
+    async def start(app: web.Application, app_port: int) -> web.AppRunner:
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", app_port).start()
+        return runner
+
+    base = f"http://127.0.0.1:{port}"
+
+    async def session(label: str) -> Dict:
+        """네 가지 클라이언트로 같은 호출을 보내고 결과 / 소요 시간 반환"""
+        chat = ChatOpenAI(model="gpt-4o-mini", api_key="sk-check", base_url=f"{base}/openai/v1", max_retries=0)
+        embeddings = OpenAIEmbeddings(
+            model="text-embedding-3-small", api_key="sk-check", base_url=f"{base}/openai/v1",
+            check_embedding_ctx_length=False, max_retries=0
+        )
+        sync_client = OpenAI(api_key="sk-check", base_url=f"{base}/openai/v1", max_retries=0)
+        async_client = AsyncOpenAI(api_key="sk-check", base_url=f"{base}/openai/v1", max_retries=0)
+        tavily = TavilySearch(tavily_api_key="tvly-check", api_base_url=f"{base}/tavily", max_results=2)
+
+        started = time.perf_counter()
+        result = {
+            "chat": (await chat.ainvoke("사이클론이 뭐야?")).content,
+            "chat_stream": "".join([chunk.content async for chunk in chat.astream("도로시는 누구야?")]),
+            "embedding": (await embeddings.aembed_query("도로시"))[:4],
+            "openai_sync": (await asyncio.to_thread(
+                sync_client.chat.completions.create,
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "키워드 추출"}]
+            )).choices[0].message.content,
+            "openai_async_json": (await async_client.chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "JSON"}], response_format={"type": "json_object"}
+            )).choices[0].message.content,
+            "tavily": [r["title"] for r in (await tavily.ainvoke({"query": "오즈의 마법사 저자"}))["results"]],
+        }
+        elapsed = time.perf_counter() - started
+        await async_client.close()
+        sync_client.close()
+        print(f"{label}: {elapsed * 1000:.0f}ms")
+        return {"result": result, "elapsed": elapsed}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cassette = Cassette(os.path.join(tmp, "check.jsonl"))
+        fake_openai = FakeOpenAIServer(chat_latency=LatencyModel("fixed", 80), embedding_latency=LatencyModel("fixed", 30), token_delay=0.005)
+        fake_tavily = FakeTavilyServer(LatencyModel("fixed", 100))
+
+        upstream_openai = await start(fake_openai.make_app(), port + 1)
+        upstream_tavily = await start(fake_tavily.make_app(), port + 2)
+        recorder = CassetteServer("record", cassette, upstreams={
+            "openai": f"http://127.0.0.1:{port + 1}",
+            "tavily": f"http://127.0.0.1:{port + 2}",
+        })
+        runner = await start(recorder.make_app(), port)
+        recorded = await session("record")
+        await runner.cleanup()
+        await upstream_openai.cleanup()
+        await upstream_tavily.cleanup()
+        print(f"녹화: {recorder.stats}, 카세트 {len(cassette.load())}건")
+
+        # 상류 서버 없이 재생
+        for scale in (1.0, 0.0):
+            player = CassetteServer("replay", cassette, latency_scale=scale)
+            runner = await start(player.make_app(), port)
+            replayed = await session(f"replay x{scale}")
+            await runner.cleanup()
+
+            assert replayed["result"] == recorded["result"], "재생 결과가 녹화와 다릅니다"
+            assert player.stats["misses"] == 0
+            if scale == 1.0:
+                assert replayed["elapsed"] >= recorded["elapsed"] * 0.7
+            else:
+                assert replayed["elapsed"] < recorded["elapsed"] * 0.5
+
+    print("✅ 녹화 / 재생 결과 일치 (지연 배율 1.0 / 0.0)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI / Tavily 호출 녹화 / 재생 프록시")
+    parser.add_argument("mode", nargs="?", choices=["record", "replay"])
+    parser.add_argument("--cassette", default="cassettes/session.jsonl")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8393)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="replay 지연 배율 (0=즉시)")
+    parser.add_argument("--match", choices=["exact", "path"], default="exact", help="replay 요청 매칭 방식")
+    parser.add_argument("--openai-upstream", default=UPSTREAMS["openai"])
+    parser.add_argument("--tavily-upstream", default=UPSTREAMS["tavily"])
+    parser.add_argument("--check", action="store_true", help="가짜 상류 서버로 녹화 → 재생 확인")
+    args = parser.parse_args()
+
+    if args.check:
+        asyncio.run(run_check(args.port))
+    elif args.mode is None:
+        parser.error("record / replay 중 하나를 지정하세요")
+    else:
+        server = CassetteServer(
+            args.mode,
+            Cassette(args.cassette),
+            latency_scale=args.latency_scale,
+            match=args.match,
+            upstreams={"openai": args.openai_upstream, "tavily": args.tavily_upstream}
+        )
+        print(f"📼 {args.mode} 모드: OPENAI_BASE_URL=http://{args.host}:{args.port}/openai/v1 "
+              f"TAVILY_API_BASE_URL=http://{args.host}:{args.port}/tavily")
+        web.run_app(server.make_app(), host=args.host, port=args.port)
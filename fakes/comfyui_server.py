@@ -0,0 +1,207 @@
+# python -m fakes.comfyui_server --port 8288
+# python -m fakes.comfyui_server --check
+"""
+가짜 ComfyUI 서버
+- POST /prompt, GET /history/{prompt_id}, GET /view, GET /ws?clientId=
+- 스텝 진행(progress) / 완료(executing node=None) 메시지를 웹소켓으로 전송
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import tracemalloc
+import uuid
+from typing import Dict
+
+from aiohttp import web
+from PIL import Image
+
+
+class FakeComfyUIServer:
+    def __init__(self, steps: int = 20, step_delay: float = 0.05, enable_ws: bool = True, error_rate: float = 0.0):
+        """
+        Args:
+            steps: 가짜 샘플링 스텝 수
+            step_delay: 스텝당 지연 (초)
+            enable_ws: False면 /ws 미지원 (폴링 폴백 확인용)
+            error_rate: execution_error로 끝나는 생성 비율 (0~1)
+        """
+        self.steps = steps
+        self.step_delay = step_delay
+        self.enable_ws = enable_ws
+        self.error_rate = error_rate
+        
+        self.history: Dict[str, Dict] = {}
+        self.sockets: Dict[str, web.WebSocketResponse] = {}
+        self.images: Dict[str, bytes] = {}
+        self._prepared: Dict[tuple, list] = {}
+        self.stats = {"prompt": 0, "history": 0, "view": 0, "ws": 0, "errors": 0}
+    
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/prompt", self.handle_prompt)
+        app.router.add_get("/history/{prompt_id}", self.handle_history)
+        app.router.add_get("/view", self.handle_view)
+        app.router.add_get("/__stats__", self.handle_stats)
+        if self.enable_ws:
+            app.router.add_get("/ws", self.handle_ws)
+        return app
+    
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        
+        client_id = request.query.get("clientId", "")
+        self.sockets[client_id] = ws
+        self.stats["ws"] += 1
+        await ws.send_json({"type": "status", "data": {"sid": client_id}})
+        
+        async for _ in ws:
+            pass
+        
+        if self.sockets.get(client_id) is ws:
+            del self.sockets[client_id]
+        return ws
+    
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+    
+    async def handle_prompt(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        prompt_id = str(uuid.uuid4())
+        self.stats["prompt"] += 1
+        
+        asyncio.create_task(self._run(prompt_id, payload.get("client_id", ""), payload["prompt"]))
+        return web.json_response({"prompt_id": prompt_id, "number": self.stats["prompt"]})
+    
+    async def handle_history(self, request: web.Request) -> web.Response:
+        prompt_id = request.match_info["prompt_id"]
+        self.stats["history"] += 1
+        
+        if prompt_id not in self.history:
+            return web.json_response({})
+        return web.json_response({prompt_id: self.history[prompt_id]})
+    
+    async def handle_view(self, request: web.Request) -> web.Response:
+        filename = request.query.get("filename", "")
+        self.stats["view"] += 1
+        
+        if filename not in self.images:
+            raise web.HTTPNotFound()
+        return web.Response(body=self.images[filename], content_type="image/png")
+    
+    @staticmethod
+    def _render_png(width: int, height: int) -> bytes:
+        """노이즈 이미지 → 실제 생성 이미지와 비슷한 크기의 PNG (1024x1024 ≈ 3MB)"""
+        buffer = io.BytesIO()
+        noise = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+        noise.save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+    
+    async def prepare_image(self, width: int, height: int):
+        """다음 생성에 쓸 이미지를 미리 렌더링 (측정 시 서버 쪽 할당 제외용)"""
+        png = await asyncio.to_thread(self._render_png, width, height)
+        self._prepared.setdefault((width, height), []).append(png)
+    
+    async def _send(self, client_id: str, message: Dict):
+        ws = self.sockets.get(client_id)
+        if ws is not None and not ws.closed:
+            await ws.send_str(json.dumps(message))
+    
+    async def _run(self, prompt_id: str, client_id: str, workflow: Dict):
+        """샘플링 흉내: 스텝 진행 → 이미지 저장 → 완료 알림"""
+        width, height = 64, 64
+        for node in workflow.values():
+            if node.get("class_type") == "EmptyLatentImage":
+                width = node["inputs"]["width"]
+                height = node["inputs"]["height"]
+        
+        await self._send(client_id, {"type": "execution_start", "data": {"prompt_id": prompt_id}})
+        
+        for step in range(1, self.steps + 1):
+            await asyncio.sleep(self.step_delay)
+            await self._send(client_id, {
+                "type": "progress",
+                "data": {"value": step, "max": self.steps, "prompt_id": prompt_id, "node": "3"}
+            })
+        
+        if self.error_rate and random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            self.history[prompt_id] = {
+                "prompt": [0, prompt_id, workflow, {}, ["7"]],
+                "outputs": {},
+                "status": {"status_str": "error", "completed": False}
+            }
+            await self._send(client_id, {"type": "execution_error", "data": {"prompt_id": prompt_id, "exception_message": "fake error"}})
+            return
+        
+        filename = f"ComfyUI_{prompt_id[:8]}.png"
+        if self._prepared.get((width, height)):
+            self.images[filename] = self._prepared[(width, height)].pop()
+        else:
+            self.images[filename] = await asyncio.to_thread(self._render_png, width, height)
+        
+        self.history[prompt_id] = {
+            "prompt": [0, prompt_id, workflow, {}, ["7"]],
+            "outputs": {"7": {"images": [{"filename": filename, "subfolder": "", "type": "output"}]}},
+            "status": {"status_str": "success", "completed": True}
+        }
+        
+        await self._send(client_id, {"type": "executing", "data": {"node": None, "prompt_id": prompt_id}})
+
+
+async def run_check(fake: FakeComfyUIServer, concurrency: int, port: int, size: int = 1024):
+    """가짜 서버를 띄우고 AsyncComfyUIClient로 동시 생성 확인"""
+    from comfyui_client import AsyncComfyUIClient
+    
+    runner = web.AppRunner(fake.make_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    
+    client = AsyncComfyUIClient(server_address=f"127.0.0.1:{port}")
+    prompt_data = {"positive": "a girl in a blue dress", "style_params": {"width": size, "height": size}}
+    
+    try:
+        # 가짜 이미지를 미리 만들어 두고, 클라이언트 쪽(다운로드/저장) 메모리만 측정
+        await asyncio.gather(*[fake.prepare_image(size, size) for _ in range(concurrency)])
+        tracemalloc.start()
+        
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(*[client.generate_image(prompt_data) for _ in range(concurrency)])
+        elapsed = loop.time() - start
+        
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        await client.close()
+        await runner.cleanup()
+    
+    expected = fake.steps * fake.step_delay
+    print(f"\n결과: {len(results)}개 생성, {elapsed:.2f}s (스텝 합계 {expected:.2f}s)")
+    print(f"이미지 크기: {os.path.getsize(results[0]['image_path']) / 1024:.0f}KB")
+    print(f"피크 메모리: 전체 {peak / 1024 / 1024:.2f}MB, 생성당 {peak / concurrency / 1024 / 1024:.2f}MB")
+    print(f"서버 호출 통계: {fake.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 ComfyUI 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8288)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--step-delay", type=float, default=0.05)
+    parser.add_argument("--no-ws", action="store_true", help="/ws 비활성화 (폴링 폴백 확인)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--check", action="store_true", help="서버 실행 후 클라이언트 동작 확인")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--size", type=int, default=1024, help="--check 시 이미지 크기 (px)")
+    args = parser.parse_args()
+    
+    server = FakeComfyUIServer(args.steps, args.step_delay, not args.no_ws, args.error_rate)
+    
+    if args.check:
+        asyncio.run(run_check(server, args.concurrency, args.port, args.size))
+    else:
+        web.run_app(server.make_app(), host=args.host, port=args.port)
@@ -0,0 +1,65 @@
+"""
+가짜 서버용 지연 시간 / 오류율 모델
+- "fixed:50"          : 항상 50ms
+- "uniform:50:150"    : 50~150ms 균등 분포
+- "lognormal:200:0.5" : 중앙값 200ms, sigma 0.5 로그정규 분포 (LLM 응답 시간과 비슷한 꼬리)
+"""
+import asyncio
+import math
+import random
+from typing import Optional
+
+
+class LatencyModel:
+    KINDS = ("fixed", "uniform", "lognormal")
+    
+    def __init__(
+        self,
+        kind: str = "fixed",
+        a: float = 0.0,
+        b: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            kind: fixed / uniform / lognormal
+            a: fixed=지연(ms), uniform=최소(ms), lognormal=중앙값(ms)
+            b: uniform=최대(ms), lognormal=sigma
+            error_rate: 오류 응답 비율 (0~1)
+            seed: 난수 시드 (재현용)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"지원하지 않는 지연 분포: {kind} ({', '.join(self.KINDS)})")
+        
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+    
+    @classmethod
+    def parse(cls, spec: str, error_rate: float = 0.0, seed: Optional[int] = None) -> "LatencyModel":
+        """"lognormal:200:0.5" 형식 문자열 → LatencyModel"""
+        parts = spec.split(":")
+        values = [float(v) for v in parts[1:]] + [0.0, 0.0]
+        return cls(parts[0], values[0], values[1], error_rate, seed)
+    
+    def describe(self) -> dict:
+        return {"kind": self.kind, "a": self.a, "b": self.b, "error_rate": self.error_rate}
+    
+    def sample(self) -> float:
+        """지연 시간 1개 샘플 (초)"""
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = self._random.uniform(self.a, self.b)
+        else:
+            ms = self.a * math.exp(self._random.gauss(0.0, self.b))
+        return max(ms, 0.0) / 1000
+    
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+    
+    async def wait(self):
+        await asyncio.sleep(self.sample())
@@ -0,0 +1,270 @@
+# python -m fakes.openai_server --port 8390 --latency lognormal:300:0.5 --error-rate 0.01
+# python -m fakes.openai_server --check
+"""
+가짜 OpenAI 호환 서버
+- POST /v1/chat/completions (stream 포함, tools 요청 시 1회 tool call 후 답변)
+- POST /v1/embeddings (텍스트 해시 기반 결정적 벡터, float / base64)
+- GET /__stats__
+- 앱 쪽은 OPENAI_BASE_URL=http://127.0.0.1:8390/v1 로 연결
+"""
+import argparse
+import array
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import time
+import uuid
+from typing import Dict, List
+
+from aiohttp import web
+
+from fakes.latency import LatencyModel
+
+
+class FakeOpenAIServer:
+    def __init__(
+        self,
+        chat_latency: LatencyModel = None,
+        embedding_latency: LatencyModel = None,
+        reply_tokens: int = 120,
+        embedding_dim: int = 1536,
+        token_delay: float = 0.0
+    ):
+        """
+        Args:
+            chat_latency: chat 응답 지연 (stream이면 첫 토큰까지)
+            embedding_latency: 임베딩 응답 지연
+            reply_tokens: 일반 답변 길이 (대략적인 토큰 수)
+            embedding_dim: 임베딩 차원 (text-embedding-3-small = 1536)
+            token_delay: stream 청크 간 지연 (초)
+        """
+        self.chat_latency = chat_latency or LatencyModel()
+        self.embedding_latency = embedding_latency or LatencyModel()
+        self.reply_tokens = reply_tokens
+        self.embedding_dim = embedding_dim
+        self.token_delay = token_delay
+        self.stats = {"chat": 0, "stream": 0, "tool_calls": 0, "embeddings": 0, "embedded_inputs": 0, "errors": 0}
+    
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=32 * 1024 * 1024)
+        app.router.add_post("/v1/chat/completions", self.handle_chat)
+        app.router.add_post("/v1/embeddings", self.handle_embeddings)
+        app.router.add_get("/__stats__", self.handle_stats)
+        return app
+    
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+    
+    def _error(self) -> web.Response:
+        self.stats["errors"] += 1
+        return web.json_response(
+            {"error": {"message": "fake server error", "type": "server_error", "code": None}},
+            status=500
+        )
+    
+    @staticmethod
+    def _count_tokens(text: str) -> int:
+        return max(1, len(text) // 4)
+    
+    def _reply(self, body: Dict) -> Dict:
+        """요청 내용에 맞는 가짜 응답 (content 또는 tool_calls)"""
+        messages = body.get("messages", [])
+        tools = body.get("tools") or []
+        
+        # 에이전트 요청: 아직 도구 결과가 없으면 첫 번째 도구를 1회 호출
+        if tools and not any(m.get("role") == "tool" for m in messages):
+            user_text = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "")
+            if not isinstance(user_text, str):
+                user_text = json.dumps(user_text, ensure_ascii=False)
+            self.stats["tool_calls"] += 1
+            return {"tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "type": "function",
+                "function": {
+                    "name": tools[0]["function"]["name"],
+                    "arguments": json.dumps({"query": user_text[:200]}, ensure_ascii=False)
+                }
+            }]}
+        
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            return {"content": "{}"}
+        
+        return {"content": ("가짜 응답입니다. " * self.reply_tokens)[: self.reply_tokens * 4].strip()}
+    
+    async def handle_chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.stats["chat"] += 1
+        
+        await self.chat_latency.wait()
+        if self.chat_latency.should_fail():
+            return self._error()
+        
+        reply = self._reply(body)
+        prompt_text = json.dumps(body.get("messages", []), ensure_ascii=False)
+        completion_tokens = self._count_tokens(reply.get("content") or json.dumps(reply.get("tool_calls")))
+        usage = {
+            "prompt_tokens": self._count_tokens(prompt_text),
+            "completion_tokens": completion_tokens,
+            "total_tokens": self._count_tokens(prompt_text) + completion_tokens
+        }
+        finish_reason = "tool_calls" if "tool_calls" in reply else "stop"
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o")
+        }
+        
+        if not body.get("stream"):
+            return web.json_response({
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply.get("content"), **({"tool_calls": reply["tool_calls"]} if "tool_calls" in reply else {})},
+                    "finish_reason": finish_reason
+                }],
+                "usage": usage
+            })
+        
+        self.stats["stream"] += 1
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        
+        async def send(delta: Dict, finish=None):
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+        
+        await send({"role": "assistant", "content": ""})
+        if "tool_calls" in reply:
+            await send({"tool_calls": [{"index": 0, **reply["tool_calls"][0]}]})
+        else:
+            content = reply["content"]
+            for i in range(0, len(content), 16):
+                if self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                await send({"content": content[i:i + 16]})
+        await send({}, finish_reason)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+    
+    def _embed(self, item) -> List[float]:
+        """입력(텍스트 또는 토큰 배열) 해시 → 정규화된 결정적 벡터"""
+        raw = item if isinstance(item, str) else json.dumps(item)
+        seed = hashlib.sha256(raw.encode("utf-8")).digest()
+        
+        values = []
+        counter = 0
+        while len(values) < self.embedding_dim:
+            block = hashlib.sha256(seed + counter.to_bytes(4, "little")).digest()
+            values.extend(b / 127.5 - 1.0 for b in block)
+            counter += 1
+        values = values[: self.embedding_dim]
+        
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+    
+    async def handle_embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.stats["embeddings"] += 1
+        
+        await self.embedding_latency.wait()
+        if self.embedding_latency.should_fail():
+            return self._error()
+        
+        inputs = body.get("input", [])
+        # 단일 문자열 / 단일 토큰 배열 → 리스트로
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        self.stats["embedded_inputs"] += len(inputs)
+        
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for index, item in enumerate(inputs):
+            vector = self._embed(item)
+            if as_base64:
+                vector = base64.b64encode(array.array("f", vector).tobytes()).decode()
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        
+        tokens = sum(len(i) if isinstance(i, list) else self._count_tokens(i) for i in inputs)
+        return web.json_response({
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+
+async def run_check(fake: FakeOpenAIServer, port: int):
+    """가짜 서버를 띄우고 openai SDK로 chat / stream / tool call / embeddings 확인"""
+    from openai import AsyncOpenAI
+    
+    runner = web.AppRunner(fake.make_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    
+    client = AsyncOpenAI(api_key="sk-fake", base_url=f"http://127.0.0.1:{port}/v1", max_retries=0)
+    try:
+        chat = await client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "사이클론이 뭐야?"}]
+        )
+        print(f"chat: {chat.choices[0].message.content[:30]}... usage={chat.usage.total_tokens}")
+        
+        as_json = await client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "JSON"}],
+            response_format={"type": "json_object"}
+        )
+        assert json.loads(as_json.choices[0].message.content) == {}
+        
+        stream = await client.chat.completions.create(
+            model="gpt-4o", messages=[{"role": "user", "content": "hi"}], stream=True
+        )
+        text = "".join([chunk.choices[0].delta.content or "" async for chunk in stream])
+        assert text == chat.choices[0].message.content
+        
+        tool = await client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "오즈의 마법사 저자"}],
+            tools=[{"type": "function", "function": {"name": "tavily_search", "parameters": {"type": "object"}}}]
+        )
+        call = tool.choices[0].message.tool_calls[0]
+        print(f"tool call: {call.function.name}({call.function.arguments})")
+        
+        embeddings = await client.embeddings.create(model="text-embedding-3-small", input=["도로시", "토토"])
+        again = await client.embeddings.create(model="text-embedding-3-small", input="도로시", encoding_format="float")
+        assert len(embeddings.data[0].embedding) == fake.embedding_dim
+        assert max(abs(a - b) for a, b in zip(embeddings.data[0].embedding, again.data[0].embedding)) < 1e-6
+        print(f"embeddings: {len(embeddings.data)}개, dim={len(embeddings.data[0].embedding)} (base64/float 동일)")
+    finally:
+        await client.close()
+        await runner.cleanup()
+    
+    print(f"✅ 서버 호출 통계: {fake.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 OpenAI 호환 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8390)
+    parser.add_argument("--latency", default="lognormal:300:0.5", help="chat 지연 분포 (fixed:ms / uniform:min:max / lognormal:median:sigma)")
+    parser.add_argument("--embedding-latency", default="lognormal:40:0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reply-tokens", type=int, default=120)
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--check", action="store_true", help="서버 실행 후 openai SDK로 동작 확인")
+    args = parser.parse_args()
+    
+    server = FakeOpenAIServer(
+        chat_latency=LatencyModel.parse(args.latency, args.error_rate, args.seed),
+        embedding_latency=LatencyModel.parse(args.embedding_latency, args.error_rate, args.seed),
+        reply_tokens=args.reply_tokens,
+        embedding_dim=args.embedding_dim
+    )
+    
+    if args.check:
+        server.chat_latency = server.embedding_latency = LatencyModel("fixed", 5)
+        asyncio.run(run_check(server, args.port))
+    else:
+        web.run_app(server.make_app(), host=args.host, port=args.port)
@@ -0,0 +1,207 @@
+# python -m fakes.redis_server --port 6380
+# python -m fakes.redis_server --check
+"""
+가짜 Redis 서버 (RESP2)
+- PING, GET, SET (EX/PX), DEL, EXISTS, EXPIRE, TTL, SELECT, AUTH, FLUSHDB
+- 실제 Redis 없이 RedisCacheBackend / 워커 간 캐시 공유 확인용
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class FakeRedisServer:
+    def __init__(self, password: Optional[str] = None):
+        """
+        Args:
+            password: 설정하면 AUTH 전 명령 거부
+        """
+        self.password = password
+        self.dbs: Dict[int, Dict[bytes, Tuple[bytes, Optional[float]]]] = {}
+        self.stats = {"connections": 0, "commands": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 6380):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+    
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+    
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # 인라인 명령 (redis-cli 없이 nc로 확인할 때)
+            return line.strip().split()
+        
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+    
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        return b"$" + str(len(value)).encode() + b"\r\n" + value + b"\r\n"
+    
+    def _lookup(self, db: int, key: bytes) -> Optional[bytes]:
+        item = self.dbs.setdefault(db, {}).get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self.dbs[db][key]
+            return None
+        return value
+    
+    def _execute(self, state: Dict, args: List[bytes]) -> bytes:
+        name = args[0].upper().decode()
+        db = self.dbs.setdefault(state["db"], {})
+        
+        if name == "AUTH":
+            if self.password is None or args[-1].decode() != self.password:
+                return b"-ERR invalid password\r\n"
+            state["authed"] = True
+            return b"+OK\r\n"
+        if not state["authed"]:
+            return b"-NOAUTH Authentication required.\r\n"
+        
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name == "SELECT":
+            state["db"] = int(args[1])
+            return b"+OK\r\n"
+        if name == "GET":
+            return self._bulk(self._lookup(state["db"], args[1]))
+        if name == "SET":
+            expires_at = None
+            options = [a.upper() for a in args[3:]]
+            if b"EX" in options:
+                expires_at = time.time() + int(args[3 + options.index(b"EX") + 1])
+            elif b"PX" in options:
+                expires_at = time.time() + int(args[3 + options.index(b"PX") + 1]) / 1000
+            db[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if name in ("DEL", "EXISTS"):
+            count = 0
+            for key in args[1:]:
+                if self._lookup(state["db"], key) is not None:
+                    count += 1
+                    if name == "DEL":
+                        del db[key]
+            return f":{count}\r\n".encode()
+        if name == "EXPIRE":
+            value = self._lookup(state["db"], args[1])
+            if value is None:
+                return b":0\r\n"
+            db[args[1]] = (value, time.time() + int(args[2]))
+            return b":1\r\n"
+        if name == "TTL":
+            if self._lookup(state["db"], args[1]) is None:
+                return b":-2\r\n"
+            expires_at = db[args[1]][1]
+            return f":{-1 if expires_at is None else int(expires_at - time.time())}\r\n".encode()
+        if name == "FLUSHDB":
+            db.clear()
+            return b"+OK\r\n"
+        return f"-ERR unknown command '{name}'\r\n".encode()
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        state = {"db": 0, "authed": self.password is None}
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                self.stats["commands"] += 1
+                writer.write(self._execute(state, args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _check_backend(name: str, backend, other=None):
+    """get/set/delete/TTL 확인 (other: 같은 저장소를 보는 두 번째 인스턴스 = 다른 워커)"""
+    reader = other or backend
+    
+    await backend.set("check:answer", {"answer": "도로시는 캔자스로 돌아간다", "k": 5})
+    assert await reader.get("check:answer") == {"answer": "도로시는 캔자스로 돌아간다", "k": 5}
+    
+    await backend.set("check:ttl", [0.1, 0.2], ttl=1)
+    assert await reader.get("check:ttl") == [0.1, 0.2]
+    await asyncio.sleep(1.1)
+    assert await reader.get("check:ttl") is None
+    
+    await backend.delete("check:answer")
+    assert await reader.get("check:answer") is None
+    
+    # 동시 요청
+    await asyncio.gather(*[backend.set(f"check:{i}", i) for i in range(50)])
+    values = await asyncio.gather(*[reader.get(f"check:{i}") for i in range(50)])
+    assert values == list(range(50))
+    
+    print(f"✅ {name}: get/set/ttl/delete/동시 요청 OK" + (" (인스턴스 간 공유)" if other else ""))
+
+
+async def run_check(fake: FakeRedisServer, port: int):
+    """가짜 Redis를 띄우고 세 가지 캐시 백엔드 동작 확인"""
+    from backend.app.core.cache import InProcessCacheBackend, SQLiteCacheBackend, RedisCacheBackend
+    
+    await fake.start(port=port)
+    auth = f":{fake.password}@" if fake.password else ""
+    
+    try:
+        await _check_backend("memory", InProcessCacheBackend())
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite3")
+            first, second = SQLiteCacheBackend(path), SQLiteCacheBackend(path)
+            await _check_backend("sqlite", first, second)
+            await first.close()
+            await second.close()
+        
+        first = RedisCacheBackend(f"redis://{auth}127.0.0.1:{port}/1", pool_size=4)
+        second = RedisCacheBackend(f"redis://{auth}127.0.0.1:{port}/1", pool_size=4)
+        await _check_backend("redis", first, second)
+        await first.close()
+        await second.close()
+    finally:
+        await fake.stop()
+    
+    print(f"서버 통계: {fake.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 Redis 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--check", action="store_true", help="서버 실행 후 캐시 백엔드 동작 확인")
+    args = parser.parse_args()
+    
+    server = FakeRedisServer(args.password)
+    
+    if args.check:
+        asyncio.run(run_check(server, args.port))
+    else:
+        async def serve():
+            srv = await server.start(args.host, args.port)
+            print(f"가짜 Redis 서버 실행: {args.host}:{args.port}")
+            async with srv:
+                await srv.serve_forever()
+        asyncio.run(serve())
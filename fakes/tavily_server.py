@@ -0,0 +1,101 @@
+# python -m fakes.tavily_server --port 8391 --latency lognormal:800:0.4
+# python -m fakes.tavily_server --check
+"""
+가짜 Tavily 검색 서버
+- POST /search, GET /__stats__
+- 앱 쪽은 TAVILY_API_BASE_URL=http://127.0.0.1:8391 로 연결
+"""
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+from fakes.latency import LatencyModel
+
+
+class FakeTavilyServer:
+    def __init__(self, latency: LatencyModel = None, results: int = 5):
+        """
+        Args:
+            latency: 검색 응답 지연
+            results: 기본 검색 결과 개수 (요청의 max_results가 우선)
+        """
+        self.latency = latency or LatencyModel()
+        self.results = results
+        self.stats = {"search": 0, "errors": 0}
+    
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/search", self.handle_search)
+        app.router.add_get("/__stats__", self.handle_stats)
+        return app
+    
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+    
+    async def handle_search(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.stats["search"] += 1
+        started = time.perf_counter()
+        
+        await self.latency.wait()
+        if self.latency.should_fail():
+            self.stats["errors"] += 1
+            return web.json_response({"detail": {"error": "fake server error"}}, status=500)
+        
+        query = body.get("query", "")
+        count = body.get("max_results") or self.results
+        return web.json_response({
+            "query": query,
+            "answer": None,
+            "images": [],
+            "results": [
+                {
+                    "title": f"검색 결과 {i + 1}: {query[:40]}",
+                    "url": f"https://example.com/search/{i + 1}",
+                    "content": f"'{query[:80]}'에 대한 가짜 검색 본문입니다. " * 4,
+                    "score": round(0.9 - i * 0.1, 2),
+                    "raw_content": None
+                }
+                for i in range(count)
+            ],
+            "response_time": round(time.perf_counter() - started, 3)
+        })
+
+
+async def run_check(fake: FakeTavilyServer, port: int):
+    """가짜 서버를 띄우고 langchain_tavily.TavilySearch로 검색 확인"""
+    from langchain_tavily import TavilySearch
+    
+    runner = web.AppRunner(fake.make_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    
+    try:
+        tool = TavilySearch(tavily_api_key="tvly-fake", api_base_url=f"http://127.0.0.1:{port}", max_results=3)
+        result = await tool.ainvoke({"query": "오즈의 마법사 사이클론"})
+        print(f"검색 결과 {len(result['results'])}개: {result['results'][0]['title']}")
+    finally:
+        await runner.cleanup()
+    
+    print(f"✅ 서버 호출 통계: {fake.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 Tavily 검색 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8391)
+    parser.add_argument("--latency", default="lognormal:800:0.4", help="fixed:ms / uniform:min:max / lognormal:median:sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--check", action="store_true", help="서버 실행 후 TavilySearch로 동작 확인")
+    args = parser.parse_args()
+    
+    server = FakeTavilyServer(LatencyModel.parse(args.latency, args.error_rate, args.seed))
+    
+    if args.check:
+        server.latency = LatencyModel("fixed", 5)
+        asyncio.run(run_check(server, args.port))
+    else:
+        web.run_app(server.make_app(), host=args.host, port=args.port)
@@ -0,0 +1,187 @@
+# python -m fakes.translation_server --port 8391 --rpm 600 --error-rate 0.02
+# python -m fakes.translation_server --check
+"""
+가짜 번역 서버 (OpenAI 호환, data_translate.py 파이프라인 테스트용)
+- 문단 1개 요청 → "[KO] " + 원문
+- 묶음 요청 ({"paragraphs": [...]}, json_object) → {"translations": [...]}
+- 분당 요청 수 한도 초과 시 429 + Retry-After, 오류율 / 묶음 개수 불일치 비율 지정 가능
+- 실행: python data_translate.py --base-url http://127.0.0.1:8391/v1
+- --check: 순서 / 누락, 재시도, 처리량, 체크포인트 재개 / 수정 문단만 재번역 확인
+"""
+import argparse
+import asyncio
+import collections
+import json
+import random
+import time
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from fakes.latency import LatencyModel
+from fakes.openai_server import FakeOpenAIServer
+
+TRANSLATION_PREFIX = "[KO] "
+
+
+class FakeTranslationServer(FakeOpenAIServer):
+    def __init__(
+        self,
+        latency: LatencyModel = None,
+        rpm: Optional[int] = None,
+        mismatch_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            latency: 번역 응답 지연 / 오류율
+            rpm: 분당 요청 수 한도 (None이면 제한 없음, 초과 시 429)
+            mismatch_rate: 묶음 요청에서 번역 1개를 빠뜨리는 비율 (클라이언트 검증 확인용)
+            seed: 난수 시드
+        """
+        super().__init__(chat_latency=latency)
+        self.rpm = rpm
+        self.mismatch_rate = mismatch_rate
+        self._random = random.Random(seed)
+        self._window = collections.deque()
+        self.stats.update({"rate_limited": 0, "batched_paragraphs": 0, "mismatches": 0})
+
+    def _rate_limited(self) -> Optional[float]:
+        """최근 1초 요청 수가 rpm/60을 넘으면 다시 시도할 때까지 남은 초 (실제 API처럼 짧은 구간 단위로 제한)"""
+        if not self.rpm:
+            return None
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= 1.0:
+            self._window.popleft()
+        if len(self._window) >= max(1, self.rpm // 60):
+            return 1.0 - (now - self._window[0])
+        self._window.append(now)
+        return None
+
+    async def handle_chat(self, request: web.Request) -> web.StreamResponse:
+        retry_after = self._rate_limited()
+        if retry_after is not None:
+            self.stats["rate_limited"] += 1
+            return web.json_response(
+                {"error": {"message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}},
+                status=429,
+                headers={"Retry-After": f"{retry_after:.2f}"}
+            )
+        return await super().handle_chat(request)
+
+    def _reply(self, body: Dict) -> Dict:
+        messages = body.get("messages", [])
+        text = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "") or ""
+
+        if (body.get("response_format") or {}).get("type") != "json_object":
+            return {"content": TRANSLATION_PREFIX + text}
+
+        paragraphs = json.loads(text).get("paragraphs", [])
+        self.stats["batched_paragraphs"] += len(paragraphs)
+        translations = [TRANSLATION_PREFIX + p for p in paragraphs]
+        if len(translations) > 1 and self._random.random() < self.mismatch_rate:
+            self.stats["mismatches"] += 1
+            translations.pop()
+        return {"content": json.dumps({"translations": translations}, ensure_ascii=False)}
+
+
+async def check_resume(client, chunks):
+    """중간 종료 후 재실행 → 남은 청크만, 문단 수정 후 재실행 → 바뀐 문단만 번역되는지 확인"""
+    import tempfile
+    from pathlib import Path
+    from data_translate import TRANSLATION_PROMPT_VERSION, translate_chunks
+    from content_store import TranslationCheckpoint
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "checkpoint.jsonl"
+        options = dict(model="gpt-4o-mini", concurrency=8, rpm=1200, tpm=2_000_000, max_retries=8)
+
+        checkpoint = TranslationCheckpoint(str(path), "gpt-4o-mini", TRANSLATION_PROMPT_VERSION)
+        task = asyncio.create_task(translate_chunks(client, chunks, checkpoint=checkpoint, **options))
+        while len(checkpoint) < len(chunks) // 2:
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"key": "torn')  # 기록 도중 죽은 상황
+        print(f"\n[중단] {len(checkpoint)}/{len(chunks)}개 번역 후 중단")
+
+        checkpoint = TranslationCheckpoint(str(path), "gpt-4o-mini", TRANSLATION_PROMPT_VERSION)
+        translations, stats = await translate_chunks(client, chunks, checkpoint=checkpoint, **options)
+        assert translations == [TRANSLATION_PREFIX + c for c in chunks]
+        assert stats["cached"] >= len(chunks) // 2 and checkpoint.stats["corrupt_lines"] == 1
+        print(f"[재실행] 체크포인트 {stats['cached']}개 재사용, {len(chunks) - stats['cached']}개만 번역")
+
+        edited = list(chunks)
+        for i in range(0, len(edited), 40):
+            edited[i] = edited[i] + " (edited)"
+        checkpoint = TranslationCheckpoint(str(path), "gpt-4o-mini", TRANSLATION_PROMPT_VERSION)
+        translations, stats = await translate_chunks(client, edited, checkpoint=checkpoint, **options)
+        assert translations == [TRANSLATION_PREFIX + c for c in edited]
+        assert stats["cached"] == len(chunks) - len(range(0, len(edited), 40))
+        print(f"[수정본] {len(chunks) - stats['cached']}개 문단만 다시 번역 ({stats['requests']}회 요청)")
+
+
+async def run_check(port: int):
+    """fake 서버에 data_translate 파이프라인을 실행해 순서 / 누락 / 재시도 / 처리량 확인"""
+    from openai import AsyncOpenAI
+    from data_translate import print_translation_stats, translate_chunks
+
+    rng = random.Random(7)
+    words = "the little women march meg jo beth amy laurie christmas letter father war".split()
+    chunks = [
+        " ".join(rng.choice(words) for _ in range(rng.choice([5, 12, 30, 150]))) + f" ({i})"
+        for i in range(200)
+    ]
+
+    fake = FakeTranslationServer(LatencyModel("lognormal", 80, 0.4, error_rate=0.03, seed=1), rpm=900, mismatch_rate=0.1, seed=1)
+    runner = web.AppRunner(fake.make_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    client = AsyncOpenAI(api_key="sk-fake", base_url=f"http://127.0.0.1:{port}/v1", max_retries=0)
+    try:
+        reports = {}
+        for label, concurrency, batch_chars in [("순차, 묶음 없음", 1, 0), ("동시 16, 묶음 없음", 16, 0), ("동시 16, 묶음", 16, 2000)]:
+            fake._window.clear()
+            # 서버 한도(900)보다 높게 잡아 429 + Retry-After 재시도 경로도 지나가게 함
+            translations, stats = await translate_chunks(
+                client, chunks, model="gpt-4o-mini", concurrency=concurrency,
+                rpm=1200, tpm=2_000_000, batch_chars=batch_chars, max_retries=8
+            )
+            missing = [i for i, (en, ko) in enumerate(zip(chunks, translations)) if ko != TRANSLATION_PREFIX + en]
+            assert len(translations) == len(chunks) and not missing, f"순서 / 누락 오류: {missing[:5]}"
+            print(f"\n[{label}]")
+            print_translation_stats(stats)
+            reports[label] = stats
+
+        await check_resume(client, chunks)
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    speedup = reports["동시 16, 묶음"]["chunks_per_s"] / reports["순차, 묶음 없음"]["chunks_per_s"]
+    print(f"\n✅ 순서 / 누락 없음, 이어서 번역 정상, 순차 대비 {speedup:.1f}배, 서버 통계: {fake.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 번역 서버 (OpenAI 호환)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8391)
+    parser.add_argument("--latency", default="lognormal:800:0.5", help="응답 지연 분포 (fixed:ms / uniform:min:max / lognormal:median:sigma)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=None, help="분당 요청 수 한도 (초과 시 429)")
+    parser.add_argument("--mismatch-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--check", action="store_true", help="서버 실행 후 번역 파이프라인 동작 확인")
+    args = parser.parse_args()
+
+    if args.check:
+        asyncio.run(run_check(args.port))
+    else:
+        server = FakeTranslationServer(
+            latency=LatencyModel.parse(args.latency, args.error_rate, args.seed),
+            rpm=args.rpm,
+            mismatch_rate=args.mismatch_rate,
+            seed=args.seed
+        )
+        web.run_app(server.make_app(), host=args.host, port=args.port)
@@ -205,18 +205,22 @@ st.markdown("""
 if 'k_value' not in st.session_state:
     st.session_state['k_value'] = 5
 
-if 'backend_checked' not in st.session_state:
-    api_client = APIClient()
-    st.session_state['backend_status'] = api_client.connection_check()
-    st.session_state['backend_checked'] = True  # 체크 완료 표시
+@st.cache_resource
+def get_api_client() -> APIClient:
+    """API 클라이언트 (커넥션 풀) - 프로세스당 1개, rerun / 세션 간 공유"""
+    return APIClient()
 
 
 # API 클라이언트 초기화
-api_client = APIClient()
+api_client = get_api_client()
+
+if 'backend_checked' not in st.session_state:
+    st.session_state['backend_status'] = api_client.connection_check()
+    st.session_state['backend_checked'] = True  # 체크 완료 표시
 
 def main():
     # 사이드바
-    pdf_path = render_sidebar()
+    pdf_path = render_sidebar(api_client)
     
     # 헤더
     st.markdown("""
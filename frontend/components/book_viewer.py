@@ -1,5 +1,7 @@
 """
 책 뷰어 컴포넌트
+- PDF 전체를 보내지 않고 현재 화면에 보이는 페이지만 이미지로 렌더링 (PDFPageService, LRU 캐시)
+- 문서는 파일 경로 + 수정 시각 기준으로 프로세스당 한 번만 열어 세션 간 공유
 """
 import streamlit as st
 from pathlib import Path
@@ -7,63 +9,96 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.pdf_handler import load_pdf_as_base64
+from utils.pdf_handler import PDFPageService, visible_pages
+from utils.text_handler import clean_text
 from config import config
 
+
+@st.cache_resource(max_entries=8)
+def get_page_service(pdf_path: str, mtime: float) -> PDFPageService:
+    """PDF 페이지 서비스 (같은 파일이면 rerun / 세션이 달라도 재사용, 파일이 바뀌면 새로 열기)"""
+    return PDFPageService(Path(pdf_path), config.PDF_PAGE_CACHE_SIZE)
+
+
+def _move_page(page_key: str, delta: int, page_count: int):
+    """이전 / 다음 버튼 콜백 (위젯 생성 전에 실행되므로 페이지 입력값을 바꿀 수 있음)"""
+    page = st.session_state.get(page_key, 1) + delta
+    st.session_state[page_key] = max(1, min(page_count, page))
+
+
+def _use_page_text(service: PDFPageService, pages: tuple):
+    """보이는 페이지 텍스트 → '선택한 구절' 입력창"""
+    st.session_state['selected_passage'] = clean_text("\n".join(service.page_text(p) for p in pages))
+
+
 def render_book_viewer(pdf_path: Path):
     """책 뷰어 렌더링"""
-    
-    # PDF를 base64로 인코딩
-    pdf_base64 = load_pdf_as_base64(pdf_path)
-    
-    if not pdf_base64:
+
+    try:
+        service = get_page_service(str(pdf_path), pdf_path.stat().st_mtime)
+    except Exception as e:
+        print(f"PDF 로드 실패: {e}")
         st.error("PDF 파일을 로드할 수 없습니다.")
         return
-    
+
+    if service.page_count == 0:
+        st.error("PDF에 페이지가 없습니다.")
+        return
+
     # 컨테이너
     st.markdown("""
         <div style="background: white; padding: 20px; border-radius: 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
     """, unsafe_allow_html=True)
-    
+
     st.markdown("### 📖 책 내용")
-    
-    # 진행도 표시
+
+    # 페이지 이동 (책마다 현재 페이지 따로 기억)
+    page_key = f"pdf_page::{pdf_path.name}"
+    step = config.PDF_PAGES_PER_VIEW
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button("◀ 이전", on_click=_move_page, args=(page_key, -step, service.page_count), use_container_width=True)
+    with col_page:
+        current_page = st.number_input(
+            f"페이지 (전체 {service.page_count}쪽)",
+            min_value=1,
+            max_value=service.page_count,
+            step=1,
+            key=page_key,
+            label_visibility="collapsed"
+        )
+    with col_next:
+        st.button("다음 ▶", on_click=_move_page, args=(page_key, step, service.page_count), use_container_width=True)
+
+    pages = visible_pages(int(current_page), step, service.page_count)
+    # 업로드 색인 중 질문은 이 페이지 주변으로 답변
+    st.session_state['current_page'] = pages[0]
+
+    # 진행도 표시 (보고 있는 마지막 페이지 기준)
+    st.session_state['reading_progress'] = pages[-1] / service.page_count * 100
     current_progress = st.session_state.get('reading_progress', 0)
     st.progress(current_progress / 100, text=f"📊 독서 진행도: {current_progress:.1f}%")
-    
-    # 기본 PDF 뷰어 (가장 안정적)
-    pdf_viewer_html = f"""
-    <style>
-        .pdf-viewer-container {{
-            border: 2px solid #E0E0E0;
-            border-radius: 12px;
-            overflow: hidden;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            background: white;
-            margin: 10px 0;
-        }}
-        .pdf-viewer-container iframe {{
-            border: none;
-            width: 100%;
-            height: {config.PDF_DISPLAY_HEIGHT}px;
-        }}
-    </style>
-    <div class="pdf-viewer-container">
-        <iframe 
-            src="data:application/pdf;base64,{pdf_base64}" 
-            type="application/pdf">
-        </iframe>
-    </div>
-    """
-    
-    st.markdown(pdf_viewer_html, unsafe_allow_html=True)
-    
+
+    # 보이는 페이지만 렌더링
+    with st.container(height=config.PDF_DISPLAY_HEIGHT):
+        for page_no in pages:
+            st.image(
+                service.render_page(page_no, config.PDF_PAGE_WIDTH),
+                caption=f"{page_no} / {service.page_count}"
+            )
+
+    st.button(
+        "📋 텍스트 추출 (보이는 페이지 → 선택한 구절)",
+        on_click=_use_page_text,
+        args=(service, pages),
+        use_container_width=True
+    )
+
     # 사용 안내
     st.info("""
-    💡 **Tip**: 
-    - PDF를 스크롤하며 읽으세요
-    - 궁금한 구절을 **드래그로 선택 → Ctrl+C 복사**
-    - 오른쪽 '선택한 구절' 입력창에 **Ctrl+V 붙여넣기**
+    💡 **Tip**:
+    - ◀ / ▶ 버튼이나 페이지 번호로 이동하세요
+    - **텍스트 추출** 버튼으로 보이는 페이지 내용을 '선택한 구절'에 넣은 뒤 필요한 부분만 남기세요
     """)
-    
-    st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+
+    st.markdown("</div>", unsafe_allow_html=True)
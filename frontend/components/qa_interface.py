@@ -9,6 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from services.api_client import APIClient
 from utils.text_handler import clean_text
+from config import config
 
 def render_qa_interface(api_client: APIClient):
     """질의응답 인터페이스 렌더링"""
@@ -77,7 +78,11 @@ def render_qa_interface(api_client: APIClient):
         # 결과 표시
         if result['success']:
             data = result['data']
-            image_url = "http://127.0.0.1:8003" + data['image_url']
+            display_width = config.ILLUSTRATION_DISPLAY_WIDTH
+            image_url = (
+                f"{config.BACKEND_URL}{data['image_url']}"
+                f"?w={display_width}&format={config.ILLUSTRATION_FORMAT}"
+            )
 
             print("qa_interface data ::: ", data)
             
@@ -94,7 +99,7 @@ def render_qa_interface(api_client: APIClient):
                 text-align: center;
                 margin: 0;
             ">
-                <img src="{image_url}" style="max-width: 100%; height: auto; border-radius: 8px;">
+                <img src="{image_url}" width="{display_width}" style="max-width: 100%; height: auto; border-radius: 8px;">
             </div>
             """, unsafe_allow_html=True)
         
@@ -140,11 +145,18 @@ def render_qa_interface(api_client: APIClient):
         # 로딩 표시
         with st.spinner("🤔 AI가 답변을 생성하고 있습니다..."):
             k_value = st.session_state.get('k_value', 5)
+            upload = st.session_state.get('upload')
+            # 백엔드가 업로드를 받지 못했으면(연결 실패) 기존 책 검색으로 답변
+            index_state = st.session_state.get('index_status', {}).get(upload['sha256'], {}).get('state') if upload else None
+            upload_id = upload['sha256'] if index_state not in (None, 'unavailable') else None
             
             result = api_client.ask_question(
                 selected_passage=clean_text(selected_passage) if selected_passage else "",
                 user_question=clean_text(user_question) if user_question else "",
-                k=k_value
+                k=k_value,
+                cache=st.session_state.setdefault('answer_cache', {}),  # 같은 질문은 세션 안에서 재사용
+                upload_id=upload_id,
+                page=st.session_state.get('current_page')
             )
         
         # 결과 표시
@@ -166,6 +178,12 @@ def render_qa_interface(api_client: APIClient):
                 </div>
             """, unsafe_allow_html=True)
 
+            if result.get('cached'):
+                st.caption("♻️ 이전에 받은 답변입니다")
+            if data.get('context_mode') == 'nearby_pages' and data.get('context_pages'):
+                pages = data['context_pages']
+                st.caption(f"📄 색인이 끝나기 전이라 {pages[0]}~{pages[-1]}쪽 내용으로 답변했습니다")
+
             # 평가 점수
             if data.get('rag_score'):
                 score = data['rag_score']
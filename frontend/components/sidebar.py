@@ -1,11 +1,98 @@
 """
 사이드바 컴포넌트
+- 업로드 PDF 를 저장소에 저장하고 백엔드에 색인 요청 (세션당 업로드 1번)
+- 색인이 끝날 때까지 진행도를 INDEX_POLL_SECONDS 마다 갱신 (사이드바 fragment 만 다시 실행)
 """
 import streamlit as st
 from pathlib import Path
 from typing import Optional
+import sys
 
-def render_sidebar() -> Optional[Path]:
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.api_client import APIClient
+from utils.upload_store import UploadStore
+from config import config
+
+INDEX_DONE_STATES = ("ready", "failed", "unavailable")
+
+
+@st.cache_resource
+def get_upload_store() -> UploadStore:
+    """업로드 저장소 (프로세스당 1개, 세션 간 공유)"""
+    return UploadStore(config.UPLOAD_DIR, config.UPLOAD_DISK_BUDGET_MB * 1024 * 1024)
+
+
+def store_upload(uploaded_file) -> Optional[dict]:
+    """
+    업로드 파일 → 저장소 메타데이터
+
+    같은 업로드는 세션 안에서 file_id → 해시로 바로 찾으므로 rerun 마다 읽거나 쓰지 않음
+    """
+    store = get_upload_store()
+    uploads = st.session_state.setdefault('uploads', {})  # file_id → sha256
+    file_id = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+
+    digest = uploads.get(file_id)
+    metadata = store.metadata(digest) if digest else None
+    if metadata is None:
+        # 새 업로드이거나 디스크 예산 때문에 삭제된 경우 (같은 내용이면 다른 세션 기록 재사용)
+        metadata = store.save(uploaded_file.name, uploaded_file.getvalue())
+        uploads[file_id] = metadata["sha256"]
+    return metadata
+
+
+def request_indexing(api_client: APIClient, metadata: dict) -> dict:
+    """백엔드 색인 요청 (세션 안에서는 업로드당 1번, 이미 색인됐거나 진행 중이면 백엔드가 상태만 돌려줌)"""
+    statuses = st.session_state.setdefault('index_status', {})  # sha256 → 마지막 색인 상태
+    requested = st.session_state.setdefault('index_requested', set())
+    digest = metadata["sha256"]
+    if digest not in requested:
+        requested.add(digest)
+        statuses[digest] = api_client.index_upload(digest, metadata["name"], get_upload_store().pdf_path(digest))
+    return statuses[digest]
+
+
+def _show_index_status(status: dict):
+    state = status.get("state")
+    if state == "ready":
+        speed = (status.get("pages_per_second") or {}).get("total")
+        st.caption(f"🔎 색인 완료: {status['chunks']}청크" + (f" ({speed} 쪽/초)" if speed else ""))
+    elif state == "failed":
+        st.warning(f"⚠️ 색인 실패 - 보고 있는 쪽 주변 내용으로 답변합니다 ({status.get('error')})")
+    elif state == "unavailable":
+        st.caption("⚠️ 백엔드에 색인을 요청하지 못했습니다")
+    else:
+        page_count = max(1, status.get("page_count") or 1)
+        done = status.get("pages_indexed", 0) if state == "embedding" else status.get("pages_extracted", 0)
+        label = {"queued": "대기 중", "extracting": "텍스트 추출", "chunking": "청크 분할", "embedding": "임베딩"}.get(state, state)
+        eta = status.get("eta_seconds")
+        st.progress(
+            min(1.0, done / page_count),
+            text=f"🔎 색인 중 ({label}) {done}/{page_count}쪽" + (f" · 약 {eta:.0f}초 남음" if eta else "")
+        )
+        st.caption("색인이 끝날 때까지 질문은 보고 있는 쪽 주변 내용으로 답변합니다")
+
+
+def render_index_status(api_client: APIClient, digest: str):
+    """색인 진행도 (진행 중이면 fragment 로 주기적 갱신, 끝나면 앱 전체를 한 번 다시 실행해 갱신 중단)"""
+    statuses = st.session_state.setdefault('index_status', {})
+    running = statuses.get(digest, {}).get("state") not in INDEX_DONE_STATES
+
+    @st.fragment(run_every=config.INDEX_POLL_SECONDS if running else None)
+    def _index_status():
+        status = statuses.get(digest, {})
+        if status.get("state") not in INDEX_DONE_STATES:
+            status = api_client.get_upload_status(digest) or {"state": "unavailable", "error": "업로드 없음"}
+            statuses[digest] = status
+        _show_index_status(status)
+        if running and status.get("state") in INDEX_DONE_STATES:
+            st.rerun()
+
+    _index_status()
+
+
+def render_sidebar(api_client: APIClient) -> Optional[Path]:
     """사이드바 렌더링"""
     with st.sidebar:
         st.markdown("""
@@ -27,15 +114,20 @@ def render_sidebar() -> Optional[Path]:
         )
         
         if uploaded_file:
-            # 임시 저장
-            pdf_path = Path("temp") / uploaded_file.name
-            pdf_path.parent.mkdir(exist_ok=True)
+            try:
+                metadata = store_upload(uploaded_file)
+            except Exception as e:
+                print(f"업로드 저장 실패: {e}")
+                st.error(f"❌ {uploaded_file.name}: PDF를 열 수 없습니다")
+                return None
             
-            with open(pdf_path, "wb") as f:
-                f.write(uploaded_file.getvalue())
-            
-            st.success(f"✅ {uploaded_file.name} 로드 완료")
-            return pdf_path
+            st.session_state['upload'] = metadata
+            st.success(f"✅ {uploaded_file.name} 로드 완료 ({metadata['page_count']}쪽)")
+            request_indexing(api_client, metadata)
+            render_index_status(api_client, metadata["sha256"])
+            return get_upload_store().pdf_path(metadata["sha256"])
+        
+        st.session_state.pop('upload', None)
         
         st.markdown("---")
         
@@ -19,6 +19,18 @@ class FrontendConfig:
     
     # PDF 설정
     PDF_DISPLAY_HEIGHT: int = 700
+    PDF_PAGE_WIDTH: int = 900           # 페이지 렌더링 가로 픽셀
+    PDF_PAGES_PER_VIEW: int = 2         # 한 화면에 렌더링할 페이지 수
+    PDF_PAGE_CACHE_SIZE: int = 64       # 문서별 페이지 이미지 LRU 캐시 개수
+    
+    # 업로드 저장소 (내용 해시 기준, 예산을 넘으면 오래 안 쓴 업로드부터 삭제)
+    UPLOAD_DIR: str = "temp/uploads"
+    UPLOAD_DISK_BUDGET_MB: int = 1024
+    INDEX_POLL_SECONDS: float = 2.0     # 업로드 색인 진행도 조회 간격 (색인이 끝나면 중단)
+    
+    # 삽화 표시 설정 (백엔드에 표시 크기만큼의 썸네일 요청)
+    ILLUSTRATION_DISPLAY_WIDTH: int = 512
+    ILLUSTRATION_FORMAT: str = "webp"
     
     @property
     def api_base_url(self) -> str:
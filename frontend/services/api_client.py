@@ -1,8 +1,22 @@
 """
 백엔드 API 클라이언트
+- APIClient: requests.Session 커넥션 풀 (keep-alive), app.py 에서 st.cache_resource 로 1개만 생성해 재사용
+- AsyncAPIClient: httpx.AsyncClient 버전 (여러 요청 동시 실행용, 이벤트 루프마다 async with 로 생성)
+- 엔드포인트별 타임아웃 / 재시도 (ENDPOINT_POLICIES, 생성자에서 덮어쓰기 가능)
+- 같은 구절 + 질문 결과는 세션별 캐시(st.session_state 의 dict)에서 재사용
+- 업로드 PDF 는 백엔드에 한 번 보내 색인 (index_upload), 진행 상태는 get_upload_status 로 조회
 """
+import asyncio
+import hashlib
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, MutableMapping, Optional
+
+import httpx
 import requests
-from typing import Dict
+from requests.adapters import HTTPAdapter
 from config import config
 
 from pydantic import BaseModel, Field
@@ -22,34 +36,144 @@ class RAGRequest(BaseModel):
     user_question: str = Field(..., description="사용자의 질문")
     k: int = Field(default=5, description="검색할 문서 개수", ge=1, le=20)
 
-class APIClient:
-    """백엔드 API 클라이언트"""
-    
-    def __init__(self):
-        self.base_url = config.api_base_url
-    
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    """엔드포인트별 요청 정책"""
+    timeout: float                   # 초 (응답 대기)
+    retries: int = 0                 # 연결 실패 / 타임아웃 / 502·503·504 재시도 횟수
+    backoff: float = 0.5             # 재시도 대기 기본값 (초, 지수 증가 + jitter)
+    connect_timeout: float = 3.0
+
+
+# 경로 앞부분 기준 (가장 길게 일치하는 항목 사용)
+ENDPOINT_POLICIES: Dict[str, EndpointPolicy] = {
+    "connection_check": EndpointPolicy(timeout=5),
+    "rag/ask": EndpointPolicy(timeout=60, retries=1),
+    "generate/progress": EndpointPolicy(timeout=5, retries=2),
+    "generate": EndpointPolicy(timeout=1300),  # 이미지 생성은 비싸므로 재시도 없음
+    "progress": EndpointPolicy(timeout=5, retries=2),
+    "uploads": EndpointPolicy(timeout=60, retries=1),   # 같은 PDF 는 백엔드가 한 번만 색인하므로 재시도해도 안전
+}
+DEFAULT_POLICY = EndpointPolicy(timeout=30, retries=1)
+RETRY_STATUS = (502, 503, 504)
+POOL_SIZE = 10            # 호스트당 keep-alive 연결 수
+ANSWER_CACHE_SIZE = 32    # 세션별 질문 결과 캐시 개수
+
+
+def join_url(base_url: str, path: str) -> str:
+    """base_url 끝 / 와 path 앞 / 를 정리해서 연결"""
+    return f"{base_url.rstrip('/')}/{path.lstrip('/')}"
+
+
+def answer_cache_key(selected_passage: str, user_question: str, k: int, upload_id: Optional[str] = None) -> str:
+    raw = f"{selected_passage}\n{user_question}\n{k}" + (f"\n{upload_id}" if upload_id else "")
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def ask_payload(selected_passage: str, user_question: str, k: int, upload_id: Optional[str], page: Optional[int]) -> Dict:
+    payload = {"selected_passage": selected_passage, "user_question": user_question, "k": k}
+    if upload_id:
+        payload.update({"upload_id": upload_id, "page": page})
+    return payload
+
+
+def _cacheable(result: Dict) -> bool:
+    """업로드 색인 중(주변 페이지로 답변)에는 페이지마다 답이 달라지고 색인이 끝나면 더 나아지므로 캐시하지 않음"""
+    return result["data"].get("context_mode") != "nearby_pages"
+
+
+def _remember(cache: MutableMapping[str, Dict], key: str, result: Dict):
+    """성공한 결과만 기록, 오래된 것부터 ANSWER_CACHE_SIZE 개 초과분 제거"""
+    cache[key] = result
+    while len(cache) > ANSWER_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+
+
+def _retry_delay(policy: EndpointPolicy, attempt: int) -> float:
+    return policy.backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class _PolicyMixin:
+    """엔드포인트 정책 / URL 공통 처리"""
+
+    def _init_policies(self, base_url: Optional[str], policies: Optional[Dict[str, EndpointPolicy]]):
+        self.base_url = base_url or config.api_base_url
+        self.policies = {**ENDPOINT_POLICIES, **(policies or {})}
+
+    def policy_for(self, path: str) -> EndpointPolicy:
+        path = path.strip("/")
+        matches = [prefix for prefix in self.policies if path == prefix or path.startswith(prefix + "/")]
+        return self.policies[max(matches, key=len)] if matches else DEFAULT_POLICY
+
+    def url(self, path: str) -> str:
+        return join_url(self.base_url, path)
+
+
+class APIClient(_PolicyMixin):
+    """백엔드 API 클라이언트 (동기, 커넥션 풀 재사용)"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        policies: Optional[Dict[str, EndpointPolicy]] = None,
+        pool_size: int = POOL_SIZE
+    ):
+        """
+        Args:
+            base_url: 백엔드 주소 (기본: config.api_base_url)
+            policies: 엔드포인트별 정책 덮어쓰기 (예: {"rag/ask": EndpointPolicy(timeout=120, retries=0)})
+            pool_size: 호스트당 keep-alive 연결 수
+        """
+        self._init_policies(base_url, policies)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """정책에 따른 타임아웃 / 재시도로 요청 (4xx 등은 바로 raise_for_status)"""
+        policy = self.policy_for(path)
+        for attempt in range(policy.retries + 1):
+            try:
+                response = self.session.request(
+                    method, self.url(path), timeout=(policy.connect_timeout, policy.timeout), **kwargs
+                )
+                if response.status_code not in RETRY_STATUS or attempt == policy.retries:
+                    response.raise_for_status()
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == policy.retries:
+                    raise
+            time.sleep(_retry_delay(policy, attempt))
+
     def ask_question(
         self,
         selected_passage: str,
         user_question: str,
-        k: int = 5
+        k: int = 5,
+        cache: Optional[MutableMapping[str, Dict]] = None,
+        upload_id: Optional[str] = None,
+        page: Optional[int] = None
     ) -> Dict:
-        """RAG 질문 요청"""
-        req_json = {
-                    "selected_passage": selected_passage,
-                    "user_question": user_question,
-                    "k": k
-                }
+        """
+        RAG 질문 요청
+
+        Args:
+            cache: 세션별 결과 캐시 (st.session_state 의 dict), 같은 구절 + 질문 + k (+ 업로드) 면 요청하지 않음
+            upload_id: 업로드 PDF sha256 (있으면 그 책에서 답변)
+            page: 보고 있는 페이지 (업로드 색인 중에는 주변 페이지로 답변)
+        """
+        key = answer_cache_key(selected_passage, user_question, k, upload_id)
+        if cache is not None and key in cache:
+            return {**cache[key], "cached": True}
+
+        req_json = ask_payload(selected_passage, user_question, k, upload_id, page)
         print(f"selected_passage ::: {selected_passage} /// user_question ::: {user_question} /// k ::: {k}")
-    
+
         try:
-            response = requests.post(
-                f"{self.base_url}rag/ask",
-                json=req_json,
-                timeout=60
-            )
-            response.raise_for_status()
-            return {
+            response = self._request("POST", "rag/ask", json=req_json)
+            result = {
                 "success": True,
                 "data": response.json()
             }
@@ -58,15 +182,49 @@ class APIClient:
                 "success": False,
                 "error": str(e)
             }
-        
+
+        if cache is not None and _cacheable(result):
+            _remember(cache, key, result)
+        return result
+
+    def get_upload_status(self, upload_id: str) -> Optional[Dict]:
+        """업로드 색인 상태 (백엔드에 없으면 None, 요청 실패면 state=unavailable)"""
+        try:
+            return self._request("GET", f"uploads/{upload_id}").json()
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            return {"state": "unavailable", "error": str(e)}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return {"state": "unavailable", "error": str(e)}
+
+    def index_upload(self, upload_id: str, name: str, pdf_path: Path) -> Dict:
+        """
+        업로드 PDF 색인 요청 → 색인 상태
+
+        백엔드에 이미 있으면(다른 세션 / 이전 업로드) PDF 를 다시 보내지 않음
+        """
+        status = self.get_upload_status(upload_id)
+        if status is not None and status.get("state") not in ("failed", "unavailable"):
+            return status
+        try:
+            with open(pdf_path, "rb") as f:
+                response = self._request(
+                    "POST", f"uploads/{upload_id}",
+                    params={"name": name}, data=f.read(), headers={"Content-Type": "application/pdf"}
+                )
+            return response.json()
+        except (requests.exceptions.RequestException, OSError, ValueError) as e:
+            return {"state": "unavailable", "error": str(e)}
+
     def connection_check(self) -> bool:
         """백엔드 연결 확인"""
         try:
-            response = requests.get(f"{config.BACKEND_URL}/connection_check", timeout=5)
+            response = self._request("GET", "connection_check")
             return response.status_code == 200
-        except:
+        except requests.exceptions.RequestException:
             return False
-        
+
     def save_reading_position(
         self,
         book_id: int,
@@ -75,37 +233,31 @@ class APIClient:
     ) -> Dict:
         """읽은 위치 저장"""
         try:
-            response = requests.post(
-                f"{self.base_url}/progress/save-position",
+            response = self._request(
+                "POST", "progress/save-position",
                 json={
                     "book_id": book_id,
                     "user_id": user_id,
                     "selected_passage": selected_passage
-                },
-                timeout=5
+                }
             )
-            response.raise_for_status()
             return response.json()
-        except:
+        except (requests.exceptions.RequestException, ValueError):
             return {"success": False}
-        
+
     def get_summary(self, book_id: int) -> Dict:
         """지금까지 줄거리 조회"""
-        
+
         return {"success" : True}
 
     def get_progress(self, book_id: int) -> Dict:
         """독서 진행도 조회"""
         try:
-            response = requests.get(
-                f"{self.base_url}/progress/get/{book_id}",
-                timeout=5
-            )
-            response.raise_for_status()
+            response = self._request("GET", f"progress/get/{book_id}")
             return response.json()
-        except:
+        except (requests.exceptions.RequestException, ValueError):
             return {"progress": 0, "current_page": 1}
-        
+
     def make_img(
         self,
         selected_passage: str,
@@ -117,12 +269,7 @@ class APIClient:
             **FIXED_PARAMS
         }
         try:
-            response = requests.post(
-                f"{self.base_url}generate",
-                json=req_payload, 
-                timeout=1300
-            )
-            response.raise_for_status()
+            response = self._request("POST", "generate", json=req_payload)
             return {
                 "success": True,
                 "data": response.json()
@@ -131,4 +278,99 @@ class APIClient:
             return {
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncAPIClient(_PolicyMixin):
+    """
+    백엔드 API 클라이언트 (httpx 비동기, 여러 요청 동시 실행)
+
+    httpx.AsyncClient 는 만든 이벤트 루프에서만 쓸 수 있으므로 캐시하지 않고 asyncio.run 안에서 생성:
+
+        async def load():
+            async with AsyncAPIClient() as client:
+                return await client.ask_many([("구절", "질문", 5), ...])
+        results = asyncio.run(load())
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        policies: Optional[Dict[str, EndpointPolicy]] = None,
+        pool_size: int = POOL_SIZE
+    ):
+        """
+        Args:
+            base_url: 백엔드 주소 (기본: config.api_base_url)
+            policies: 엔드포인트별 정책 덮어쓰기
+            pool_size: 동시 연결 수
+        """
+        self._init_policies(base_url, policies)
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        policy = self.policy_for(path)
+        timeout = httpx.Timeout(policy.timeout, connect=policy.connect_timeout)
+        for attempt in range(policy.retries + 1):
+            try:
+                response = await self.client.request(method, self.url(path), timeout=timeout, **kwargs)
+                if response.status_code not in RETRY_STATUS or attempt == policy.retries:
+                    response.raise_for_status()
+                    return response
+            except httpx.TransportError:
+                if attempt == policy.retries:
+                    raise
+            await asyncio.sleep(_retry_delay(policy, attempt))
+
+    async def ask_question(
+        self,
+        selected_passage: str,
+        user_question: str,
+        k: int = 5,
+        cache: Optional[MutableMapping[str, Dict]] = None,
+        upload_id: Optional[str] = None,
+        page: Optional[int] = None
+    ) -> Dict:
+        """RAG 질문 요청 (결과 형식 / 캐시 동작은 APIClient.ask_question 과 동일)"""
+        key = answer_cache_key(selected_passage, user_question, k, upload_id)
+        if cache is not None and key in cache:
+            return {**cache[key], "cached": True}
+        try:
+            response = await self._request(
+                "POST", "rag/ask", json=ask_payload(selected_passage, user_question, k, upload_id, page)
+            )
+            result = {"success": True, "data": response.json()}
+        except httpx.HTTPError as e:
+            return {"success": False, "error": str(e)}
+        if cache is not None and _cacheable(result):
+            _remember(cache, key, result)
+        return result
+
+    async def ask_many(self, questions: List[tuple], cache: Optional[MutableMapping[str, Dict]] = None) -> List[Dict]:
+        """[(구절, 질문, k), ...] 동시 요청 → 입력 순서대로 결과"""
+        return await asyncio.gather(*[self.ask_question(p, q, k, cache) for p, q, k in questions])
+
+    async def connection_check(self) -> bool:
+        try:
+            response = await self._request("GET", "connection_check")
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    async def get_progress(self, book_id: int) -> Dict:
+        try:
+            response = await self._request("GET", f"progress/get/{book_id}")
+            return response.json()
+        except (httpx.HTTPError, ValueError):
+            return {"progress": 0, "current_page": 1}
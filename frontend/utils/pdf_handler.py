@@ -1,11 +1,20 @@
 """
 PDF 처리 유틸리티
+- PDFPageService: 문서를 한 번만 열어 두고 요청한 페이지만 이미지 / 텍스트로 변환 (LRU 캐시)
+- 책 전체를 base64 로 만들어 매 rerun 마다 보내지 않음
 """
 import base64
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Hashable, Optional, Tuple
 import fitz  # PyMuPDF
 
+PAGE_CACHE_SIZE = 64        # 렌더링한 페이지 이미지 개수
+TEXT_CACHE_SIZE = 256       # 추출한 페이지 텍스트 개수
+
+
 def load_pdf_as_base64(pdf_path: Path) -> Optional[str]:
     """PDF를 base64로 인코딩"""
     try:
@@ -15,4 +24,105 @@ def load_pdf_as_base64(pdf_path: Path) -> Optional[str]:
             return base64_pdf
     except Exception as e:
         print(f"PDF 로드 실패: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+class LRUCache:
+    """개수 제한 LRU 캐시 (가장 오래 안 쓴 항목부터 제거, 스레드 안전)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: object):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class PDFPageService:
+    """PDF 페이지 단위 렌더링 / 텍스트 추출 (페이지 번호는 1부터)"""
+
+    def __init__(self, pdf_path: Path, page_cache_size: int = PAGE_CACHE_SIZE, text_cache_size: int = TEXT_CACHE_SIZE):
+        """
+        Args:
+            pdf_path: PDF 파일 경로
+            page_cache_size: 페이지 이미지 LRU 캐시 개수
+            text_cache_size: 페이지 텍스트 LRU 캐시 개수
+        """
+        self.pdf_path = Path(pdf_path)
+        self.doc = fitz.open(str(self.pdf_path))
+        self.page_count = self.doc.page_count
+        # Streamlit 세션들이 스레드에서 같은 문서를 공유하므로 MuPDF 호출은 직렬화
+        self._lock = threading.Lock()
+        self._images = LRUCache(page_cache_size)
+        self._texts = LRUCache(text_cache_size)
+        self.render_seconds = 0.0
+
+    def _check(self, page_no: int):
+        if not 1 <= page_no <= self.page_count:
+            raise IndexError(f"페이지 범위 밖: {page_no} (1~{self.page_count})")
+
+    def render_page(self, page_no: int, width: int, fmt: str = "png") -> bytes:
+        """페이지 → 이미지 바이트 (가로 width 픽셀에 맞춰 렌더링)"""
+        self._check(page_no)
+        key = (page_no, width, fmt)
+        image = self._images.get(key)
+        if image is not None:
+            return image
+
+        with self._lock:
+            started = time.perf_counter()
+            page = self.doc.load_page(page_no - 1)
+            zoom = width / page.rect.width
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = pixmap.tobytes(fmt)
+            self.render_seconds += time.perf_counter() - started
+        self._images.put(key, image)
+        return image
+
+    def page_text(self, page_no: int) -> str:
+        """페이지 텍스트 (구절 선택용)"""
+        self._check(page_no)
+        text = self._texts.get(page_no)
+        if text is None:
+            with self._lock:
+                text = self.doc.load_page(page_no - 1).get_text("text")
+            self._texts.put(page_no, text)
+        return text
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "pages": self.page_count,
+            "cached_pages": len(self._images),
+            "image_hits": self._images.hits,
+            "image_misses": self._images.misses,
+            "render_seconds": round(self.render_seconds, 3),
+        }
+
+    def close(self):
+        with self._lock:
+            self.doc.close()
+
+
+def visible_pages(current_page: int, pages_per_view: int, page_count: int) -> Tuple[int, ...]:
+    """현재 페이지부터 화면에 보일 페이지 번호 (마지막 페이지를 넘지 않음)"""
+    last = min(page_count, current_page + pages_per_view - 1)
+    return tuple(range(current_page, last + 1))
@@ -0,0 +1,129 @@
+"""
+업로드 PDF 저장소 (내용 해시 기준)
+- 같은 내용이면 이름 / 세션이 달라도 한 번만 저장 (temp/uploads/{sha256}.pdf)
+- 페이지 수 등 메타데이터({sha256}.json)와 페이지별 텍스트({sha256}.txt, 페이지 구분 \\f)도 처음 한 번만 추출
+- 메모리(프로세스) → 디스크 순으로 재사용, 서버를 재시작해도 디스크 기록 재사용
+- 전체 용량이 예산을 넘으면 가장 오래 안 쓴 업로드부터 삭제
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import fitz  # PyMuPDF
+
+PAGE_SEPARATOR = "\f"
+
+
+class UploadStore:
+    def __init__(self, root: str, budget_bytes: int):
+        """
+        Args:
+            root: 저장 폴더
+            budget_bytes: 업로드 전체 디스크 예산 (PDF + 텍스트 + 메타데이터)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.budget_bytes = budget_bytes
+        self._metadata: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def pdf_path(self, digest: str) -> Path:
+        return self.root / f"{digest}.pdf"
+
+    def _meta_path(self, digest: str) -> Path:
+        return self.root / f"{digest}.json"
+
+    def _text_path(self, digest: str) -> Path:
+        return self.root / f"{digest}.txt"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp = path.with_name(f".tmp-{path.name}")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _extract(self, digest: str, name: str, size: int) -> Dict:
+        """페이지 수 / 페이지별 텍스트 추출 (업로드당 1회)"""
+        started = time.perf_counter()
+        with fitz.open(str(self.pdf_path(digest))) as doc:
+            texts = [page.get_text("text") for page in doc]
+            title = (doc.metadata or {}).get("title") or ""
+        self._write_atomic(self._text_path(digest), PAGE_SEPARATOR.join(texts).encode("utf-8"))
+        elapsed = time.perf_counter() - started
+        return {
+            "sha256": digest,
+            "name": name,
+            "title": title,
+            "size": size,
+            "page_count": len(texts),
+            "text_chars": sum(len(t) for t in texts),
+            "extract_seconds": round(elapsed, 3),
+            "created_at": time.time(),
+        }
+
+    def metadata(self, digest: str) -> Optional[Dict]:
+        """메타데이터 (메모리 → 디스크 순)"""
+        if digest not in self._metadata:
+            path = self._meta_path(digest)
+            if not path.exists() or not self.pdf_path(digest).exists():
+                return None
+            self._metadata[digest] = json.loads(path.read_text(encoding="utf-8"))
+        return self._metadata[digest]
+
+    def save(self, name: str, data: bytes) -> Dict:
+        """
+        업로드 저장 (이미 있으면 쓰지 않음) → 메타데이터
+
+        Returns:
+            {sha256, name, title, size, page_count, text_chars, extract_seconds, created_at, last_used, reused}
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            metadata = self.metadata(digest)
+            reused = metadata is not None
+            if not reused:
+                self._write_atomic(self.pdf_path(digest), data)
+                try:
+                    metadata = self._extract(digest, name, len(data))
+                except Exception:
+                    # 열 수 없는 PDF는 남기지 않음
+                    for path in self._files(digest):
+                        path.unlink(missing_ok=True)
+                    raise
+                print(f"📥 업로드 저장: {name} ({len(data) / 1e6:.1f}MB, {metadata['page_count']}쪽, 추출 {metadata['extract_seconds']}s)")
+            metadata["last_used"] = time.time()
+            self._metadata[digest] = metadata
+            self._write_atomic(self._meta_path(digest), json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+            self._evict(keep=digest)
+        return {**metadata, "reused": reused}
+
+    def page_texts(self, digest: str) -> List[str]:
+        """페이지별 텍스트 (0번 = 1쪽)"""
+        return self._text_path(digest).read_text(encoding="utf-8").split(PAGE_SEPARATOR)
+
+    def _files(self, digest: str) -> List[Path]:
+        return [p for p in (self.pdf_path(digest), self._text_path(digest), self._meta_path(digest)) if p.exists()]
+
+    def _evict(self, keep: str):
+        """디스크 예산 초과분을 오래 안 쓴 업로드부터 삭제 (방금 쓴 업로드는 제외)"""
+        digests = {p.stem for p in self.root.glob("*.pdf")}
+        usage = {d: sum(p.stat().st_size for p in self._files(d)) for d in digests}
+        total = sum(usage.values())
+        if total <= self.budget_bytes:
+            return
+
+        def last_used(digest: str) -> float:
+            metadata = self.metadata(digest)
+            return metadata.get("last_used", 0.0) if metadata else 0.0
+
+        for digest in sorted(digests - {keep}, key=last_used):
+            if total <= self.budget_bytes:
+                break
+            for path in self._files(digest):
+                path.unlink(missing_ok=True)
+            self._metadata.pop(digest, None)
+            total -= usage[digest]
+            print(f"🗑️ 업로드 삭제 (디스크 예산 초과): {digest[:12]}")
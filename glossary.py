@@ -0,0 +1,253 @@
+# python glossary.py --input data/03_processed/chunked_data_the_wizard_of_oz.jsonl --book-id the_wizard_of_oz
+"""
+책별 고유명사 용어집 (한글 → 영문)
+- 수집 단계에서 content_en / content_ko 청크 쌍으로 한 번 생성
+- 서버에서는 메모리에 올려두고 조회 (파일이 바뀌면 다시 읽음)
+- 용어집에 없는 단어는 LLM 결과를 다시 기록 (용어집이 이미 있는 책만)
+- book_id 는 파일 이름이 되므로 영문 / 숫자 / _ / - 만 허용
+"""
+import argparse
+import json
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+from chunk_io import iter_chunks
+
+load_dotenv()
+
+GLOSSARY_TYPES = ("character", "place", "object")
+BOOK_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+EXTRACT_PROMPT = """다음은 같은 책의 영어 원문과 한국어 번역 쌍입니다.
+번역문에 등장하는 고유명사(인물/장소/물건)의 한글 표기와 원문 영문 표기를 짝지어 추출하세요.
+
+{pairs}
+
+**규칙:**
+- 원문에 실제로 쓰인 영문 표기만 사용 (임의 번역 금지)
+- 인물은 가장 완전한 이름 사용 (예: Dorothy → Dorothy Gale, 원문에 있을 때만)
+- 일반명사, 대명사 제외
+
+JSON 형식:
+{{
+    "terms": [
+        {{"korean": "도로시", "english": "Dorothy", "type": "character"}},
+        {{"korean": "캔자스", "english": "Kansas", "type": "place"}}
+    ]
+}}
+
+type 값: "character", "place", "object"
+"""
+
+
+def is_valid_book_id(book_id: str) -> bool:
+    """파일 이름으로 써도 안전한 book_id 인지 (경로 구분자 / .. 등 차단)"""
+    return bool(book_id) and BOOK_ID_PATTERN.fullmatch(book_id) is not None
+
+
+class BookGlossary:
+    def __init__(self, glossary_dir: str = "data/glossary", min_confidence: float = 0.5):
+        """
+        용어집 초기화
+        
+        Args:
+            glossary_dir: 책별 용어집 JSON 저장 폴더 ({book_id}.json)
+            min_confidence: 조회 시 사용할 최소 확신도
+        """
+        self.glossary_dir = Path(glossary_dir)
+        self.min_confidence = min_confidence
+        self._books: Dict[str, Dict[str, Dict]] = {}
+        self._mtimes: Dict[str, int] = {}
+        # add() 는 요청마다 스레드에서 실행되므로 같은 용어집 수정 / 저장을 직렬화
+        self._lock = threading.Lock()
+    
+    def _path(self, book_id: str) -> Path:
+        if not is_valid_book_id(book_id):
+            raise ValueError(f"잘못된 book_id: {book_id!r}")
+        return self.glossary_dir / f"{book_id}.json"
+    
+    def load(self, book_id: str) -> Dict[str, Dict]:
+        """
+        책 용어집 로드 (파일 수정 시각이 바뀌었을 때만 디스크에서 다시 읽음)
+        
+        잘못된 book_id 이거나 용어집 파일이 없으면 빈 dict (캐시하지 않음)
+        """
+        if not is_valid_book_id(book_id):
+            return {}
+        path = self._path(book_id)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._books.pop(book_id, None)
+            self._mtimes.pop(book_id, None)
+            return {}
+        
+        # 조회는 요청마다 스레드에서 실행되므로 dict 를 다시 꺼내지 않고 지역 변수로 반환
+        book = self._books.get(book_id)
+        if book is None or self._mtimes.get(book_id) != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                book = json.load(f)
+            self._books[book_id] = book
+            self._mtimes[book_id] = mtime
+        return book
+    
+    def exists(self, book_id: str) -> bool:
+        """용어집이 만들어진 책인지"""
+        return is_valid_book_id(book_id) and self._path(book_id).exists()
+    
+    def lookup(self, book_id: str, terms: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        용어 조회
+        
+        Returns:
+            (찾은 용어 dict, 용어집에 없는 용어 리스트)
+        """
+        glossary = self.load(book_id)
+        found = {}
+        unknown = []
+        
+        for term in terms:
+            entry = glossary.get(term)
+            if entry and entry.get("confidence", 0.0) >= self.min_confidence:
+                found[term] = {**entry, "source": "glossary"}
+            else:
+                unknown.append(term)
+        
+        return found, unknown
+    
+    def add(self, book_id: str, entries: Dict[str, Dict], overwrite: bool = False, create: bool = False) -> bool:
+        """
+        용어 추가 후 저장 → 저장 여부
+        
+        Args:
+            entries: {korean: {"english", "type", "confidence", "source"}}
+            overwrite: False면 기존 항목보다 확신도가 높을 때만 교체
+            create: 용어집이 없는 책이면 새로 만듦 (수집 단계용, 서버 요청은 기존 책에만 기록)
+        """
+        if not create and not self.exists(book_id):
+            return False
+        
+        with self._lock:
+            glossary = dict(self.load(book_id))
+            changed = False
+            
+            for korean, entry in entries.items():
+                current = glossary.get(korean)
+                if overwrite or current is None or entry.get("confidence", 0.0) > current.get("confidence", 0.0):
+                    glossary[korean] = {
+                        "english": entry["english"],
+                        "type": entry.get("type", "general"),
+                        "confidence": round(float(entry.get("confidence", 0.0)), 2),
+                        "source": entry.get("source", "gpt")
+                    }
+                    changed = True
+            
+            if changed:
+                self._save(book_id, glossary)
+        return changed
+    
+    def _save(self, book_id: str, glossary: Dict[str, Dict]):
+        """임시 파일에 쓰고 rename (동시 쓰기 중 깨진 파일 방지)"""
+        path = self._path(book_id)
+        self.glossary_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(glossary, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+        self._books[book_id] = glossary
+        self._mtimes[book_id] = path.stat().st_mtime_ns
+
+
+def build_glossary_from_chunks(
+    client,
+    chunks: List[Dict],
+    model: str = "gpt-4o-mini",
+    batch_size: int = 8
+) -> Dict[str, Dict]:
+    """
+    영/한 청크 쌍에서 고유명사 용어집 생성 (map: 배치별 추출 → reduce: 빈도 집계)
+    
+    Args:
+        client: OpenAI (동기) 클라이언트
+        chunks: content_en / content_ko 를 가진 청크 리스트
+        batch_size: LLM 호출 1회에 넣을 청크 쌍 개수
+        
+    Returns:
+        {korean: {"english", "type", "confidence", "source"}}
+    """
+    votes: Dict[str, Counter] = defaultdict(Counter)
+    
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        pairs = "\n\n".join(
+            f"<쌍_{i}>\n[EN] {c['content_en']}\n[KO] {c['content_ko']}\n</쌍_{i}>"
+            for i, c in enumerate(batch, 1)
+        )
+        print(f"-> 용어 추출 {start + 1}~{start + len(batch)}/{len(chunks)}")
+        
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": EXTRACT_PROMPT.format(pairs=pairs)}],
+                temperature=0,
+                response_format={"type": "json_object"}
+            )
+            terms = json.loads(response.choices[0].message.content).get("terms", [])
+        except Exception as e:
+            print(f"용어 추출 중 오류 발생: {e}")
+            continue
+        
+        for term in terms:
+            korean = term.get("korean", "").strip()
+            english = term.get("english", "").strip()
+            term_type = term.get("type", "")
+            if korean and english and term_type in GLOSSARY_TYPES:
+                votes[korean][(english, term_type)] += 1
+    
+    # 가장 많이 나온 표기 선택, 확신도 = 일치율 × 등장 횟수 보정
+    glossary = {}
+    for korean, counter in votes.items():
+        (english, term_type), count = counter.most_common(1)[0]
+        agreement = count / sum(counter.values())
+        support = min(1.0, 0.7 + 0.1 * count)
+        glossary[korean] = {
+            "english": english,
+            "type": term_type,
+            "confidence": round(agreement * support, 2),
+            "source": "ingestion"
+        }
+    
+    print(f"용어집 생성 완료: {len(glossary)}개")
+    return glossary
+
+
+def main():
+    """처리된 청크 JSON으로 책 용어집 생성"""
+    from openai import OpenAI
+    
+    parser = argparse.ArgumentParser(description="책별 고유명사 용어집 생성")
+    parser.add_argument("--input", required=True, help="chunked_data_*.jsonl(.gz / .zst) 또는 예전 .json 경로")
+    parser.add_argument("--book-id", required=True, help="용어집 키 (예: the_wizard_of_oz)")
+    parser.add_argument("--glossary-dir", default="data/glossary")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+    if not is_valid_book_id(args.book_id):
+        parser.error("--book-id 는 영문 / 숫자 / _ / - 만 사용할 수 있습니다")
+    
+    chunks = [chunk for _, chunk in iter_chunks(args.input)]
+    
+    entries = build_glossary_from_chunks(OpenAI(), chunks, args.model, args.batch_size)
+    BookGlossary(args.glossary_dir).add(args.book_id, entries, overwrite=True, create=True)
+    print(f"저장 완료: {Path(args.glossary_dir) / (args.book_id + '.json')}")
+
+
+if __name__ == "__main__":
+    main()
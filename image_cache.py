@@ -0,0 +1,168 @@
+"""
+생성 이미지 캐시
+- (프롬프트, 파라미터, 시드) 해시 → 이미지 파일 (content-addressed)
+- 동일 요청 동시 실행 시 하나의 생성 작업으로 합침 (in-flight dedup)
+- 디스크 용량 기준 LRU 정리 (atime 기준, 누적 크기가 예산을 넘을 때만 폴더 스캔)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+EVICT_TARGET_RATIO = 0.9  # 정리 시 예산의 90% 까지 지움 (예산 근처에서 put 마다 폴더를 다시 스캔하지 않도록)
+
+
+class ImageCache:
+    def __init__(
+        self,
+        cache_dir: str = "generated_images",
+        max_disk_mb: float = 1024,
+        extension: str = ".png"
+    ):
+        """
+        이미지 캐시 초기화
+        
+        Args:
+            cache_dir: 이미지 저장 폴더
+            max_disk_mb: 폴더 전체 디스크 예산 (MB)
+            extension: 캐시 파일 확장자
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_disk_mb * 1024 * 1024)
+        self.extension = extension
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 폴더 전체 크기 (None = 아직 스캔 전), put 마다 더하고 예산을 넘을 때만 evict 에서 다시 계산
+        # (변형 이미지처럼 다른 곳에서 폴더에 쓴 파일은 다음 스캔 때 반영)
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0, "coalesced": 0, "evicted": 0}
+    
+    @staticmethod
+    def make_key(params: Dict) -> str:
+        """생성 파라미터로 캐시 키(sha256) 생성"""
+        canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.extension}"
+    
+    def get(self, key: str) -> Optional[str]:
+        """캐시 조회 (hit 시 atime 갱신 → LRU 순서 유지)"""
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+        
+        try:
+            self.touch(path)
+        except OSError:
+            return None
+        return str(path)
+    
+    @staticmethod
+    def touch(path: Path):
+        """
+        접근 시각(atime)만 갱신
+        
+        mtime은 ETag/Last-Modified 기준이므로 유지해야 브라우저 캐시가 깨지지 않음
+        """
+        os.utime(path, (time.time(), path.stat().st_mtime))
+    
+    def put(self, key: str, image_path: str) -> str:
+        """생성된 이미지를 키 이름으로 이동 후 용량 정리 (디스크 작업이므로 비동기 코드에서는 스레드에서 호출)"""
+        target = self.path_for(key)
+        size = os.path.getsize(image_path)
+        os.replace(image_path, target)
+        
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            needs_scan = self._disk_bytes is None or self._disk_bytes > self.max_bytes
+        if needs_scan:
+            self.evict(keep=target)
+        return str(target)
+    
+    async def get_or_create(
+        self,
+        key: str,
+        create: Callable[[], Awaitable[Dict]]
+    ) -> Tuple[Dict, str]:
+        """
+        캐시 조회 → 없으면 생성 (동일 키 동시 요청은 하나의 생성 작업 공유)
+        
+        Args:
+            key: 캐시 키
+            create: 이미지 생성 코루틴 함수 (결과 dict에 image_path 포함)
+            
+        Returns:
+            (생성 결과, 상태: "hit" | "miss" | "coalesced")
+        """
+        cached = self.get(key)
+        if cached:
+            self.stats["hit"] += 1
+            return {"image_path": cached}, "hit"
+        
+        task = self._inflight.get(key)
+        if task is None:
+            status = "miss"
+            task = asyncio.ensure_future(self._create_and_store(key, create))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            status = "coalesced"
+        self.stats[status] += 1
+        
+        # 대기 중인 요청 하나가 취소되어도 공유 생성 작업은 계속 진행
+        result = await asyncio.shield(task)
+        return dict(result), status
+    
+    async def _create_and_store(self, key: str, create: Callable[[], Awaitable[Dict]]) -> Dict:
+        result = await create()
+        result["image_path"] = await asyncio.to_thread(self.put, key, result["image_path"])
+        return result
+    
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """디스크 예산 초과 시 가장 오래 사용되지 않은 파일부터 예산의 90% 까지 삭제 (하위 폴더 포함)"""
+        entries = []
+        total = 0
+        
+        for path in self.cache_dir.rglob("*"):
+            try:
+                if not path.is_file():
+                    continue
+                stat = path.stat()
+            except OSError:
+                continue  # 스캔 도중 다른 스레드가 지운 파일
+            entries.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+        
+        if total <= self.max_bytes:
+            with self._lock:
+                self._disk_bytes = total
+            return 0
+        
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * EVICT_TARGET_RATIO:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        
+        with self._lock:
+            self._disk_bytes = total
+        
+        if removed:
+            self.stats["evicted"] += removed
+            print(f"🧹 이미지 캐시 정리: {removed}개 삭제")
+        return removed
@@ -0,0 +1,598 @@
+# python ingest_chunks.py data/03_processed/chunked_data_little_women.jsonl
+# python ingest_chunks.py data/03_processed/*.jsonl* --concurrency 8 --rows-per-copy 2000
+# python ingest_chunks.py data/03_processed/*.jsonl* --model text-embedding-3-large --migrate   (새 컬렉션에 적재)
+# python ingest_chunks.py --swap                                                             (검색 대상 교체)
+"""
+번역 청크 파일 (data_translate.py 출력 JSONL, 예전 JSON 도 가능) → BOOKS 테이블 + PGVector 컬렉션 일괄 적재
+- 책 단위로 스트리밍해 읽고, 책 1권의 바뀐 청크를 rows_per_copy 개씩 임베딩 → 트랜잭션에서 rows_per_copy 개씩 COPY
+- 메모리: 책 1권의 청크 + 바뀐 행 전부의 COPY 행 (행마다 임베딩 벡터 텍스트, 1536차원 기준 약 20KB)
+  을 트랜잭션 전에 모두 들고 있음 → 파일 전체가 아니라 가장 큰 책 1권 분량에 비례
+- 임베딩은 큰 묶음 + 동시 요청 + 속도 제한, 결과는 임베딩 저장소(content_store)에 남겨 재실행 시 재사용
+- 바뀐 청크 임베딩은 트랜잭션 밖에서 먼저 끝냄 (임베딩 요청 / 속도 제한 대기 동안 BOOKS 행 잠금을 잡지 않음)
+- 책 1권 = 트랜잭션 1개: 임시 테이블로 COPY → (book_id, chunk_index) 기준 upsert → 없어진 청크 삭제
+- 행 id 는 (컬렉션, book_id, chunk_index) 에서 결정 → 여러 번 실행해도 같은 결과
+- 행 메타데이터에 content_hash / embedding_model / embedding_version 기록
+  → 다시 실행하면 내용·태그가 그대로인 행은 건너뛰고 바뀐 행만 재임베딩 (reconcile)
+- 컬렉션 메타데이터에 임베딩 모델 / 버전 기록, 모델이 다른 컬렉션에는 섞어 넣지 않음
+- 모델 변경은 blue-green: --migrate 로 새 컬렉션(green) 적재 (그동안 검색은 기존 컬렉션,
+  새 적재는 양쪽에 기록) → --swap 으로 컬렉션 이름을 바꿔 검색 대상 교체 (예전 컬렉션은 보관, 다시 --swap 하면 원복)
+- 책별 / 전체 rows/s, 건너뜀 / 재임베딩 행 수 리포트
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import asyncpg
+from openai import AsyncOpenAI
+
+from backend.app.config import settings
+from backend.app.core.cache import get_cache
+from batch_jobs import EMBEDDING_STORE_PATH
+import chunk_io
+from content_store import EmbeddingStore
+from data_translate import RETRYABLE_ERRORS, TokenBucket, _retry_after, backoff_delay
+
+EMBED_BATCH_SIZE = 256        # 요청 1건당 입력 수
+EMBED_CONCURRENCY = 4
+EMBED_RPM = 3000
+EMBED_TPM = 1_000_000
+ROWS_PER_COPY = 1000          # 임베딩 / COPY 묶음 크기 (책 1권의 바뀐 행은 이 값과 상관없이 모두 메모리에 쌓인 뒤 COPY)
+MAX_RETRIES = 5
+# 임베딩 입력(content_ko) 만드는 방식이 바뀌면 올림 → 컬렉션 전체를 --migrate 로 다시 적재
+EMBEDDING_VERSION = "v1"
+
+SCHEMA_SQL = """
+CREATE EXTENSION IF NOT EXISTS vector;
+CREATE TABLE IF NOT EXISTS langchain_pg_collection (
+    uuid UUID PRIMARY KEY,
+    name VARCHAR,
+    cmetadata JSON
+);
+CREATE TABLE IF NOT EXISTS langchain_pg_embedding (
+    uuid UUID PRIMARY KEY,
+    collection_id UUID REFERENCES langchain_pg_collection (uuid) ON DELETE CASCADE,
+    embedding VECTOR,
+    document VARCHAR,
+    cmetadata JSON,
+    custom_id VARCHAR
+);
+"""
+
+
+def iter_books(paths: List[str]) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """(책 정보, 청크 목록) 을 하나씩 내보냄 (JSONL 은 책 1권 분량만 메모리 사용)"""
+    for path in paths:
+        yield from chunk_io.iter_books(path)
+
+
+def row_uuid(collection_id: uuid.UUID, book_id, chunk_index) -> uuid.UUID:
+    """(컬렉션 uuid, book_id, chunk_index) → 고정 uuid (컬렉션 이름을 바꿔도 그대로)"""
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"reading_mate/{collection_id}/{book_id}:{chunk_index}")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def green_collection_name(collection_name: str, model: str, version: str = EMBEDDING_VERSION) -> str:
+    """마이그레이션 대상 컬렉션 기본 이름 (BOOK_CHUNKS__text_embedding_3_large_v1)"""
+    return f"{collection_name}__" + re.sub(r"[^0-9A-Za-z]+", "_", f"{model}_{version}")
+
+
+class ChunkEmbedder:
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        store: Optional[EmbeddingStore] = None,
+        batch_size: int = EMBED_BATCH_SIZE,
+        concurrency: int = EMBED_CONCURRENCY,
+        rpm: float = EMBED_RPM,
+        tpm: float = EMBED_TPM,
+        max_retries: int = MAX_RETRIES
+    ):
+        """
+        Args:
+            client: OpenAI 호환 비동기 클라이언트
+            model: 임베딩 모델
+            store: 임베딩 저장소 (있으면 저장된 벡터 재사용 + 새 벡터 기록)
+            batch_size: 요청 1건당 입력 수
+            concurrency: 동시 요청 수
+            rpm / tpm: 분당 요청 / 토큰 한도
+            max_retries: 요청당 재시도 횟수
+        """
+        self.client = client
+        self.model = model
+        self.store = store
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._requests = TokenBucket(rpm / 60, max(1.0, rpm / 60))
+        self._tokens = TokenBucket(tpm / 60, tpm / 60)
+        self.stats = {"embedded": 0, "reused": 0, "requests": 0, "retries": 0, "tokens": 0, "seconds": 0.0}
+
+    async def _request(self, texts: List[str]) -> List[List[float]]:
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._requests.acquire(1)
+                await self._tokens.acquire(sum(len(t) for t in texts) // 2)
+                self.stats["requests"] += 1
+                try:
+                    response = await self.client.embeddings.create(model=self.model, input=texts)
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.max_retries:
+                        raise
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(backoff_delay(attempt, retry_after=_retry_after(e)))
+                    continue
+                self.stats["tokens"] += response.usage.prompt_tokens if response.usage else 0
+                return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """텍스트 목록 → 벡터 목록 (저장소에 없는 것만 요청)"""
+        started = time.perf_counter()
+        vectors: List[Optional[List[float]]] = [self.store.get(t) if self.store is not None else None for t in texts]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        self.stats["reused"] += len(texts) - len(missing)
+
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        results = await asyncio.gather(*[self._request([texts[i] for i in batch]) for batch in batches])
+        for batch, batch_vectors in zip(batches, results):
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector
+            if self.store is not None:
+                self.store.put_many([texts[i] for i in batch], batch_vectors)
+
+        self.stats["embedded"] += len(missing)
+        self.stats["seconds"] += time.perf_counter() - started
+        return vectors
+
+
+def vector_literal(vector: List[float]) -> str:
+    """pgvector 텍스트 형식 ('[0.1,0.2,...]')"""
+    return "[" + ",".join(f"{v:.8g}" for v in vector) + "]"
+
+
+def chunk_metadata(book_id, chunk: Dict, model: str, version: str = EMBEDDING_VERSION) -> Dict:
+    """행 메타데이터 (저장된 값과 같으면 해당 행은 건너뜀)"""
+    metadata = {
+        "book_id": book_id,
+        "chunk_index": chunk["chunk_index"],
+        "chapter_name": chunk.get("chapter_name"),
+    }
+    for key in ("char_start", "char_end", "token_count_ko", "page_start", "page_end"):
+        if key in chunk:
+            metadata[key] = chunk[key]
+    metadata.update({
+        "content_hash": content_hash(chunk["content_ko"]),
+        "embedding_model": model,
+        "embedding_version": version,
+    })
+    return metadata
+
+
+def build_rows(changed: List[Tuple[uuid.UUID, str, Dict, Dict]], vectors: List[List[float]]) -> List[Tuple]:
+    """
+    임시 테이블 COPY 용 행 (uuid, custom_id, document, cmetadata, embedding)
+
+    Args:
+        changed: [(uuid, custom_id, 청크, 메타데이터), ...]
+    """
+    rows = []
+    for (row_id, custom_id, chunk, metadata), vector in zip(changed, vectors):
+        rows.append((
+            row_id,
+            custom_id,
+            chunk["content_ko"],
+            json.dumps(metadata, ensure_ascii=False),
+            vector_literal(vector),
+        ))
+    return rows
+
+
+async def get_collection(conn: asyncpg.Connection, name: str) -> Optional[Tuple[uuid.UUID, Dict]]:
+    """컬렉션 이름 → (uuid, 메타데이터), 없으면 None"""
+    row = await conn.fetchrow("SELECT uuid, cmetadata FROM langchain_pg_collection WHERE name = $1", name)
+    if row is None:
+        return None
+    metadata = row["cmetadata"]
+    return row["uuid"], (json.loads(metadata) if isinstance(metadata, str) else metadata) or {}
+
+
+async def set_collection_metadata(conn: asyncpg.Connection, collection_id: uuid.UUID, metadata: Dict):
+    await conn.execute(
+        "UPDATE langchain_pg_collection SET cmetadata = $2::json WHERE uuid = $1",
+        collection_id, json.dumps(metadata, ensure_ascii=False)
+    )
+
+
+class ChunkLoader:
+    def __init__(
+        self,
+        conn: asyncpg.Connection,
+        collection_name: str,
+        embedder: ChunkEmbedder,
+        rows_per_copy: int = ROWS_PER_COPY,
+        version: str = EMBEDDING_VERSION,
+        force: bool = False
+    ):
+        """
+        Args:
+            conn: asyncpg 연결
+            collection_name: PGVector 컬렉션명
+            embedder: 청크 임베딩 (embedder.model 이 컬렉션의 임베딩 모델)
+            rows_per_copy: 임베딩 → COPY 묶음 크기
+            version: 임베딩 버전 태그
+            force: 내용이 같은 행도 모두 다시 임베딩 / 기록
+        """
+        self.conn = conn
+        self.collection_name = collection_name
+        self.embedder = embedder
+        self.rows_per_copy = rows_per_copy
+        self.version = version
+        self.force = force
+        self.collection_id: Optional[uuid.UUID] = None
+        self.collection_metadata: Dict = {}
+        self.metadata_type = "json"
+
+    async def setup(self):
+        """
+        테이블 / 컬렉션 준비 (PGVector 가 만든 기존 테이블은 그대로 사용)
+
+        컬렉션의 임베딩 모델 / 버전이 다르면 ValueError (한 컬렉션에 여러 모델 벡터를 섞지 않음)
+        """
+        await self.conn.execute(SCHEMA_SQL)
+        # PGVector(use_jsonb=True)로 만든 테이블이면 jsonb
+        self.metadata_type = await self.conn.fetchval(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'langchain_pg_embedding' AND column_name = 'cmetadata'"
+        ) or "json"
+
+        tag = {"embedding_model": self.embedder.model, "embedding_version": self.version}
+        found = await get_collection(self.conn, self.collection_name)
+        if found is None:
+            self.collection_id = uuid.uuid4()
+            self.collection_metadata = dict(tag)
+            await self.conn.execute(
+                "INSERT INTO langchain_pg_collection (uuid, name, cmetadata) VALUES ($1, $2, $3::json)",
+                self.collection_id, self.collection_name, json.dumps(tag)
+            )
+            return
+
+        self.collection_id, self.collection_metadata = found
+        current = {key: self.collection_metadata.get(key) for key in tag}
+        if current["embedding_model"] is None:
+            # 태그 없이 만든 컬렉션 (노트북 / 이전 적재) → 태그만 기록, 행은 다음 적재 때 다시 임베딩
+            self.collection_metadata.update(tag)
+            await set_collection_metadata(self.conn, self.collection_id, self.collection_metadata)
+        elif current != tag:
+            raise ValueError(
+                f"{self.collection_name} 컬렉션은 {current['embedding_model']} ({current['embedding_version']}) 로 임베딩되어 있습니다. "
+                f"{self.embedder.model} ({self.version}) 로 바꾸려면 --migrate 로 새 컬렉션에 적재한 뒤 --swap 하세요."
+            )
+
+    async def _upsert_book(self, book: Dict):
+        await self.conn.execute(
+            """
+            INSERT INTO BOOKS (book_id, title_ko, author) VALUES ($1, $2, $3)
+            ON CONFLICT (book_id) DO UPDATE SET title_ko = EXCLUDED.title_ko, author = EXCLUDED.author
+            """,
+            book["book_id"], book.get("title_ko"), book.get("author")
+        )
+
+    async def _existing_rows(self, book_id) -> Dict[str, Tuple[uuid.UUID, Dict]]:
+        """이 책의 기존 행 custom_id → (uuid, 메타데이터)"""
+        rows = await self.conn.fetch(
+            "SELECT uuid, custom_id, cmetadata FROM langchain_pg_embedding WHERE collection_id = $1 AND cmetadata->>'book_id' = $2",
+            self.collection_id, str(book_id)
+        )
+        existing = {}
+        for row in rows:
+            metadata = row["cmetadata"]
+            metadata = (json.loads(metadata) if isinstance(metadata, str) else metadata) or {}
+            # custom_id 없이 적재된 행은 매칭되지 않으므로 예전 청크로 삭제됨
+            existing[row["custom_id"] or str(row["uuid"])] = (row["uuid"], metadata)
+        return existing
+
+    async def _embed_rows(self, changed: List[Tuple[uuid.UUID, str, Dict, Dict]]) -> List[Tuple]:
+        """바뀐 청크 임베딩 → COPY 용 행 (rows_per_copy 개씩 임베딩, 전체 행을 모아 반환 / 트랜잭션 밖에서 호출)"""
+        rows = []
+        for i in range(0, len(changed), self.rows_per_copy):
+            group = changed[i:i + self.rows_per_copy]
+            vectors = await self.embedder.embed([c[2]["content_ko"] for c in group])
+            rows += build_rows(group, vectors)
+        return rows
+
+    async def _copy_upsert(self, rows: List[Tuple]) -> Tuple[int, float]:
+        """임시 테이블 COPY → upsert (트랜잭션 안에서 호출) → (upsert 행 수, DB 시간)"""
+        started = time.perf_counter()
+        await self.conn.execute(
+            "CREATE TEMP TABLE chunk_staging (uuid UUID, custom_id TEXT, document TEXT, cmetadata TEXT, embedding TEXT) ON COMMIT DROP"
+        )
+        for i in range(0, len(rows), self.rows_per_copy):
+            await self.conn.copy_records_to_table(
+                "chunk_staging",
+                records=rows[i:i + self.rows_per_copy],
+                columns=["uuid", "custom_id", "document", "cmetadata", "embedding"]
+            )
+
+        upserted = await self.conn.fetchval(
+            f"""
+            WITH upserted AS (
+                INSERT INTO langchain_pg_embedding (uuid, collection_id, embedding, document, cmetadata, custom_id)
+                SELECT uuid, $1, embedding::vector, document, cmetadata::{self.metadata_type}, custom_id FROM chunk_staging
+                ON CONFLICT (uuid) DO UPDATE SET
+                    embedding = EXCLUDED.embedding,
+                    document = EXCLUDED.document,
+                    cmetadata = EXCLUDED.cmetadata,
+                    custom_id = EXCLUDED.custom_id
+                RETURNING 1
+            )
+            SELECT count(*) FROM upserted
+            """,
+            self.collection_id
+        )
+        return upserted, time.perf_counter() - started
+
+    async def load_book(self, book: Dict, chunks: List[Dict]) -> Dict:
+        """
+        책 1권 reconcile (트랜잭션 1개) → 처리 결과
+
+        내용 해시 / 모델 / 버전 / 메타데이터가 저장된 값과 같은 행은 건너뛰고,
+        바뀌었거나 새로 생긴 청크만 임베딩해 upsert, 없어진 청크는 삭제
+        """
+        started = time.perf_counter()
+        book_id = book["book_id"]
+        db_seconds = 0.0
+        upserted = 0
+        deleted = 0
+
+        # 1. 바뀐 청크 찾기 + 임베딩 (트랜잭션 밖)
+        existing = await self._existing_rows(book_id)
+        changed: List[Tuple[uuid.UUID, str, Dict, Dict]] = []
+        for chunk in chunks:
+            custom_id = f"{book_id}:{chunk['chunk_index']}"
+            metadata = chunk_metadata(book_id, chunk, self.embedder.model, self.version)
+            previous = existing.get(custom_id)
+            if previous is not None and not self.force and previous[1] == metadata:
+                continue
+            row_id = previous[0] if previous is not None else row_uuid(self.collection_id, book_id, chunk["chunk_index"])
+            changed.append((row_id, custom_id, chunk, metadata))
+        rows = await self._embed_rows(changed)
+
+        # 2. BOOKS 기록 → COPY → upsert → 없어진 청크 삭제 (트랜잭션 1개)
+        async with self.conn.transaction():
+            await self._upsert_book(book)
+            if rows:
+                upserted, copy_seconds = await self._copy_upsert(rows)
+                db_seconds += copy_seconds
+
+            # 다시 청크 분할해 청크 수가 줄었으면 남은 예전 청크 (임베딩하는 동안 바뀌었을 수 있어 트랜잭션 안에서 다시 조회)
+            delete_started = time.perf_counter()
+            current = {f"{book_id}:{chunk['chunk_index']}" for chunk in chunks}
+            stale = [row_id for custom_id, (row_id, _) in (await self._existing_rows(book_id)).items() if custom_id not in current]
+            if stale:
+                status = await self.conn.execute("DELETE FROM langchain_pg_embedding WHERE uuid = ANY($1::uuid[])", stale)
+                deleted = int(status.split()[-1])
+            db_seconds += time.perf_counter() - delete_started
+
+        # BOOKS 가 바뀌었으니 캐시된 책 메타데이터 무효화 (sqlite / redis 백엔드는 서버 워커와 공유)
+        await get_cache("metadata").delete(str(book_id))
+
+        elapsed = time.perf_counter() - started
+        return {
+            "book_id": book_id,
+            "collection": self.collection_name,
+            "rows": len(chunks),
+            "skipped": len(chunks) - len(changed),
+            "reembedded": upserted,
+            "deleted": deleted,
+            "seconds": round(elapsed, 2),
+            "db_seconds": round(db_seconds, 2),
+            "rows_per_s": round(upserted / elapsed, 1) if elapsed else 0.0,
+        }
+
+    async def append_chunks(self, book_id, chunks: List[Dict]) -> Dict:
+        """
+        청크 묶음 upsert (트랜잭션 1개) → 처리 결과
+
+        reconcile / BOOKS 기록 / 예전 청크 삭제 없이 주어진 청크만 임베딩해 기록
+        (업로드 PDF 처럼 한 권을 여러 묶음으로 나눠 적재하며 진행도를 보여줄 때, 행 id 가 고정이라 다시 실행해도 같은 결과)
+        """
+        started = time.perf_counter()
+        changed = [
+            (
+                row_uuid(self.collection_id, book_id, chunk["chunk_index"]),
+                f"{book_id}:{chunk['chunk_index']}",
+                chunk,
+                chunk_metadata(book_id, chunk, self.embedder.model, self.version),
+            )
+            for chunk in chunks
+        ]
+        upserted, db_seconds = 0, 0.0
+        rows = await self._embed_rows(changed)
+        if rows:
+            async with self.conn.transaction():
+                upserted, db_seconds = await self._copy_upsert(rows)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "book_id": book_id,
+            "collection": self.collection_name,
+            "rows": len(chunks),
+            "reembedded": upserted,
+            "seconds": round(elapsed, 2),
+            "db_seconds": round(db_seconds, 2),
+            "rows_per_s": round(upserted / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+async def connect() -> asyncpg.Connection:
+    """설정(.env)의 DB 로 asyncpg 연결"""
+    return await asyncpg.connect(
+        user=settings.DB_USER, password=settings.DB_PASS, host=settings.DB_HOST,
+        port=int(settings.DB_PORT), database=settings.DB_NAME
+    )
+
+
+async def swap_collections(conn: asyncpg.Connection, active_name: str, target_name: Optional[str] = None, force: bool = False) -> str:
+    """
+    blue-green 교체: 대상 컬렉션을 active_name 으로, 예전 컬렉션은 모델 이름을 붙여 보관 (트랜잭션 1개)
+    → 보관된 예전 컬렉션 이름
+
+    PGVector 는 검색할 때마다 이름으로 컬렉션을 찾으므로 모델이 같으면(다시 청크 분할) 재시작 없이 바로 반영,
+    모델이 다르면 앱의 EMBEDDING_MODEL 을 맞춰 재시작. --target 에 예전 컬렉션 이름을 주고 다시 실행하면 원복.
+    """
+    active = await get_collection(conn, active_name)
+    if active is None:
+        raise ValueError(f"{active_name} 컬렉션이 없습니다")
+    target_name = target_name or active[1].get("migrating_to")
+    target = await get_collection(conn, target_name) if target_name else None
+    if target is None or target_name == active_name:
+        raise ValueError(f"교체할 컬렉션이 없습니다 ({target_name or '--target 지정 필요'})")
+
+    counts = {}
+    for name, (collection_id, metadata) in ((active_name, active), (target_name, target)):
+        counts[name] = await conn.fetchval("SELECT count(*) FROM langchain_pg_embedding WHERE collection_id = $1", collection_id)
+        print(f"  {name}: {counts[name]}행, {metadata.get('embedding_model')} ({metadata.get('embedding_version')})")
+    if counts[target_name] < counts[active_name] and not force:
+        raise ValueError(f"{target_name} 의 행 수가 적습니다 → 적재를 마친 뒤 다시 실행하거나 --force")
+
+    (active_id, active_metadata), (target_id, target_metadata) = active, target
+    # 예전 컬렉션은 자기 모델 이름으로 보관 (BOOK_CHUNKS__text_embedding_3_small_v1)
+    retired_name = green_collection_name(
+        active_name, active_metadata.get("embedding_model") or "untagged", active_metadata.get("embedding_version") or ""
+    )
+    if retired_name != target_name and await get_collection(conn, retired_name) is not None:
+        retired_name += time.strftime("_%Y%m%d%H%M%S")
+
+    now = time.strftime("%Y-%m-%dT%H:%M:%S")
+    active_metadata.pop("migrating_to", None)
+    target_metadata.pop("migrating_to", None)
+    target_metadata.pop("retired_at", None)
+    active_metadata["retired_at"] = now
+    target_metadata["activated_at"] = now
+
+    async with conn.transaction():
+        await conn.execute("UPDATE langchain_pg_collection SET name = $2 WHERE uuid = $1", active_id, retired_name)
+        await conn.execute("UPDATE langchain_pg_collection SET name = $2 WHERE uuid = $1", target_id, active_name)
+        await set_collection_metadata(conn, active_id, active_metadata)
+        await set_collection_metadata(conn, target_id, target_metadata)
+
+    print(
+        f"🔁 {active_name} ← {target_metadata.get('embedding_model')} ({target_metadata.get('embedding_version')}) 컬렉션으로 교체, "
+        f"예전 컬렉션은 {retired_name}\n"
+        f"   앱의 EMBEDDING_MODEL 을 {target_metadata.get('embedding_model')} 로 맞추고, "
+        f"원복은 --swap --target {retired_name}"
+    )
+    return retired_name
+
+
+def print_totals(loaders: List[ChunkLoader], results: List[Dict], elapsed: float):
+    for loader in loaders:
+        done = [r for r in results if r["collection"] == loader.collection_name]
+        rows = sum(r["rows"] for r in done)
+        reembedded = sum(r["reembedded"] for r in done)
+        stats = loader.embedder.stats
+        print(
+            f"\n[{loader.collection_name}] {len(done)}권 / {rows}행: 건너뜀 {sum(r['skipped'] for r in done)}행, "
+            f"재임베딩 {reembedded}행, 삭제 {sum(r['deleted'] for r in done)}행, "
+            f"{reembedded / max(elapsed, 1e-6):.1f} rows/s "
+            f"(임베딩 요청 {stats['embedded']}개 / 저장소 재사용 {stats['reused']}개, "
+            f"요청 {stats['requests']}회, 재시도 {stats['retries']}회, {stats['tokens']:,} 토큰, {stats['seconds']:.2f}s)"
+        )
+    print(f"경과 {elapsed:.2f}s")
+
+
+async def run(args) -> List[Dict]:
+    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=args.base_url, max_retries=0)
+
+    def make_loader(collection_name: str, model: str, version: str = EMBEDDING_VERSION) -> ChunkLoader:
+        store = None if args.no_store else EmbeddingStore(args.store, model)
+        embedder = ChunkEmbedder(client, model, store, args.embed_batch_size, args.concurrency, args.rpm, args.tpm)
+        return ChunkLoader(conn, collection_name, embedder, args.rows_per_copy, version, args.force)
+
+    conn = await connect()
+    results = []
+    started = time.perf_counter()
+    try:
+        if args.swap:
+            await swap_collections(conn, args.collection, args.target, args.force)
+            return results
+
+        if args.migrate:
+            # green 컬렉션에 새 모델로 적재, 기존 컬렉션(blue)은 검색용으로 그대로 두고 이후 적재는 양쪽에 기록
+            target = args.target or green_collection_name(args.collection, args.model)
+            if target == args.collection:
+                raise ValueError("--target 은 기존 컬렉션과 달라야 합니다")
+            loaders = [make_loader(target, args.model)]
+            await loaders[0].setup()
+            active = await get_collection(conn, args.collection)
+            if active is not None:
+                active_id, active_metadata = active
+                if active_metadata.get("migrating_to") not in (None, target):
+                    raise ValueError(f"{args.collection} 은 이미 {active_metadata['migrating_to']} 로 마이그레이션 중입니다")
+                active_metadata["migrating_to"] = target
+                await set_collection_metadata(conn, active_id, active_metadata)
+            print(f"🟢 마이그레이션: {args.collection} → {target} ({args.model}, {EMBEDDING_VERSION}), 검색은 계속 {args.collection}")
+        else:
+            loaders = [make_loader(args.collection, args.model)]
+            await loaders[0].setup()
+            target = loaders[0].collection_metadata.get("migrating_to")
+            found = await get_collection(conn, target) if target else None
+            if found is not None:
+                # 마이그레이션 중에는 새 컬렉션에도 같이 기록 (dual-write)
+                metadata = found[1]
+                loaders.append(make_loader(target, metadata["embedding_model"], metadata["embedding_version"]))
+                await loaders[1].setup()
+                print(f"🟡 {args.collection} 마이그레이션 중 → {target} 에도 기록 ({metadata['embedding_model']})")
+
+        for book, chunks in iter_books(args.paths):
+            for loader in loaders:
+                result = await loader.load_book(book, chunks)
+                results.append(result)
+                print(
+                    f"✅ [{result['collection']}] book_id={result['book_id']}: {result['rows']}행 중 "
+                    f"건너뜀 {result['skipped']}행 / 재임베딩 {result['reembedded']}행, 예전 청크 {result['deleted']}행 삭제, "
+                    f"{result['seconds']}s (DB {result['db_seconds']}s), {result['rows_per_s']} rows/s"
+                )
+    finally:
+        await conn.close()
+        await client.close()
+
+    print_totals(loaders, results, time.perf_counter() - started)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="번역 청크 파일 → BOOKS + PGVector 일괄 적재 (바뀐 청크만 재임베딩)")
+    parser.add_argument("paths", nargs="*", help="data_translate.py 출력 JSONL(.gz / .zst) 또는 예전 JSON (여러 개 가능)")
+    parser.add_argument("--collection", default=settings.COLLECTION_NAME)
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--base-url", default=os.environ.get("OPENAI_BASE_URL"))
+    parser.add_argument("--embed-batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=EMBED_CONCURRENCY)
+    parser.add_argument("--rpm", type=float, default=EMBED_RPM)
+    parser.add_argument("--tpm", type=float, default=EMBED_TPM)
+    parser.add_argument("--rows-per-copy", type=int, default=ROWS_PER_COPY)
+    parser.add_argument("--store", default=EMBEDDING_STORE_PATH, help="임베딩 저장소 (batch_jobs.py 와 공용)")
+    parser.add_argument("--no-store", action="store_true", help="임베딩 저장소 없이 전부 새로 임베딩")
+    parser.add_argument("--migrate", action="store_true", help="--model 로 새 컬렉션(green)에 적재, 검색은 기존 컬렉션 유지")
+    parser.add_argument("--target", help="마이그레이션 / 교체 대상 컬렉션 (기본: {collection}__{model}_{version})")
+    parser.add_argument("--swap", action="store_true", help="대상 컬렉션을 --collection 이름으로 바꿔 검색 대상 교체")
+    parser.add_argument("--force", action="store_true", help="바뀌지 않은 행도 다시 기록 / 행 수가 적어도 교체")
+    args = parser.parse_args()
+    if not args.paths and not args.swap:
+        parser.error("적재할 JSON 경로가 필요합니다")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
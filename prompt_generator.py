@@ -2,22 +2,40 @@
 AI 프롬프트 생성기 (개선 버전)
 - 캐릭터 감지를 먼저 수행하여 번역 정확도 향상
 - 논리적 흐름 개선
+- 비동기 LLM 호출을 의존성 그래프(DAG)로 병렬 실행
 """
-from typing import Dict, List
-from openai import OpenAI
+from typing import Awaitable, Dict, List, Optional
+from openai import AsyncOpenAI
+import asyncio
 import json
 import os
 import re
+import time
 from dotenv import load_dotenv
 
+from glossary import BookGlossary
+from character_sheets import CharacterSheetStore
+
 load_dotenv()
 
 
 class PromptGenerator:
-    def __init__(self):
-        """OpenAI API 클라이언트 초기화"""
-        self.client = OpenAI()
+    def __init__(
+        self,
+        glossary: Optional[BookGlossary] = None,
+        character_sheets: Optional[CharacterSheetStore] = None
+    ):
+        """
+        OpenAI API 클라이언트 초기화
+        
+        Args:
+            glossary: 책별 고유명사 용어집 (없으면 기본 경로 사용)
+            character_sheets: 책별 캐릭터 외형 시트 (없으면 기본 경로 사용)
+        """
+        self.client = AsyncOpenAI()
         self.model = "gpt-4o-mini"
+        self.glossary = glossary or BookGlossary()
+        self.character_sheets = character_sheets or CharacterSheetStore()
     
     def _is_sentence_input(self, user_input: str) -> bool:
         """입력이 문장인지 키워드 나열인지 판단"""
@@ -57,20 +75,21 @@ class PromptGenerator:
         
         return False
     
-    def _search_keyword_translation(
+    async def _batch_keyword_translation(
         self, 
-        keyword: str, 
+        keywords: List[str], 
         context: List[Dict],
         book_context: str = ""
-    ) -> Dict:
-        """단일 키워드의 정확한 영문 표기 검색"""
+    ) -> Dict[str, Dict]:
+        """용어집에 없는 키워드들의 정확한 영문 표기를 한 번의 호출로 검색"""
         context_text = "\n".join([c['text'] for c in context[:5]])
+        keyword_text = "\n".join(keywords)
         
         prompt = f"""당신은 문학 작품의 고유명사를 정확하게 영문으로 번역하는 전문가입니다.
 
-<키워드>
-{keyword}
-</키워드>
+<키워드_목록>
+{keyword_text}
+</키워드_목록>
 
 <책_내용_참고>
 {context_text}
@@ -80,7 +99,7 @@ class PromptGenerator:
 {book_context if book_context else "정보 없음"}
 </책_정보>
 
-**작업:**
+**작업 (키워드마다):**
 1. 이 키워드가 캐릭터명/장소명/물건명인지 파악
 2. <책_내용_참고>에 영문 표기가 있으면 그것을 사용
 3. 없으면 정확한 영문 번역 제공
@@ -89,22 +108,28 @@ class PromptGenerator:
 **중요:**
 - 캐릭터 이름은 절대 임의 번역 금지
 - 유명 작품의 경우 원작 영문명 사용 필수
+- <키워드_목록>의 모든 키워드를 빠짐없이 반환
 
 JSON 형식:
 {{
-    "korean": "도로시",
-    "english": "Dorothy Gale",
-    "type": "character",
-    "confidence": 0.95,
-    "reasoning": "오즈의 마법사 주인공, 공식 영문명 Dorothy Gale"
+    "translations": [
+        {{
+            "korean": "도로시",
+            "english": "Dorothy Gale",
+            "type": "character",
+            "confidence": 0.95
+        }}
+    ]
 }}
 
 type 값: "character", "place", "object", "general"
 confidence: 0.0~1.0
 """
 
+        translations = {}
+        
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
@@ -112,47 +137,55 @@ confidence: 0.0~1.0
             )
             
             result = json.loads(response.choices[0].message.content)
-            result["source"] = "gpt"
-            return result
-            
+            for item in result.get("translations", []):
+                if item.get("korean") in keywords and item.get("english"):
+                    translations[item["korean"]] = {
+                        "english": item["english"],
+                        "type": item.get("type", "general"),
+                        "confidence": float(item.get("confidence", 0.5)),
+                        "source": "gpt"
+                    }
         except Exception as e:
-            return {
-                "korean": keyword,
+            print(f"⚠️ 키워드 번역 오류: {e}")
+        
+        # 응답에서 빠진 키워드는 원문 유지
+        for keyword in keywords:
+            translations.setdefault(keyword, {
                 "english": keyword,
                 "type": "general",
                 "confidence": 0.3,
-                "source": "fallback",
-                "error": str(e)
-            }
+                "source": "fallback"
+            })
+        
+        return translations
     
-    def _search_and_translate_keywords(
+    async def _search_and_translate_keywords(
         self, 
         keywords: str, 
         context: List[Dict],
         book_context: str = ""
     ) -> Dict[str, Dict]:
-        """쉼표로 구분된 키워드들을 모두 검색하여 영문 번역"""
-        keyword_list = [k.strip() for k in keywords.split(',')]
-        translations = {}
+        """쉼표로 구분된 키워드들을 용어집에서 조회하고, 없는 것만 LLM으로 번역"""
+        keyword_list = list(dict.fromkeys(k.strip() for k in keywords.split(',') if k.strip()))
         
-        for keyword in keyword_list:
-            if not keyword:
-                continue
-                
-            translation_result = self._search_keyword_translation(
-                keyword, 
-                context, 
-                book_context
-            )
-            
-            translations[keyword] = {
-                "english": translation_result["english"],
-                "type": translation_result["type"],
-                "confidence": translation_result["confidence"],
-                "source": translation_result["source"]
-            }
+        if book_context:
+            translations, unknown = await asyncio.to_thread(self.glossary.lookup, book_context, keyword_list)
+        else:
+            translations, unknown = {}, keyword_list
         
-        return translations
+        if unknown:
+            resolved = await self._batch_keyword_translation(unknown, context, book_context)
+            translations.update(resolved)
+        
+        if unknown and book_context:
+            # 새로 확인된 고유명사는 용어집에 기록 (다음 요청부터 LLM 호출 생략)
+            # 용어집이 있는 책만 기록, 파일 쓰기는 이벤트 루프를 막지 않도록 스레드에서
+            await asyncio.to_thread(self.glossary.add, book_context, {
+                k: v for k, v in resolved.items()
+                if v["source"] == "gpt" and v["type"] != "general"
+            })
+        
+        return {keyword: translations[keyword] for keyword in keyword_list}
     
     def _extract_scene_from_keywords(
         self, 
@@ -178,7 +211,7 @@ confidence: 0.0~1.0
         else:
             return keywords
     
-    def _detect_main_characters(self, user_input: str, context: List[Dict]) -> List[str]:
+    async def _detect_main_characters(self, user_input: str, context: List[Dict]) -> List[str]:
         """사용자 입력에서만 주요 캐릭터 감지 (context는 참고용)"""
         
         prompt = f"""다음 사용자 입력 문장에서 **등장하는** 캐릭터 이름만 찾아주세요.
@@ -204,7 +237,7 @@ JSON 형식:
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
@@ -216,7 +249,7 @@ JSON 형식:
         except:
             return []
     
-    def _extract_character_appearance(
+    async def _extract_character_appearance(
         self, 
         character_name: str, 
         context: List[Dict]
@@ -262,7 +295,7 @@ gender: "male", "female", "unknown"
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
@@ -285,7 +318,21 @@ gender: "male", "female", "unknown"
                 "confidence": 0.0
             }
     
-    def _translate_sentence_to_english(
+    async def _get_character_appearance(
+        self,
+        character_name: str,
+        context: List[Dict],
+        book_context: str = ""
+    ) -> Dict:
+        """캐릭터 시트가 있으면 그대로 사용, 없을 때만 context에서 LLM 추출"""
+        if book_context:
+            sheet = await asyncio.to_thread(self.character_sheets.get, book_context, character_name)
+            if sheet:
+                return sheet
+        
+        return await self._extract_character_appearance(character_name, context)
+    
+    async def _translate_sentence_to_english(
         self,
         sentence: str,
         context: List[Dict],
@@ -342,7 +389,7 @@ JSON 형식:
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
@@ -355,7 +402,7 @@ JSON 형식:
         except Exception as e:
             return sentence
     
-    def _identify_interfering_subjects(
+    async def _identify_interfering_subjects(
         self,
         main_character: str,
         context: List[Dict]
@@ -384,7 +431,7 @@ JSON 형식:
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
@@ -397,7 +444,7 @@ JSON 형식:
         except:
             return []
     
-    def generate_comfyui_prompt(
+    async def generate_comfyui_prompt(
         self, 
         context: List[Dict],
         user_input: str,
@@ -405,58 +452,99 @@ JSON 형식:
         book_context: str = ""
     ) -> Dict:
         """
-        ComfyUI용 구조화된 프롬프트 생성 (개선: 순서 최적화)
+        ComfyUI용 구조화된 프롬프트 생성 (LLM 호출을 의존성 그래프로 병렬 실행)
+        
+        의존성:
+        - 키워드 번역 (용어집 조회 + 미등록 일괄 번역)
+        - 캐릭터 감지 → 외형 (시트 조회 / 캐릭터별 동시 추출) → 장면 번역
+        - 캐릭터 감지 → 방해 요소 식별 (외형/번역과 동시)
+        - 위 세 갈래 완료 → 최종 프롬프트
         """
+        tracker = _StageTracker()
+        
         # 입력 타입 판단
         is_sentence = self._is_sentence_input(user_input)
         
         # 키워드 영문 번역 및 장면 추출
-        keyword_translations = {}
         scene_description = user_input
+        keywords_task = None
         
         if not is_sentence:
             # 키워드 모드
-            keyword_translations = self._search_and_translate_keywords(
-                user_input, 
-                context,
-                book_context
-            )
+            keywords_task = asyncio.create_task(tracker.run(
+                "keywords",
+                self._search_and_translate_keywords(user_input, context, book_context)
+            ))
             scene_description = self._extract_scene_from_keywords(user_input, context)
             input_type = "키워드"
         else:
             # 문장 모드
             input_type = "문장"
         
-        # ===== 개선: 캐릭터 감지를 먼저 수행 =====
-        # 1. 캐릭터 감지 (원본 한글에서)
-        characters = self._detect_main_characters(user_input, context)
-        
-        # 2. 캐릭터 외형 추출 (캐릭터가 있을 때만)
-        character_appearances = {}
-        for char in characters:
-            appearance_data = self._extract_character_appearance(char, context)
-            if appearance_data["confidence"] > 0.5:
-                character_appearances[char] = appearance_data
-        
-        # 3. 영문 번역 (캐릭터 정보 활용!)
-        scene_description_eng = self._translate_sentence_to_english(
-            scene_description, 
-            context, 
-            book_context,
-            characters=characters,  # ← 캐릭터 정보 전달
-            character_appearances=character_appearances  # ← 외형 정보 전달
+        # 1. 캐릭터 감지 (원본 한글에서) - 키워드 번역과 동시 실행
+        characters_task = asyncio.create_task(tracker.run(
+            "characters",
+            self._detect_main_characters(user_input, context)
+        ))
+        
+        async def appearances_and_translation():
+            characters = await characters_task
+            
+            # 2. 캐릭터 외형 추출 (캐릭터별 동시 실행)
+            appearance_results = await tracker.run(
+                "appearances",
+                asyncio.gather(*[
+                    self._get_character_appearance(char, context, book_context)
+                    for char in characters
+                ]),
+                deps=["characters"]
+            )
+            character_appearances = {
+                char: appearance_data
+                for char, appearance_data in zip(characters, appearance_results)
+                if appearance_data["confidence"] > 0.5
+            }
+            
+            # 3. 영문 번역 (캐릭터 정보 활용!)
+            scene_description_eng = await tracker.run(
+                "translation",
+                self._translate_sentence_to_english(
+                    scene_description,
+                    context,
+                    book_context,
+                    characters=characters,
+                    character_appearances=character_appearances
+                ),
+                deps=["appearances"]
+            )
+            return character_appearances, scene_description_eng
+        
+        async def interfering():
+            characters = await characters_task
+            main_character = characters[0] if characters else None
+            is_solo = len(characters) == 1 or "혼자" in user_input.lower() or "단독" in user_input.lower()
+            
+            if not (is_solo and main_character):
+                return []
+            return await tracker.run(
+                "interfering",
+                self._identify_interfering_subjects(main_character, context),
+                deps=["characters"]
+            )
+        
+        # 외형 → 번역 경로와 방해 요소 식별을 동시에 실행
+        (character_appearances, scene_description_eng), interfering_subjects, keyword_translations = await asyncio.gather(
+            appearances_and_translation(),
+            interfering(),
+            keywords_task if keywords_task else _completed({})
         )
-        # ===== 개선 끝 =====
+        characters = characters_task.result()
         
         # 주요 캐릭터 및 방해 요소
         main_character = characters[0] if characters else None
-        
-        interfering_subjects = []
         is_solo_request = len(characters) == 1 or "혼자" in user_input.lower() or "단독" in user_input.lower()
         
         if is_solo_request and main_character:
-            interfering_subjects = self._identify_interfering_subjects(main_character, context)
-            
             # 다른 캐릭터도 방해 요소에 추가
             main_char_eng = ""
             for k, v in keyword_translations.items():
@@ -571,11 +659,15 @@ JSON 형식:
 """
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt_template}],
-                temperature=0.7,
-                response_format={"type": "json_object"}
+            response = await tracker.run(
+                "final_prompt",
+                self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt_template}],
+                    temperature=0.7,
+                    response_format={"type": "json_object"}
+                ),
+                deps=["keywords", "translation", "interfering"]
             )
             
             result = json.loads(response.choices[0].message.content)
@@ -597,6 +689,9 @@ JSON 형식:
         result["style_params"].setdefault("steps", 20)
         result["style_params"].setdefault("sampler", "euler")
         
+        critical_path, critical_path_ms = tracker.critical_path("final_prompt")
+        print(f"⏱️ 프롬프트 생성 {tracker.elapsed_ms():.0f}ms, 크리티컬 패스: {' → '.join(critical_path)} ({critical_path_ms:.0f}ms)")
+        
         # 디버깅 정보
         result["_debug"] = {
             "input_type": input_type,
@@ -609,7 +704,65 @@ JSON 형식:
             "interfering_subjects": interfering_subjects,
             "is_solo_request": is_solo_request,
             "keyword_translations": keyword_translations if keyword_translations else None,
-            "processing_order": "캐릭터 감지 → 외형 추출 → 번역 (개선됨)"
+            "processing_order": "캐릭터 감지 → 외형 추출 → 번역 (개선됨)",
+            "stage_timings_ms": tracker.timings_ms(),
+            "critical_path": critical_path,
+            "critical_path_ms": critical_path_ms,
+            "total_ms": tracker.elapsed_ms()
         }
         
-        return result
\ No newline at end of file
+        return result
+
+
+async def _completed(value):
+    return value
+
+
+class _StageTracker:
+    """요청 단위 LLM 단계별 시간 기록 및 크리티컬 패스 계산"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, Dict] = {}
+    
+    async def run(self, name: str, awaitable: Awaitable, deps: Optional[List[str]] = None):
+        """awaitable 실행 시간을 name 단계로 기록"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stages[name] = {
+                "start_ms": (started - self.start) * 1000,
+                "end_ms": (time.perf_counter() - self.start) * 1000,
+                "deps": deps or []
+            }
+    
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+    
+    def timings_ms(self) -> Dict[str, float]:
+        return {
+            name: round(stage["end_ms"] - stage["start_ms"], 1)
+            for name, stage in self.stages.items()
+        }
+    
+    def critical_path(self, last: str):
+        """
+        last 단계부터 가장 늦게 끝난 선행 단계를 따라가며 크리티컬 패스 계산
+        
+        Returns:
+            (단계 이름 리스트, 경로상 단계 소요 시간 합 ms)
+        """
+        path = []
+        name = last
+        
+        while name in self.stages:
+            path.append(name)
+            deps = [d for d in self.stages[name]["deps"] if d in self.stages]
+            if not deps:
+                break
+            name = max(deps, key=lambda d: self.stages[d]["end_ms"])
+        
+        path.reverse()
+        total = sum(self.stages[n]["end_ms"] - self.stages[n]["start_ms"] for n in path)
+        return path, round(total, 1)